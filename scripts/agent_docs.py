@@ -0,0 +1,973 @@
+"""Agent spec model, catalog loading and Markdown rendering for agents/*.md.
+
+Kept separate from the agent_pipeline CLI so light commands (--list, --version)
+never pay for importing or building any of this.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from itertools import islice
+from pathlib import Path
+from sys import intern
+from typing import Callable, Iterator, NamedTuple, TextIO
+
+BASE_LINK = "../instructions/agent-base.md"
+METRICS_LINK = "../instructions/metrics-glossary.md"
+
+_today: str | None = None
+
+
+def today() -> str:
+    """ISO date stamped into new or changed docs; evaluated on first use rather than at import."""
+    global _today
+    if _today is None:
+        from datetime import date
+
+        _today = date.today().isoformat()
+    return _today
+
+
+class Labels(NamedTuple):
+    """Every heading and label a doc uses in one language; see catalog/locales/.
+
+    A tuple, so it can be passed to section helpers and still key the fragment cache.
+    """
+
+    code: str
+    role_desc: str
+    scope: str
+    scope_in: str
+    scope_out: str
+    contract: str
+    inputs: str
+    outputs: str
+    missing_questions: str
+    responsibilities: str
+    duration: str
+    steps: str
+    metrics: str
+    dod: str
+    tools: str
+    gates: str
+    gates_intro: str
+    gates_own: str
+    templates: str
+    templates_intro: str
+    kpis: str
+    kpis_intro: str
+    handoff: str
+    upstream: str
+    downstream: str
+    raci: str
+    raci_scene: str
+    changelog: str
+    colon: str  # after a bold label that ends its line
+    value_sep: str  # between a bold label and an inline value
+
+
+def make_labels(code: str, bundle: dict[str, str]) -> Labels:
+    """Build Labels from a bundle, filling the {base_link}/{metrics_link} placeholders."""
+    links = {"base_link": BASE_LINK, "metrics_link": METRICS_LINK}
+    return Labels(code=code, **{k: v.format(**links) for k, v in bundle.items()})
+
+
+ZH_CN = make_labels("zh-CN", {
+    "role_desc": "角色描述",
+    "scope": "适用范围 / 不适用范围",
+    "scope_in": "适用范围",
+    "scope_out": "不适用范围",
+    "contract": "输入/输出契约（Contract）",
+    "inputs": "输入（Inputs）",
+    "outputs": "输出（Outputs）",
+    "missing_questions": "输入缺失时优先追问（默认问题清单）",
+    "responsibilities": "核心职责与标准化流程",
+    "duration": "建议时长",
+    "steps": "标准化流程",
+    "metrics": "可量化指标（建议阈值）",
+    "dod": "交付标准（DoD）",
+    "tools": "技能与工具",
+    "gates": "质量门禁（Quality Gates）",
+    "gates_intro": "通用门禁定义见 [{base_link}]({base_link})。",
+    "gates_own": "本角色专属门禁",
+    "templates": "模板（可复制使用）",
+    "templates_intro": "通用模板见 [{base_link}]({base_link})。",
+    "kpis": "KPI（用于复盘与绩效）",
+    "kpis_intro": "常用指标口径见 [{metrics_link}]({metrics_link})。",
+    "handoff": "协作与交接（Handoff + RACI）",
+    "upstream": "上游我需要（Upstream）",
+    "downstream": "我交付给下游（Downstream）",
+    "raci": "RACI（示例）",
+    "raci_scene": "场景",
+    "changelog": "Changelog",
+    "colon": "：",
+    "value_sep": "：",
+})
+DEFAULT_LOCALE = ZH_CN.code
+
+
+def fm(**kwargs) -> str:
+    lines = ["---"]
+    for k, v in kwargs.items():
+        if isinstance(v, (list, tuple)):
+            lines.append(f"{k}:")
+            for item in v:
+                lines.append(f"  - {item}")
+        else:
+            lines.append(f"{k}: {v}")
+    lines.append("---")
+    return "\n".join(lines)
+
+
+def section(title: str) -> str:
+    return f"\n## {title}\n"
+
+
+def sub(title: str) -> str:
+    return f"\n### {title}\n"
+
+
+def resp_block(
+    title: str, duration: str, steps: list[str], metrics: list[str], dod: list[str], L: Labels = ZH_CN
+) -> str:
+    parts: list[str] = []
+    parts.append(sub(title))
+    parts.append(f"**{L.duration}**{L.value_sep}{duration}\n")
+    parts.append(f"**{L.steps}**{L.colon}\n")
+    for i, step in enumerate(steps, 1):
+        parts.append(f"{i}. {step}")
+
+    parts.append(f"\n**{L.metrics}**{L.colon}")
+    for m in metrics:
+        parts.append(f"- {m}")
+
+    parts.append(f"\n**{L.dod}**{L.colon}")
+    for d in dod:
+        parts.append(f"- {d}")
+
+    return "\n".join(parts) + "\n"
+
+
+def contract(inputs: list[str], outputs: list[str], missing_questions: list[str], L: Labels = ZH_CN) -> str:
+    parts = [section(L.contract), f"**{L.inputs}**{L.colon}"]
+    parts += [f"- {i}" for i in inputs]
+    parts.append(f"\n**{L.outputs}**{L.colon}")
+    parts += [f"- {o}" for o in outputs]
+    parts.append(f"\n**{L.missing_questions}**{L.colon}")
+    parts += [f"- {q}" for q in missing_questions]
+    return "\n".join(parts) + "\n"
+
+
+def quality_gates(gates: list[str], L: Labels = ZH_CN) -> str:
+    parts = [
+        section(L.gates),
+        f"{L.gates_intro}\n",
+        f"**{L.gates_own}**{L.colon}",
+    ]
+    parts += [f"- {g}" for g in gates]
+    return "\n".join(parts) + "\n"
+
+
+def tools_block(items: dict[str, list[str]], L: Labels = ZH_CN) -> str:
+    parts = [section(L.tools)]
+    for k, vs in items.items():
+        parts.append(f"**{k}**{L.colon}")
+        parts += [f"- {v}" for v in vs]
+        parts.append("")
+    return "\n".join(parts) + "\n"
+
+
+def templates_block(items: list[tuple[str, str]], L: Labels = ZH_CN) -> str:
+    parts = [section(L.templates), f"{L.templates_intro}\n"]
+    for title, body in items:
+        parts.append(f"### {title}\n")
+        parts.append("```\n" + body.strip("\n") + "\n```\n")
+    return "\n".join(parts) + "\n"
+
+
+def kpi_block(items: list[str], L: Labels = ZH_CN) -> str:
+    parts = [section(L.kpis), f"{L.kpis_intro}\n"]
+    parts += [f"- {it}" for it in items]
+    return "\n".join(parts) + "\n"
+
+
+def handoff_block(
+    upstream: list[str],
+    downstream: list[str],
+    raci_rows: list[tuple[str, str, str, str, str]],
+    L: Labels = ZH_CN,
+) -> str:
+    parts = [section(L.handoff)]
+
+    parts.append(f"**{L.upstream}**{L.colon}")
+    parts += [f"- {u}" for u in upstream]
+
+    parts.append(f"\n**{L.downstream}**{L.colon}")
+    parts += [f"- {d}" for d in downstream]
+
+    parts.append(f"\n**{L.raci}**{L.colon}\n")
+    parts.append(f"| {L.raci_scene} | R | A | C | I |")
+    parts.append("|---|---|---|---|---|")
+    for scene, r, a, c, i in raci_rows:
+        parts.append(f"| {scene} | {r} | {a} | {c} | {i} |")
+
+    return "\n".join(parts) + "\n"
+
+
+def changelog(initial_note: str, L: Labels = ZH_CN, stamp: str | None = None) -> str:
+    return f"\n## {L.changelog}\n\n- {stamp or today()} v0.2 — {initial_note}\n"
+
+
+# Specs are immutable and slotted, with tuple fields and interned strings:
+# the same tool names, gates and RACI roles repeat across thousands of agents,
+# so a loaded catalog keeps one copy of each phrase (see `bench_agents.py memory`).
+Strs = tuple[str, ...]
+
+
+@dataclass(frozen=True, slots=True)
+class Responsibility:
+    title: str
+    duration: str
+    steps: Strs
+    metrics: Strs
+    dod: Strs
+
+
+@dataclass(frozen=True, slots=True)
+class AgentSpec:
+    agent_id: str
+    title: str
+    role_desc: str
+    scope_in: Strs
+    scope_out: Strs
+    inputs: Strs
+    outputs: Strs
+    missing_questions: Strs
+    responsibilities: tuple[Responsibility, ...]
+    tools: dict[str, Strs]
+    gates: Strs
+    templates: tuple[tuple[str, str], ...]
+    kpis: Strs
+    upstream: Strs
+    downstream: Strs
+    raci_rows: tuple[tuple[str, str, str, str, str], ...]
+    initial_note: str
+
+
+Span = tuple[str, str, float, float]  # (agent_id, section, start, seconds)
+
+
+def _untimed(section: str, fn: Callable[..., str], /, *args, **kwargs) -> str:
+    return fn(*args, **kwargs)
+
+
+class SectionTimer:
+    """Collects per-agent, per-section spans for --timings and --trace."""
+
+    def __init__(self) -> None:
+        self.spans: list[Span] = []
+
+    def section(self, agent_id: str) -> Callable[..., str]:
+        def timed(section: str, fn: Callable[..., str], /, *args, **kwargs) -> str:
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.spans.append((agent_id, section, t0, time.perf_counter() - t0))
+
+        return timed
+
+
+FragmentKey = tuple  # (section, args, kwargs items); only strings and tuples inside
+
+
+def _fragment_key(section: str, args: tuple, kwargs: dict) -> FragmentKey:
+    key = (section, args, tuple(kwargs.items()))
+    try:
+        hash(key)
+    except TypeError:
+        # tools_block takes a dict; key it by its items instead.
+        args = tuple(("dict", tuple(a.items())) if isinstance(a, dict) else a for a in args)
+        key = (section, args, key[2])
+    return key
+
+
+def _thaw(value):
+    """Turn a JSON-decoded fragment key back into the tuples it was built from."""
+    return tuple(_thaw(v) for v in value) if isinstance(value, list) else value
+
+
+class FragmentCache:
+    """Bounded LRU of rendered sections, keyed by the section name and its inputs.
+
+    Section helpers are pure functions of their arguments, so identical gates, KPI lists,
+    responsibilities or tool groups shared by many agents render once per run. Spec
+    fields are interned tuples, so the dict lookup itself is cheaper than rendering.
+    With `track_new`, fragments rendered since the last drain_new() are kept for persisting.
+    """
+
+    def __init__(self, maxsize: int = 4096, track_new: bool = False) -> None:
+        from collections import OrderedDict
+
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data: OrderedDict[FragmentKey, str] = OrderedDict()
+        self._new: dict[FragmentKey, str] | None = {} if track_new else None
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> tuple[int, int, int]:
+        return self.hits, self.misses, self.evictions
+
+    def dump(self, fragments: dict[FragmentKey, str] | None = None) -> list[list]:
+        """JSON-ready [key, text] pairs for `fragments` (default: the whole cache)."""
+        return [[key, text] for key, text in (self._data if fragments is None else fragments).items()]
+
+    def load(self, entries: list[list]) -> None:
+        """Seed the cache from dump() output, e.g. persisted by a previous run."""
+        for key, text in entries:
+            self._store(_thaw(key), text)
+
+    def drain_new(self) -> dict[FragmentKey, str]:
+        new = self._new or {}
+        if self._new is not None:
+            self._new = {}
+        return new
+
+    def _store(self, key: FragmentKey, text: str) -> None:
+        self._data[key] = text
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def wrap(self, t: Callable[..., str]) -> Callable[..., str]:
+        """Put the cache in front of a section runner (_untimed or SectionTimer.section())."""
+
+        def cached(section: str, fn: Callable[..., str], /, *args, **kwargs) -> str:
+            key = _fragment_key(section, args, kwargs)
+            text = self._data.get(key)
+            if text is not None:
+                self.hits += 1
+                self._data.move_to_end(key)
+                return text
+            self.misses += 1
+            text = t(section, fn, *args, **kwargs)
+            self._store(key, text)
+            if self._new is not None:
+                self._new[key] = text
+            return text
+
+        return cached
+
+
+class Layout(NamedTuple):
+    """Frontmatter keys and `##` sections of a doc type, in order; compiled from meta-info/ templates."""
+
+    fm: tuple[str, ...]
+    sections: tuple[str, ...]
+
+
+# Agent sections are named after their heading's Labels field. This default matches
+# meta-info/meta_agent.md; agent_template.agent_layout() compiles the file itself.
+AGENT_LAYOUT = Layout(
+    fm=("id", "name", "version", "last_updated", "language"),
+    sections=(
+        "role_desc", "scope", "contract", "responsibilities", "tools",
+        "gates", "templates", "kpis", "handoff", "changelog",
+    ),
+)
+
+
+def agent_fm_values(spec: AgentSpec, L: Labels, stamp: str) -> dict[str, str]:
+    return {"id": spec.agent_id, "name": spec.title, "version": "0.2", "last_updated": stamp, "language": L.code}
+
+
+# One function per layout section: (spec, section runner, labels, date stamp) -> that part
+# of the doc. Parts are joined by "\n", as render_agent() always did.
+AGENT_SECTIONS: dict[str, Callable[[AgentSpec, Callable[..., str], Labels, str], str]] = {
+    "role_desc": lambda spec, t, L, stamp: f"## {L.role_desc}\n" + spec.role_desc.strip() + "\n\n---\n",
+    "scope": lambda spec, t, L, stamp: (
+        section(L.scope) + "\n" +
+        f"**{L.scope_in}**{L.colon}\n" + "\n".join([f"- {x}" for x in spec.scope_in]) + "\n\n" +
+        f"**{L.scope_out}**{L.colon}\n" + "\n".join([f"- {x}" for x in spec.scope_out]) + "\n"
+    ),
+    "contract": lambda spec, t, L, stamp: t("contract", contract, spec.inputs, spec.outputs, spec.missing_questions, L),
+    "responsibilities": lambda spec, t, L, stamp: section(L.responsibilities) + "\n" + "\n".join(
+        t("resp_block", resp_block, r.title, r.duration, r.steps, r.metrics, r.dod, L) for r in spec.responsibilities
+    ) + "\n",
+    "tools": lambda spec, t, L, stamp: t("tools_block", tools_block, spec.tools, L),
+    "gates": lambda spec, t, L, stamp: t("quality_gates", quality_gates, spec.gates, L),
+    "templates": lambda spec, t, L, stamp: t("templates_block", templates_block, spec.templates, L),
+    "kpis": lambda spec, t, L, stamp: t("kpi_block", kpi_block, spec.kpis, L),
+    "handoff": lambda spec, t, L, stamp: t("handoff_block", handoff_block, spec.upstream, spec.downstream, spec.raci_rows, L),
+    "changelog": lambda spec, t, L, stamp: t("changelog", changelog, spec.initial_note, L, stamp),
+}
+
+
+def render_agent(
+    spec: AgentSpec,
+    timer: SectionTimer | None = None,
+    cache: FragmentCache | None = None,
+    labels: Labels = ZH_CN,
+    layout: Layout = AGENT_LAYOUT,
+    stamp: str | None = None,
+) -> str:
+    """Render an agent doc; `stamp` is its last_updated/changelog date (default: today)."""
+    t = timer.section(spec.agent_id) if timer else _untimed
+    if cache is not None:
+        t = cache.wrap(t)
+    L = labels
+    stamp = stamp or today()
+    values = agent_fm_values(spec, L, stamp)
+    parts = [t("fm", fm, **{k: values[k] for k in layout.fm}), f"# {spec.title}\n"]
+    parts += [AGENT_SECTIONS[name](spec, t, L, stamp) for name in layout.sections]
+    return "\n".join(parts).rstrip() + "\n"
+
+
+# Streaming render path: the same sections as above, yielded as chunks into one writer
+# instead of joined per section and again per doc. "".join(iter_agent(spec)) == render_agent(spec).
+# Each generator yields the "\n" separators of the matching join inline, so there is one
+# generator frame per section and no intermediate lists.
+
+
+def iter_fm(**kwargs) -> Iterator[str]:
+    yield "---"
+    for k, v in kwargs.items():
+        if isinstance(v, (list, tuple)):
+            yield f"\n{k}:"
+            for item in v:
+                yield f"\n  - {item}"
+        else:
+            yield f"\n{k}: {v}"
+    yield "\n---"
+
+
+def iter_resp_block(r: Responsibility, L: Labels = ZH_CN) -> Iterator[str]:
+    yield sub(r.title)
+    yield f"\n**{L.duration}**{L.value_sep}{r.duration}\n"
+    yield f"\n**{L.steps}**{L.colon}\n"
+    for i, step in enumerate(r.steps, 1):
+        yield f"\n{i}. {step}"
+    yield f"\n\n**{L.metrics}**{L.colon}"
+    for m in r.metrics:
+        yield f"\n- {m}"
+    yield f"\n\n**{L.dod}**{L.colon}"
+    for d in r.dod:
+        yield f"\n- {d}"
+    yield "\n"
+
+
+def iter_contract(
+    inputs: list[str], outputs: list[str], missing_questions: list[str], L: Labels = ZH_CN
+) -> Iterator[str]:
+    yield section(L.contract)
+    yield f"\n**{L.inputs}**{L.colon}"
+    for i in inputs:
+        yield f"\n- {i}"
+    yield f"\n\n**{L.outputs}**{L.colon}"
+    for o in outputs:
+        yield f"\n- {o}"
+    yield f"\n\n**{L.missing_questions}**{L.colon}"
+    for q in missing_questions:
+        yield f"\n- {q}"
+    yield "\n"
+
+
+def iter_quality_gates(gates: list[str], L: Labels = ZH_CN) -> Iterator[str]:
+    yield section(L.gates)
+    yield f"\n{L.gates_intro}\n\n**{L.gates_own}**{L.colon}"
+    for g in gates:
+        yield f"\n- {g}"
+    yield "\n"
+
+
+def iter_tools_block(items: dict[str, list[str]], L: Labels = ZH_CN) -> Iterator[str]:
+    yield section(L.tools)
+    for k, vs in items.items():
+        yield f"\n**{k}**{L.colon}"
+        for v in vs:
+            yield f"\n- {v}"
+        yield "\n"
+    yield "\n"
+
+
+def iter_templates_block(items: list[tuple[str, str]], L: Labels = ZH_CN) -> Iterator[str]:
+    yield section(L.templates)
+    yield f"\n{L.templates_intro}\n"
+    for title, body in items:
+        yield f"\n### {title}\n"
+        yield "\n```\n" + body.strip("\n") + "\n```\n"
+    yield "\n"
+
+
+def iter_kpi_block(items: list[str], L: Labels = ZH_CN) -> Iterator[str]:
+    yield section(L.kpis)
+    yield f"\n{L.kpis_intro}\n"
+    for it in items:
+        yield f"\n- {it}"
+    yield "\n"
+
+
+def iter_handoff_block(
+    upstream: list[str],
+    downstream: list[str],
+    raci_rows: list[tuple[str, str, str, str, str]],
+    L: Labels = ZH_CN,
+) -> Iterator[str]:
+    yield section(L.handoff)
+    yield f"\n**{L.upstream}**{L.colon}"
+    for u in upstream:
+        yield f"\n- {u}"
+    yield f"\n\n**{L.downstream}**{L.colon}"
+    for d in downstream:
+        yield f"\n- {d}"
+    yield f"\n\n**{L.raci}**{L.colon}\n\n| {L.raci_scene} | R | A | C | I |\n|---|---|---|---|---|"
+    for scene, r, a, c, i in raci_rows:
+        yield f"\n| {scene} | {r} | {a} | {c} | {i} |"
+    yield "\n"
+
+
+def iter_role_desc(spec: AgentSpec, L: Labels) -> Iterator[str]:
+    yield f"## {L.role_desc}\n" + spec.role_desc.strip() + "\n\n---\n"
+
+
+def iter_scope(spec: AgentSpec, L: Labels) -> Iterator[str]:
+    yield section(L.scope)
+    yield f"\n**{L.scope_in}**{L.colon}\n"
+    for i, x in enumerate(spec.scope_in):
+        yield f"\n- {x}" if i else f"- {x}"
+    yield f"\n\n**{L.scope_out}**{L.colon}\n"
+    for i, x in enumerate(spec.scope_out):
+        yield f"\n- {x}" if i else f"- {x}"
+    yield "\n"
+
+
+def iter_responsibilities(spec: AgentSpec, L: Labels) -> Iterator[str]:
+    yield section(L.responsibilities)
+    yield "\n"
+    for i, r in enumerate(spec.responsibilities):
+        if i:
+            yield "\n"
+        yield from iter_resp_block(r, L)
+    yield "\n"
+
+
+# Streaming counterparts of AGENT_SECTIONS; each yields exactly that section's part.
+AGENT_ITER_SECTIONS: dict[str, Callable[[AgentSpec, Labels, str], Iterator[str]]] = {
+    "role_desc": lambda spec, L, stamp: iter_role_desc(spec, L),
+    "scope": lambda spec, L, stamp: iter_scope(spec, L),
+    "contract": lambda spec, L, stamp: iter_contract(spec.inputs, spec.outputs, spec.missing_questions, L),
+    "responsibilities": lambda spec, L, stamp: iter_responsibilities(spec, L),
+    "tools": lambda spec, L, stamp: iter_tools_block(spec.tools, L),
+    "gates": lambda spec, L, stamp: iter_quality_gates(spec.gates, L),
+    "templates": lambda spec, L, stamp: iter_templates_block(spec.templates, L),
+    "kpis": lambda spec, L, stamp: iter_kpi_block(spec.kpis, L),
+    "handoff": lambda spec, L, stamp: iter_handoff_block(spec.upstream, spec.downstream, spec.raci_rows, L),
+    "changelog": lambda spec, L, stamp: iter((changelog(spec.initial_note, L, stamp),)),
+}
+
+
+def iter_agent(
+    spec: AgentSpec, labels: Labels = ZH_CN, layout: Layout = AGENT_LAYOUT, stamp: str | None = None
+) -> Iterator[str]:
+    # Mirrors render_agent(): its parts joined by "\n", then rstrip()ped. Only the last
+    # part is buffered for the rstrip(); every section ends with non-whitespace before
+    # its trailing newlines, so that equals rstrip()ing the whole doc.
+    L = labels
+    stamp = stamp or today()
+    values = agent_fm_values(spec, L, stamp)
+    yield from iter_fm(**{k: values[k] for k in layout.fm})
+    yield f"\n# {spec.title}\n"
+    if not layout.sections:
+        return
+    *body, last = layout.sections
+    for name in body:
+        yield "\n"
+        yield from AGENT_ITER_SECTIONS[name](spec, L, stamp)
+    yield "\n"
+    yield "".join(AGENT_ITER_SECTIONS[last](spec, L, stamp)).rstrip()
+    yield "\n"
+
+
+def stream_agent(
+    spec: AgentSpec,
+    out: TextIO,
+    batch: int = 1024,
+    labels: Labels = ZH_CN,
+    layout: Layout = AGENT_LAYOUT,
+    stamp: str | None = None,
+) -> None:
+    """Write the rendered doc to `out`; byte-identical to render_agent(spec, labels=labels, layout=layout, stamp=stamp).
+
+    Chunks are coalesced `batch` at a time, which keeps peak memory bounded while
+    avoiding one write() call per bullet.
+    """
+    chunks = iter_agent(spec, labels, layout, stamp)
+    while data := "".join(islice(chunks, batch)):
+        out.write(data)
+
+
+def read_spec_file(path: Path) -> dict:
+    suffix = path.suffix.lower()
+    if suffix == ".json":
+        return json.loads(path.read_text(encoding="utf-8"))
+    if suffix == ".toml":
+        import tomllib
+
+        return tomllib.loads(path.read_text(encoding="utf-8"))
+    if suffix in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError as e:
+            raise RuntimeError(f"{path}: reading YAML specs requires PyYAML") from e
+        return yaml.safe_load(path.read_text(encoding="utf-8"))
+    raise ValueError(f"{path}: unsupported spec format {path.suffix!r}")
+
+
+@contextmanager
+def atomic_path(path: Path, mode: int | None = None) -> Iterator[str]:
+    """Yield a temp path next to `path`; on success it replaces `path`, on error it is removed.
+
+    mkstemp creates 0600 files, so the result gets `mode` (default: what open() would give
+    a new file under the current umask).
+    """
+    import os
+    import tempfile
+
+    if mode is None:
+        umask = os.umask(0)
+        os.umask(umask)
+        mode = 0o666 & ~umask
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    os.close(fd)
+    try:
+        yield tmp
+        os.chmod(tmp, mode)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+# A validation problem is (location, message); location is a spec field path such as
+# "architect.raci_rows[0]" or a "path:line" for Markdown.
+Problem = tuple[str, str]
+
+RACI_COLUMNS = 5  # scene, R, A, C, I
+_AGENT_ID = re.compile(r"^[a-z0-9][a-z0-9-]*$")
+# Sections every agent doc must have content in; other list fields may be empty.
+REQUIRED_SECTIONS = frozenset(
+    {"scope_in", "inputs", "outputs", "responsibilities", "gates", "kpis", "upstream", "downstream", "raci_rows"}
+)
+
+
+def _check_str(value: object, where: str, problems: list[Problem], required: bool = True) -> None:
+    if not isinstance(value, str):
+        problems.append((where, f"expected a string, got {type(value).__name__}"))
+    elif required and not value.strip():
+        problems.append((where, "must not be empty"))
+
+
+def _check_str_list(value: object, where: str, problems: list[Problem], required: bool) -> None:
+    if not isinstance(value, list):
+        problems.append((where, f"expected a list of strings, got {type(value).__name__}"))
+        return
+    if required and not value:
+        problems.append((where, "must not be empty"))
+    for i, item in enumerate(value):
+        if not isinstance(item, str):
+            problems.append((f"{where}[{i}]", f"expected a string, got {type(item).__name__}"))
+
+
+def _check_responsibilities(value: object, where: str, problems: list[Problem], required: bool) -> None:
+    if not isinstance(value, list):
+        problems.append((where, f"expected a list of objects, got {type(value).__name__}"))
+        return
+    if required and not value:
+        problems.append((where, "must not be empty"))
+    for i, r in enumerate(value):
+        at = f"{where}[{i}]"
+        if not isinstance(r, dict):
+            problems.append((at, f"expected an object, got {type(r).__name__}"))
+            continue
+        for key in r.keys() - _RESPONSIBILITY_FIELDS:
+            problems.append((f"{at}.{key}", "unknown field"))
+        for key in ("title", "duration"):
+            if key not in r:
+                problems.append((f"{at}.{key}", "missing"))
+            else:
+                _check_str(r[key], f"{at}.{key}", problems)
+        for key in ("steps", "metrics", "dod"):
+            if key not in r:
+                problems.append((f"{at}.{key}", "missing"))
+            else:
+                _check_str_list(r[key], f"{at}.{key}", problems, required=True)
+
+
+def _check_tools(value: object, where: str, problems: list[Problem], required: bool) -> None:
+    if not isinstance(value, dict):
+        problems.append((where, f"expected an object of string lists, got {type(value).__name__}"))
+        return
+    for group, items in value.items():
+        _check_str_list(items, f"{where}.{group}", problems, required=True)
+
+
+def _check_rows(width: int) -> Callable[[object, str, list[Problem], bool], None]:
+    def check(value: object, where: str, problems: list[Problem], required: bool) -> None:
+        if not isinstance(value, list):
+            problems.append((where, f"expected a list of rows, got {type(value).__name__}"))
+            return
+        if required and not value:
+            problems.append((where, "must not be empty"))
+        for i, row in enumerate(value):
+            at = f"{where}[{i}]"
+            if not isinstance(row, (list, tuple)):
+                problems.append((at, f"expected a row of {width} strings, got {type(row).__name__}"))
+            elif len(row) != width:
+                problems.append((at, f"expected {width} fields, got {len(row)}"))
+            else:
+                for j, cell in enumerate(row):
+                    _check_str(cell, f"{at}[{j}]", problems)
+
+    return check
+
+
+_RESPONSIBILITY_FIELDS = frozenset({"title", "duration", "steps", "metrics", "dod"})
+SPEC_SCHEMA: dict[str, Callable[[object, str, list[Problem], bool], None]] = {
+    "agent_id": _check_str,
+    "title": _check_str,
+    "role_desc": _check_str,
+    "scope_in": _check_str_list,
+    "scope_out": _check_str_list,
+    "inputs": _check_str_list,
+    "outputs": _check_str_list,
+    "missing_questions": _check_str_list,
+    "responsibilities": _check_responsibilities,
+    "tools": _check_tools,
+    "gates": _check_str_list,
+    "templates": _check_rows(2),
+    "kpis": _check_str_list,
+    "upstream": _check_str_list,
+    "downstream": _check_str_list,
+    "raci_rows": _check_rows(RACI_COLUMNS),
+    "initial_note": _check_str,
+}
+_TEXT_REQUIRED = frozenset({"agent_id", "title", "role_desc"})
+
+
+def flat_schema(texts: tuple[str, ...], lists: tuple[str, ...]) -> dict[str, Callable[[object, str, list[Problem], bool], None]]:
+    """A schema of string fields and string-list fields, for doc kinds without nested sections."""
+    return {**{k: _check_str for k in texts}, **{k: _check_str_list for k in lists}}
+
+
+def check_schema(
+    data: object, doc_id: str, schema: dict, required: frozenset[str], id_field: str, where: str | None = None
+) -> list[Problem]:
+    """Check raw catalog data for one spec against `schema`; problems are located under `where` (default: doc_id)."""
+    where = where or doc_id
+    if not isinstance(data, dict):
+        return [(where, f"expected an object, got {type(data).__name__}")]
+    problems: list[Problem] = []
+    for key in data.keys() - schema.keys():
+        problems.append((f"{where}.{key}", "unknown field"))
+    for key, check in schema.items():
+        if key not in data:
+            problems.append((f"{where}.{key}", "missing"))
+            continue
+        check(data[key], f"{where}.{key}", problems, key in required)
+    value = data.get(id_field)
+    if isinstance(value, str) and value:
+        if value != doc_id:
+            problems.append((f"{where}.{id_field}", f"{value!r} does not match index key {doc_id!r}"))
+        elif not _AGENT_ID.match(value):
+            problems.append((f"{where}.{id_field}", "must be lowercase letters, digits and hyphens"))
+    return problems
+
+
+def validate_spec_data(data: object, agent_id: str) -> list[Problem]:
+    """Check raw catalog data for one spec against SPEC_SCHEMA; returns every problem found."""
+    return check_schema(data, agent_id, SPEC_SCHEMA, REQUIRED_SECTIONS | _TEXT_REQUIRED, "agent_id")
+
+
+def _strs(items: list[str]) -> Strs:
+    return tuple(map(intern, items))
+
+
+def spec_from_dict(data: dict) -> AgentSpec:
+    return AgentSpec(
+        agent_id=intern(data["agent_id"]),
+        title=data["title"],
+        role_desc=data["role_desc"],
+        scope_in=_strs(data["scope_in"]),
+        scope_out=_strs(data["scope_out"]),
+        inputs=_strs(data["inputs"]),
+        outputs=_strs(data["outputs"]),
+        missing_questions=_strs(data["missing_questions"]),
+        responsibilities=tuple(
+            Responsibility(
+                title=intern(r["title"]),
+                duration=intern(r["duration"]),
+                steps=_strs(r["steps"]),
+                metrics=_strs(r["metrics"]),
+                dod=_strs(r["dod"]),
+            )
+            for r in data["responsibilities"]
+        ),
+        tools={intern(k): _strs(v) for k, v in data["tools"].items()},
+        gates=_strs(data["gates"]),
+        templates=tuple((intern(t), intern(body)) for t, body in data["templates"]),
+        kpis=_strs(data["kpis"]),
+        upstream=_strs(data["upstream"]),
+        downstream=_strs(data["downstream"]),
+        raci_rows=tuple(_strs(row) for row in data["raci_rows"]),
+        initial_note=intern(data["initial_note"]),
+    )
+
+
+def spec_to_dict(spec: AgentSpec) -> dict:
+    """Inverse of spec_from_dict(): the JSON-ready catalog form of a spec."""
+    return _plain(asdict(spec))
+
+
+def _plain(value):
+    if isinstance(value, dict):
+        return {k: _plain(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_plain(v) for v in value]
+    return value
+
+
+def _unique_keys(pairs: list[tuple[str, object]]) -> dict:
+    keys = [k for k, _ in pairs]
+    dupes = sorted({k for k in keys if keys.count(k) > 1}) if len(set(keys)) != len(keys) else []
+    if dupes:
+        raise ValueError(f"duplicate key(s) {', '.join(dupes)}")
+    return dict(pairs)
+
+
+class Catalog:
+    """Spec catalog: `index.json` maps agent_id -> spec file; specs are parsed on first use.
+
+    Other doc kinds subclass this with their own index.json section, id field, schema
+    and spec type (see agent_kinds).
+    """
+
+    kind = "agents"  # index.json section
+    id_field = "agent_id"
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        path = root / "index.json"
+        try:
+            # json.loads would silently keep the last of two entries for one agent_id.
+            index = json.loads(path.read_text(encoding="utf-8"), object_pairs_hook=_unique_keys)
+        except ValueError as e:
+            raise ValueError(f"{path}: {e}") from e
+        self.index: dict[str, Path] = {aid: root / rel for aid, rel in index.get(self.kind, {}).items()}
+        self._specs: dict[str, AgentSpec] = {}
+
+    def where(self, doc_id: str) -> str:
+        """How problems locate a spec; agents by their bare id."""
+        return doc_id
+
+    def check(self, data: object, doc_id: str) -> list[Problem]:
+        return validate_spec_data(data, doc_id)
+
+    def build(self, data: dict) -> AgentSpec:
+        return spec_from_dict(data)
+
+    def ids(self) -> list[str]:
+        return list(self.index)
+
+    def __contains__(self, agent_id: object) -> bool:
+        return agent_id in self.index
+
+    def path(self, agent_id: str) -> Path:
+        return self.index[agent_id]
+
+    def source_hash(self, agent_id: str) -> str:
+        return hashlib.sha256(self.index[agent_id].read_bytes()).hexdigest()
+
+    def locales(self) -> list[str]:
+        """The default locale plus every bundle in locales/."""
+        found = sorted(p.stem for p in (self.root / "locales").glob("*.json"))
+        return [DEFAULT_LOCALE] + [code for code in found if code != DEFAULT_LOCALE]
+
+    def labels(self, code: str) -> Labels:
+        """Labels for `code` from locales/<code>.json; the built-in ZH_CN if there is no such file."""
+        path = self.root / "locales" / f"{code}.json"
+        if code == DEFAULT_LOCALE and not path.exists():
+            return ZH_CN
+        try:
+            bundle = json.loads(path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            raise ValueError(f"unknown locale {code!r} (no {path})") from None
+        except ValueError as e:
+            raise ValueError(f"{path}: {e}") from e
+        fields = set(Labels._fields) - {"code"}
+        problems = [f"{k}: unknown label" for k in bundle if k not in fields]
+        problems += [f"{k}: missing" for k in sorted(fields - bundle.keys())]
+        problems += [f"{k}: expected a string" for k, v in bundle.items() if k in fields and not isinstance(v, str)]
+        if not problems:
+            try:
+                return make_labels(code, bundle)
+            except (KeyError, IndexError, ValueError) as e:
+                problems.append(f"bad placeholder {e} (use {{base_link}} or {{metrics_link}})")
+        raise ValueError(f"{path}: " + "; ".join(problems))
+
+    def get(self, agent_id: str) -> AgentSpec:
+        spec = self._specs.get(agent_id)
+        if spec is None:
+            path = self.index[agent_id]
+            data = read_spec_file(path)
+            # As in validate(): the id is required and must match the index key.
+            if self.id_field not in data:
+                raise ValueError(f"{path}: {self.id_field} missing")
+            if data[self.id_field] != agent_id:
+                raise ValueError(f"{path}: {self.id_field} {data[self.id_field]!r} does not match index key {agent_id!r}")
+            spec = self._specs[agent_id] = self.build(data)
+        return spec
+
+    def validate(self, agent_ids: list[str] | None = None) -> dict[str, list[Problem]]:
+        """Parse and schema-check specs in one sweep; return problems per invalid agent.
+
+        Valid specs are cached, so a following get() does not parse them again.
+        """
+        invalid: dict[str, list[Problem]] = {}
+        sources: dict[Path, str] = {}
+        for agent_id in self.ids() if agent_ids is None else agent_ids:
+            path = self.index[agent_id]
+            if path in sources:
+                invalid[agent_id] = [(self.where(agent_id), f"shares spec file {path.name} with {sources[path]}")]
+                continue
+            sources[path] = agent_id
+            if agent_id in self._specs:
+                continue
+            try:
+                data = read_spec_file(path)
+            except (OSError, ValueError, RuntimeError) as e:
+                invalid[agent_id] = [(self.where(agent_id), f"cannot read {path}: {e}")]
+                continue
+            problems = self.check(data, agent_id)
+            if problems:
+                invalid[agent_id] = problems
+            else:
+                self._specs[agent_id] = self.build(data)
+        return invalid
+
+    def invalidate(self, agent_id: str | None = None) -> None:
+        """Drop parsed specs (one, or all) so the next get() re-reads the file."""
+        if agent_id is None:
+            self._specs.clear()
+        else:
+            self._specs.pop(agent_id, None)
+
+    def load(self, agent_ids: list[str] | None = None) -> list[AgentSpec]:
+        return [self.get(aid) for aid in (self.ids() if agent_ids is None else agent_ids)]
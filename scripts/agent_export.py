@@ -0,0 +1,146 @@
+"""Export specs and rendered docs as one artifact: JSON, streaming JSONL or SQLite.
+
+Downstream tools load a single file instead of globbing and re-parsing agents/*.md.
+Every record holds the structured spec (the catalog's JSON form), the locale and the
+rendered Markdown; SQLite additionally splits docs into `##` sections and indexes
+tool and role keywords. Files are written to a temp path and renamed into place.
+"""
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from agent_docs import AgentSpec, FragmentCache, Labels, Layout, atomic_path, render_agent, spec_to_dict
+from agent_links import handoff_role, role_names
+
+EXPORT_VERSION = 1
+FORMATS = {".json": "json", ".jsonl": "jsonl", ".sqlite": "sqlite", ".sqlite3": "sqlite", ".db": "sqlite"}
+
+SQLITE_SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE agents (
+    agent_id TEXT NOT NULL,
+    locale TEXT NOT NULL,
+    title TEXT NOT NULL,
+    spec TEXT NOT NULL,
+    markdown TEXT NOT NULL,
+    PRIMARY KEY (agent_id, locale)
+);
+CREATE TABLE sections (
+    agent_id TEXT NOT NULL,
+    locale TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    heading TEXT NOT NULL,
+    markdown TEXT NOT NULL,
+    PRIMARY KEY (agent_id, locale, position)
+);
+CREATE INDEX sections_heading ON sections (heading, agent_id);
+CREATE TABLE keywords (
+    keyword TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    agent_id TEXT NOT NULL,
+    PRIMARY KEY (keyword, kind, agent_id)
+);
+CREATE INDEX keywords_agent ON keywords (agent_id);
+"""
+
+
+def export_format(path: Path, fmt: str | None = None) -> str:
+    if fmt:
+        return fmt
+    try:
+        return FORMATS[path.suffix.lower()]
+    except KeyError:
+        raise ValueError(f"cannot tell the export format from {path.name!r}; use --export-format") from None
+
+
+def records(specs: Iterable[AgentSpec], bundles: list[Labels], layout: Layout, generator: str) -> Iterator[dict]:
+    """One record per (spec, locale), rendered on demand so JSONL/SQLite never hold them all."""
+    cache = FragmentCache()
+    for spec in specs:
+        data = spec_to_dict(spec)
+        for labels in bundles:
+            yield {
+                "agent_id": spec.agent_id,
+                "locale": labels.code,
+                "generator": generator,
+                "spec": data,
+                "markdown": render_agent(spec, cache=cache, labels=labels, layout=layout),
+            }
+
+
+def split_sections(markdown: str) -> list[tuple[str, str]]:
+    """(heading, text) per `## ` section; the frontmatter/title/role part gets heading ""."""
+    sections: list[tuple[str, str]] = []
+    heading, lines, fence = "", [], False
+    for line in markdown.splitlines(keepends=True):
+        if line.startswith("```"):
+            fence = not fence
+        if not fence and line.startswith("## "):
+            sections.append((heading, "".join(lines).strip("\n")))
+            heading, lines = line[3:].strip(), []
+        lines.append(line)
+    sections.append((heading, "".join(lines).strip("\n")))
+    return sections
+
+
+def keywords(spec: dict, roles: dict[str, list[str] | None]) -> set[tuple[str, str]]:
+    """(keyword, kind) pairs of a spec dict: tool groups, tools and the roles named in handoffs and RACI rows."""
+    found = {(group, "tool_group") for group in spec["tools"]}
+    found.update((tool, "tool") for tools in spec["tools"].values() for tool in tools)
+    refs = [role for item in spec["upstream"] + spec["downstream"] if (role := handoff_role(item)) is not None]
+    refs += [cell for row in spec["raci_rows"] for cell in row[1:]]
+    found.update((name, "role") for ref in refs for name in role_names(ref, roles))
+    return found
+
+
+def write_json(path: Path, items: Iterable[dict]) -> int:
+    with atomic_path(path) as tmp, open(tmp, "w", encoding="utf-8") as f:
+        agents = list(items)
+        json.dump({"version": EXPORT_VERSION, "agents": agents}, f, ensure_ascii=False)
+    return len(agents)
+
+
+def write_jsonl(path: Path, items: Iterable[dict]) -> int:
+    n = 0
+    with atomic_path(path) as tmp, open(tmp, "w", encoding="utf-8") as f:
+        for n, item in enumerate(items, 1):
+            f.write(json.dumps(item, ensure_ascii=False))
+            f.write("\n")
+    return n
+
+
+def write_sqlite(path: Path, items: Iterable[dict], roles: dict[str, list[str] | None]) -> int:
+    import sqlite3
+
+    n = 0
+    with atomic_path(path) as tmp:
+        db = sqlite3.connect(tmp)
+        try:
+            db.executescript(SQLITE_SCHEMA)
+            db.execute("INSERT INTO meta VALUES ('version', ?)", (str(EXPORT_VERSION),))
+            indexed: set[str] = set()
+            for n, item in enumerate(items, 1):
+                agent_id, locale, spec = item["agent_id"], item["locale"], item["spec"]
+                db.execute(
+                    "INSERT INTO agents VALUES (?, ?, ?, ?, ?)",
+                    (agent_id, locale, spec["title"], json.dumps(spec, ensure_ascii=False), item["markdown"]),
+                )
+                db.executemany(
+                    "INSERT INTO sections VALUES (?, ?, ?, ?, ?)",
+                    [(agent_id, locale, i, h, text) for i, (h, text) in enumerate(split_sections(item["markdown"]))],
+                )
+                # Keywords come from the spec, so they are the same for every locale.
+                if agent_id not in indexed:
+                    indexed.add(agent_id)
+                    db.executemany(
+                        "INSERT INTO keywords VALUES (?, ?, ?)",
+                        [(kw, kind, agent_id) for kw, kind in sorted(keywords(spec, roles))],
+                    )
+                if n == 1:
+                    db.execute("INSERT INTO meta VALUES ('generator', ?)", (item["generator"],))
+            db.commit()
+        finally:
+            db.close()
+    return n
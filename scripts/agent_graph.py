@@ -0,0 +1,269 @@
+"""The collaboration graph behind upstream/downstream handoffs and RACI rows.
+
+Nodes are catalog agents, the external roles of catalog/roles.json (PM, 全体, ...) and any
+name a spec uses that roles.json does not know. Role references resolve like
+agent_links.check_roles does: aliases to their agent, groups (开发) to every member,
+"开发/DevOps" to both. An upstream bullet `QA：测试报告` of agent X is a handoff edge
+QA -> X, a downstream bullet of X an edge X -> role; each RACI cell is an R/A/C/I edge from
+the agent whose table it is to the role, labelled with the scene.
+
+The graph is adjacency lists built once per run; every analysis is linear in edges:
+reachability is one BFS per queried node (memoized), cycles are the strongly connected
+components of the handoff edges (iterative Tarjan), orphans are nodes without edges.
+"""
+from __future__ import annotations
+
+from typing import Iterable, NamedTuple
+
+from agent_docs import AgentSpec
+from agent_links import handoff_role, role_names
+
+HANDOFF = "handoff"
+
+
+class Edge(NamedTuple):
+    src: int
+    dst: int
+    kind: str  # handoff, or the RACI letter
+    label: str  # what is handed off, or the RACI scene
+    where: str  # spec field it came from, e.g. qa-engineer.downstream[0]
+
+
+class RoleGraph:
+    def __init__(self) -> None:
+        self.names: list[str] = []
+        self.kinds: list[str] = []  # agent, external or unknown
+        self.index: dict[str, int] = {}
+        self.edges: list[Edge] = []
+        self.out: list[list[int]] = []  # node -> indices into edges
+        self.into: list[list[int]] = []
+        self._reach: dict[tuple[int, bool], list[int]] = {}
+
+    def node(self, name: str, kind: str) -> int:
+        n = self.index.get(name)
+        if n is None:
+            n = self.index[name] = len(self.names)
+            self.names.append(name)
+            self.kinds.append(kind)
+            self.out.append([])
+            self.into.append([])
+        return n
+
+    def add(self, src: int, dst: int, kind: str, label: str, where: str) -> None:
+        self.out[src].append(len(self.edges))
+        self.into[dst].append(len(self.edges))
+        self.edges.append(Edge(src, dst, kind, label, where))
+
+    def neighbours(self, n: int, downstream: bool = True, kinds: Iterable[str] = (HANDOFF,)) -> list[Edge]:
+        kinds = set(kinds)
+        return [e for e in map(self.edges.__getitem__, (self.out if downstream else self.into)[n]) if e.kind in kinds]
+
+    def reachable(self, n: int, downstream: bool = True) -> list[int]:
+        """Nodes reachable from `n` over handoff edges, nearest first (not `n` itself)."""
+        key = (n, downstream)
+        found = self._reach.get(key)
+        if found is None:
+            adjacency, end = (self.out, "dst") if downstream else (self.into, "src")
+            seen = {n}
+            found = []
+            frontier = [n]
+            while frontier:
+                nxt = []
+                for m in frontier:
+                    for e in adjacency[m]:
+                        edge = self.edges[e]
+                        if edge.kind != HANDOFF:
+                            continue
+                        other = getattr(edge, end)
+                        if other not in seen:
+                            seen.add(other)
+                            found.append(other)
+                            nxt.append(other)
+                frontier = nxt
+            self._reach[key] = found
+        return found
+
+    def cycles(self) -> list[list[int]]:
+        """Handoff cycles: strongly connected components with more than one node, in node order."""
+        succ = [[self.edges[e].dst for e in out if self.edges[e].kind == HANDOFF] for out in self.out]
+        index = [-1] * len(self.names)
+        low = [0] * len(self.names)
+        on_stack = [False] * len(self.names)
+        stack: list[int] = []
+        components: list[list[int]] = []
+        counter = 0
+        for root in range(len(self.names)):
+            if index[root] >= 0:
+                continue
+            # Iterative Tarjan: (node, next successor position) frames instead of recursion.
+            work = [(root, 0)]
+            while work:
+                v, i = work.pop()
+                if i == 0:
+                    index[v] = low[v] = counter
+                    counter += 1
+                    stack.append(v)
+                    on_stack[v] = True
+                recurse = False
+                for j in range(i, len(succ[v])):
+                    w = succ[v][j]
+                    if index[w] < 0:
+                        work.append((v, j + 1))
+                        work.append((w, 0))
+                        recurse = True
+                        break
+                    if on_stack[w]:
+                        low[v] = min(low[v], index[w])
+                if recurse:
+                    continue
+                if low[v] == index[v]:
+                    component = []
+                    while True:
+                        w = stack.pop()
+                        on_stack[w] = False
+                        component.append(w)
+                        if w == v:
+                            break
+                    if len(component) > 1:
+                        components.append(sorted(component))
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[v])
+        return sorted(components)
+
+    def shortest_cycle(self, component: list[int]) -> list[int]:
+        """A shortest handoff loop through the first node of a cycle component (BFS inside it)."""
+        start, members = component[0], set(component)
+        parent = {start: start}
+        frontier = [start]
+        while frontier:
+            nxt = []
+            for m in frontier:
+                for e in self.out[m]:
+                    edge = self.edges[e]
+                    if edge.kind != HANDOFF or edge.dst not in members:
+                        continue
+                    if edge.dst == start:
+                        path = [m]
+                        while path[-1] != start:
+                            path.append(parent[path[-1]])
+                        return path[::-1]
+                    if edge.dst not in parent:
+                        parent[edge.dst] = m
+                        nxt.append(edge.dst)
+            frontier = nxt
+        return [start]
+
+    def orphans(self) -> list[int]:
+        """Known roles (agents and roles.json externals) that no handoff or RACI row mentions."""
+        return [n for n in range(len(self.names)) if not self.out[n] and not self.into[n]]
+
+    def to_json(self) -> dict:
+        return {
+            "nodes": [{"id": name, "kind": kind} for name, kind in zip(self.names, self.kinds)],
+            "edges": [
+                {"from": self.names[e.src], "to": self.names[e.dst], "kind": e.kind, "label": e.label, "where": e.where}
+                for e in self.edges
+            ],
+            "cycles": [[self.names[n] for n in c] for c in self.cycles()],
+            "orphans": [self.names[n] for n in self.orphans()],
+        }
+
+    def to_dot(self) -> str:
+        """Graphviz DOT: agents as boxes, other roles as ellipses (unknown ones red); parallel
+        edges of one kind are merged with their labels joined; RACI edges are dotted."""
+        shapes = {"agent": "shape=box", "external": "shape=ellipse", "unknown": "shape=ellipse, color=red"}
+        lines = ["digraph roles {", "  rankdir=LR;"]
+        lines += [f"  {_dot_id(name)} [{shapes[kind]}];" for name, kind in zip(self.names, self.kinds)]
+        merged: dict[tuple[int, int, str], list[str]] = {}
+        for e in self.edges:
+            labels = merged.setdefault((e.src, e.dst, e.kind), [])
+            if e.label and e.label not in labels:
+                labels.append(e.label)
+        for (src, dst, kind), labels in merged.items():
+            text = "；".join(labels) if kind == HANDOFF else f"{kind}: " + "；".join(labels)
+            style = "" if kind == HANDOFF else ", style=dotted"
+            lines.append(f"  {_dot_id(self.names[src])} -> {_dot_id(self.names[dst])} [label={_dot_id(text)}{style}];")
+        lines.append("}")
+        return "\n".join(lines) + "\n"
+
+
+def _dot_id(text: str) -> str:
+    return '"' + text.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def build_graph(specs: Iterable[AgentSpec], roles: dict[str, list[str] | None]) -> RoleGraph:
+    """The graph of `specs`, with role names resolved through `roles` (agent_links.load_roles)."""
+    specs = list(specs)
+    graph = RoleGraph()
+    for spec in specs:
+        graph.node(spec.agent_id, "agent")
+    for name, ids in roles.items():
+        if ids is None:
+            graph.node(name, "external")
+
+    resolved: dict[str, list[int]] = {}  # references repeat across specs (PM, 全体, 开发/DevOps)
+
+    def resolve(ref: str) -> list[int]:
+        found = resolved.get(ref)
+        if found is not None:
+            return found
+        found = resolved[ref] = []
+        for name in role_names(ref, roles):
+            ids = roles.get(name, [name])
+            if ids is None:
+                found.append(graph.node(name, "external"))
+                continue
+            for aid in ids:
+                n = graph.index.get(aid)
+                found.append(graph.node(aid, "unknown") if n is None else n)
+        return found
+
+    for spec in specs:
+        me = graph.index[spec.agent_id]
+        for field, downstream in (("upstream", False), ("downstream", True)):
+            for i, item in enumerate(getattr(spec, field)):
+                role = handoff_role(item)
+                if role is None:
+                    continue
+                label = item[len(role) + 1:].strip()
+                for other in resolve(role):
+                    # A group naming the agent itself (开发 for a developer) is not a handoff.
+                    if other != me:
+                        src, dst = (me, other) if downstream else (other, me)
+                        graph.add(src, dst, HANDOFF, label, f"{spec.agent_id}.{field}[{i}]")
+        for i, (scene, *cells) in enumerate(spec.raci_rows):
+            for letter, cell in zip("RACI", cells):
+                for other in resolve(cell):
+                    graph.add(me, other, letter, scene, f"{spec.agent_id}.raci_rows[{i}].{letter}")
+    return graph
+
+
+def describe(graph: RoleGraph, name: str) -> list[str]:
+    """Report lines for one node: direct and transitive handoffs both ways, and its RACI roles."""
+    n = graph.index[name]
+
+    def direct(downstream: bool) -> str:
+        edges = graph.neighbours(n, downstream)
+        labelled: dict[str, list[str]] = {}
+        for e in edges:
+            labels = labelled.setdefault(graph.names[e.dst if downstream else e.src], [])
+            if e.label and e.label not in labels:
+                labels.append(e.label)
+        return ", ".join(f"{other} ({'；'.join(labels)})" if labels else other for other, labels in labelled.items()) or "-"
+
+    def names(nodes: list[int]) -> str:
+        return ", ".join(graph.names[m] for m in nodes) or "-"
+
+    raci = [
+        f"{e.kind} in {e.label} ({graph.names[e.src]})"
+        for e in map(graph.edges.__getitem__, graph.into[n]) if e.kind != HANDOFF
+    ]
+    return [
+        f"{name} ({graph.kinds[n]})",
+        f"  receives from:        {direct(False)}",
+        f"  hands off to:         {direct(True)}",
+        f"  depends on (all):     {names(graph.reachable(n, downstream=False))}",
+        f"  depended on by (all): {names(graph.reachable(n))}",
+        f"  RACI:                 {'; '.join(raci) or '-'}",
+    ]
@@ -0,0 +1,258 @@
+"""Full-text index over the agent catalog: which agents have a gate, KPI, tool, RACI row or
+template mentioning a phrase.
+
+Entries are the items of those sections (one gate, one KPI, one tool, one RACI row, one
+template); postings map normalized tokens to entries. Latin text is split into words. CJK
+text has no spaces, so it is split into overlapping character bigrams plus the last
+character of each run: any phrase of two or more characters is found through its bigrams
+and a single character through a prefix range, without a dictionary. A query walks the
+postings of its rarest token, probes the others by primary key and confirms the phrase in
+the entry text, so it touches only what it returns.
+
+The index lives in SQLite next to the manifest and is updated per agent: only agents whose
+spec hash changed are re-tokenized.
+"""
+from __future__ import annotations
+
+import json
+import re
+import unicodedata
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, NamedTuple
+
+from agent_docs import AgentSpec
+
+INDEX_VERSION = 1
+SECTIONS = ("gates", "kpis", "tools", "raci", "templates")
+RACI_ROLES = ("R", "A", "C", "I")
+
+SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE docs (doc INTEGER PRIMARY KEY, agent_id TEXT NOT NULL UNIQUE, hash TEXT NOT NULL);
+CREATE TABLE entries (
+    entry INTEGER PRIMARY KEY,
+    doc INTEGER NOT NULL,
+    section TEXT NOT NULL,
+    text TEXT NOT NULL,
+    fields TEXT NOT NULL
+);
+CREATE INDEX entries_doc ON entries (doc);
+CREATE TABLE postings (
+    token TEXT NOT NULL,
+    section TEXT NOT NULL,
+    entry INTEGER NOT NULL,
+    PRIMARY KEY (token, section, entry)
+) WITHOUT ROWID;
+"""
+
+# Hiragana/katakana, CJK ideographs (with extension A and compatibility), Hangul syllables.
+_CJK = "぀-ヿ㐀-䶿一-鿿豈-﫿가-힯"
+_RUNS = re.compile(f"([{_CJK}]+)|([^\\W_{_CJK}]+)")
+# Stop counting a token's postings here when picking the rarest one to drive a query.
+_RARITY_CAP = 1000
+
+
+class Hit(NamedTuple):
+    agent_id: str
+    section: str
+    text: str
+    fields: tuple[str, ...]  # tools: (group,); raci: (R, A, C, I); templates: (body,)
+
+
+def normalize(text: str) -> str:
+    """NFKC (full-width forms to ASCII, e.g. `（Ｇｏ）` -> `(go)`) and case-folded."""
+    return unicodedata.normalize("NFKC", text).casefold()
+
+
+@lru_cache(maxsize=65536)  # tool names, roles and scenes repeat across agents
+def tokens(text: str) -> frozenset[str]:
+    """Index tokens of `text`: Latin words, CJK bigrams and the last character of each CJK run."""
+    found: set[str] = set()
+    for cjk, word in _RUNS.findall(normalize(text)):
+        if word:
+            found.add(word)
+        else:
+            found.update(cjk[i:i + 2] for i in range(len(cjk) - 1))
+            found.add(cjk[-1])
+    return frozenset(found)
+
+
+def query_tokens(text: str) -> list[tuple[str, bool]]:
+    """(token, is_prefix) pairs a phrase must match: words and bigrams exactly, a lone CJK
+    character as the prefix of a bigram (or the run-final character itself)."""
+    found: dict[str, bool] = {}
+    for cjk, word in _RUNS.findall(normalize(text)):
+        if word:
+            found[word] = False
+        elif len(cjk) == 1:
+            found[cjk] = True
+        else:
+            found.update((cjk[i:i + 2], False) for i in range(len(cjk) - 1))
+    return list(found.items())
+
+
+def entries(spec: AgentSpec) -> Iterator[tuple[str, str, tuple[str, ...]]]:
+    """(section, text, fields) of every indexed item of a spec."""
+    for gate in spec.gates:
+        yield "gates", gate, ()
+    for kpi in spec.kpis:
+        yield "kpis", kpi, ()
+    for group, tools in spec.tools.items():
+        for tool in tools:
+            yield "tools", tool, (group,)
+    for scene, *roles in spec.raci_rows:
+        yield "raci", scene, tuple(roles)
+    for title, body in spec.templates:
+        yield "templates", title, (body,)
+
+
+def _haystack(text: str, fields: Iterable[str]) -> str:
+    return normalize("\n".join([text, *fields]))
+
+
+def connect(path: Path, create: bool = False):
+    """Open the index; with `create`, (re)build an empty one if it is missing or outdated."""
+    import sqlite3
+
+    if not create and not path.exists():
+        raise FileNotFoundError(path)
+    db = sqlite3.connect(path)
+    try:
+        version = db.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+    except sqlite3.DatabaseError:  # no meta table, or not an SQLite file at all
+        version = None
+    if version != (str(INDEX_VERSION),):
+        if not create:
+            db.close()
+            raise ValueError(f"{path}: index format is outdated; regenerate to rebuild it")
+        db.close()
+        path.unlink()
+        db = sqlite3.connect(path)
+        db.executescript(SCHEMA)
+        db.execute("INSERT INTO meta VALUES ('version', ?)", (str(INDEX_VERSION),))
+        db.commit()
+    return db
+
+
+def update(
+    path: Path, hashes: dict[str, str], load: Callable[[str], AgentSpec], keep: set[str], force: bool = False
+) -> tuple[int, int]:
+    """Re-index the agents in `hashes` whose hash differs from the indexed one (all of them
+    with `force`) and drop indexed agents not in `keep`; return (re-indexed, dropped)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    db = connect(path, create=True)
+    try:
+        indexed = dict(db.execute("SELECT agent_id, hash FROM docs"))
+        stale = [aid for aid in indexed if aid not in keep]
+        changed = [aid for aid, digest in hashes.items() if force or indexed.get(aid) != digest]
+        if not stale and not changed:
+            return 0, 0
+        # The postings tree outgrows SQLite's default 2 MiB page cache after a few thousand agents.
+        db.execute("PRAGMA cache_size = -65536")
+        with db:
+            for aid in stale + [aid for aid in changed if aid in indexed]:
+                _drop(db, aid)
+            entry = db.execute("SELECT coalesce(max(entry), 0) FROM entries").fetchone()[0]
+            for aid in changed:
+                doc = db.execute("INSERT INTO docs (agent_id, hash) VALUES (?, ?)", (aid, hashes[aid])).lastrowid
+                rows = [
+                    (entry, doc, section, text, fields)
+                    for entry, (section, text, fields) in enumerate(entries(load(aid)), entry + 1)
+                ]
+                db.executemany(
+                    "INSERT INTO entries VALUES (?, ?, ?, ?, ?)",
+                    [(*row[:4], json.dumps(row[4], ensure_ascii=False)) for row in rows],
+                )
+                db.executemany(
+                    "INSERT INTO postings VALUES (?, ?, ?)",
+                    [(token, section, n) for n, _, section, text, fields in rows for token in tokens("\n".join([text, *fields]))],
+                )
+                entry += len(rows)
+        return len(changed), len(stale)
+    finally:
+        db.close()
+
+
+def _drop(db, agent_id: str) -> None:
+    # Postings are keyed by token, so re-tokenize the stored entries to delete them by key
+    # instead of keeping a second index on postings.entry.
+    (doc,) = db.execute("SELECT doc FROM docs WHERE agent_id = ?", (agent_id,)).fetchone()
+    old = db.execute("SELECT entry, section, text, fields FROM entries WHERE doc = ?", (doc,)).fetchall()
+    db.executemany(
+        "DELETE FROM postings WHERE token = ? AND section = ? AND entry = ?",
+        [
+            (token, section, entry)
+            for entry, section, text, fields in old
+            for token in tokens("\n".join([text, *json.loads(fields)]))
+        ],
+    )
+    db.execute("DELETE FROM entries WHERE doc = ?", (doc,))
+    db.execute("DELETE FROM docs WHERE doc = ?", (doc,))
+
+
+def _match(column: str, token: str, prefix: bool) -> tuple[str, list[str]]:
+    if prefix:
+        return f"{column} >= ? AND {column} < ?", [token, chr(ord(token) + 1)]
+    return f"{column} = ?", [token]
+
+
+def search(path: Path, text: str, sections: Iterable[str] = SECTIONS, limit: int = 20) -> list[Hit]:
+    """Entries containing every whitespace-separated term of `text`, at most `limit`."""
+    sections = list(sections)
+    terms = [normalize(term) for term in text.split()]
+    wanted = list(dict.fromkeys(tok for term in terms for tok in query_tokens(term)))
+    if not wanted:
+        return []
+    db = connect(path)
+    try:
+        marks = ", ".join("?" * len(sections))
+
+        def rarity(item: tuple[str, bool]) -> int:
+            cond, params = _match("token", *item)
+            sql = f"SELECT count(*) FROM (SELECT 1 FROM postings WHERE {cond} AND section IN ({marks}) LIMIT ?)"
+            return db.execute(sql, [*params, *sections, _RARITY_CAP]).fetchone()[0]
+
+        ranked = sorted(wanted, key=rarity)
+        cond, params = _match("p0.token", *ranked[0])
+        sql = [
+            "SELECT d.agent_id, e.section, e.text, e.fields FROM postings p0",
+            "JOIN entries e ON e.entry = p0.entry JOIN docs d ON d.doc = e.doc",
+            f"WHERE {cond} AND p0.section IN ({marks})",
+        ]
+        params += sections
+        for token, prefix in ranked[1:]:
+            cond, more = _match("p.token", token, prefix)
+            sql.append(f"AND EXISTS (SELECT 1 FROM postings p WHERE {cond} AND p.section = p0.section AND p.entry = p0.entry)")
+            params += more
+        hits: list[Hit] = []
+        seen: set[tuple] = set()
+        for agent_id, section, entry_text, fields in db.execute(" ".join(sql), params):
+            fields = tuple(json.loads(fields))
+            hay = _haystack(entry_text, fields)
+            # Tokens only narrow the candidates; the phrase itself must occur.
+            if all(term in hay for term in terms) and (agent_id, section, entry_text, fields) not in seen:
+                seen.add((agent_id, section, entry_text, fields))
+                hits.append(Hit(agent_id, section, entry_text, fields))
+                if len(hits) >= limit:
+                    break
+        return hits
+    finally:
+        db.close()
+
+
+def format_hit(hit: Hit, role: str | None = None, query: str = "") -> str:
+    """One result line: agent, section and the matching item (RACI: the scene and its roles)."""
+    if hit.section == "raci":
+        roles = dict(zip(RACI_ROLES, hit.fields))
+        shown = f"{role}: {roles[role]}" if role else " | ".join(f"{r}: {v}" for r, v in roles.items())
+        item = f"{hit.text} → {shown}"
+    elif hit.section == "tools":
+        item = f"{hit.text} ({hit.fields[0]})"
+    elif hit.section == "templates":
+        terms = [normalize(term) for term in query.split()]
+        line = next((ln.strip() for ln in hit.fields[0].splitlines() if any(t in normalize(ln) for t in terms)), "")
+        item = f"{hit.text}: {line}" if line else hit.text
+    else:
+        item = hit.text
+    return f"{hit.agent_id:<24} {hit.section:<10} {item}"
@@ -0,0 +1,287 @@
+"""Doc kinds beside agents: prompt and skill specs, their catalogs and renderers.
+
+Every kind has an index.json section, a meta-info/ template that orders its sections and
+an output directory (agents/, prompts/, skills/), and goes through the same pipeline:
+manifest, validation, fragment cache and parallel writes. Prompt and skill docs follow
+the layout of meta_prompt.md and meta_skill.md; their headings are the templates' own,
+so they are rendered in the default locale only.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Callable, NamedTuple
+
+from agent_docs import (
+    AGENT_LAYOUT, ZH_CN, AgentSpec, Catalog, FragmentCache, Labels, Layout, Problem, SectionTimer, Strs,
+    _untimed, check_schema, flat_schema, fm, render_agent, today,
+)
+
+
+@dataclass(frozen=True, slots=True)
+class PromptSpec:
+    prompt_id: str
+    title: str
+    description: str
+    goal: Strs
+    input_fields: Strs
+    input_defaults: Strs
+    output_fields: Strs
+    output_format: Strs
+    constraints: Strs
+    success_criteria: Strs
+    anti_patterns: Strs
+    example_inputs: Strs
+    example_outputs: Strs
+    initial_note: str
+
+
+@dataclass(frozen=True, slots=True)
+class SkillSpec:
+    skill_id: str
+    title: str
+    description: str
+    overview: Strs
+    inputs: Strs
+    outputs: Strs
+    preconditions: Strs
+    steps: Strs
+    constraints: Strs
+    tools: Strs
+    dod: Strs
+    example_inputs: Strs
+    example_outputs: Strs
+    initial_note: str
+
+
+DOC_VERSION = "0.1"
+DOC_FM = ("id", "name", "version", "last_updated", "language")
+
+# Headings and bold labels, as written in meta-info/meta_prompt.md and meta_skill.md.
+# Section names key the layouts; the other entries are labels inside sections.
+PROMPT_LABELS = {
+    "goal": "目标（Goal）",
+    "input": "输入（Input）",
+    "input_fields": "输入字段",
+    "input_defaults": "默认值/示例",
+    "output": "输出（Output）",
+    "output_fields": "输出字段",
+    "output_format": "格式要求",
+    "constraints": "约束与风格（Constraints & Style）",
+    "success": "成功标准（Success Criteria）",
+    "anti_patterns": "失败案例（Anti-Patterns）",
+    "examples": "示例（Examples）",
+    "example_inputs": "输入示例",
+    "example_outputs": "输出示例",
+    "changelog": "Changelog",
+}
+SKILL_LABELS = {
+    "overview": "技能概述",
+    "contract": "输入/输出契约（Contract）",
+    "inputs": "输入（Inputs）",
+    "outputs": "输出（Outputs）",
+    "preconditions": "前置条件",
+    "steps": "标准流程（Steps）",
+    "constraints": "约束与边界（Constraints）",
+    "tools": "工具与依赖（Tools & Dependencies）",
+    "dod": "验收标准（DoD）",
+    "examples": "示例（Examples）",
+    "example_inputs": "输入示例",
+    "example_outputs": "输出示例",
+    "changelog": "Changelog",
+}
+
+
+def bullets(heading: str, items: Strs) -> str:
+    return "\n".join([f"## {heading}", *[f"- {x}" for x in items]]) + "\n"
+
+
+def numbered(heading: str, items: Strs) -> str:
+    return "\n".join([f"## {heading}", *[f"{i}. {x}" for i, x in enumerate(items, 1)]]) + "\n"
+
+
+def labelled(heading: str, groups: tuple[tuple[str, Strs], ...]) -> str:
+    parts = [f"## {heading}"]
+    for i, (label, items) in enumerate(groups):
+        if i:
+            parts.append("")
+        parts.append(f"**{label}**{ZH_CN.colon}")
+        parts += [f"- {x}" for x in items]
+    return "\n".join(parts) + "\n"
+
+
+def doc_changelog(heading: str, initial_note: str, stamp: str) -> str:
+    return f"## {heading}\n- {stamp} v{DOC_VERSION} — {initial_note}\n"
+
+
+# (spec, section runner, labels, date stamp) -> that section, as in agent_docs.AGENT_SECTIONS.
+PROMPT_SECTIONS: dict[str, Callable[[PromptSpec, Callable[..., str], dict[str, str], str], str]] = {
+    "goal": lambda spec, t, H, stamp: t("bullets", bullets, H["goal"], spec.goal),
+    "input": lambda spec, t, H, stamp: t("labelled", labelled, H["input"], (
+        (H["input_fields"], spec.input_fields), (H["input_defaults"], spec.input_defaults),
+    )),
+    "output": lambda spec, t, H, stamp: t("labelled", labelled, H["output"], (
+        (H["output_fields"], spec.output_fields), (H["output_format"], spec.output_format),
+    )),
+    "constraints": lambda spec, t, H, stamp: t("bullets", bullets, H["constraints"], spec.constraints),
+    "success": lambda spec, t, H, stamp: t("bullets", bullets, H["success"], spec.success_criteria),
+    "anti_patterns": lambda spec, t, H, stamp: t("bullets", bullets, H["anti_patterns"], spec.anti_patterns),
+    "examples": lambda spec, t, H, stamp: t("labelled", labelled, H["examples"], (
+        (H["example_inputs"], spec.example_inputs), (H["example_outputs"], spec.example_outputs),
+    )),
+    "changelog": lambda spec, t, H, stamp: t("changelog", doc_changelog, H["changelog"], spec.initial_note, stamp),
+}
+SKILL_SECTIONS: dict[str, Callable[[SkillSpec, Callable[..., str], dict[str, str], str], str]] = {
+    "overview": lambda spec, t, H, stamp: t("bullets", bullets, H["overview"], spec.overview),
+    "contract": lambda spec, t, H, stamp: t("labelled", labelled, H["contract"], (
+        (H["inputs"], spec.inputs), (H["outputs"], spec.outputs), (H["preconditions"], spec.preconditions),
+    )),
+    "steps": lambda spec, t, H, stamp: t("numbered", numbered, H["steps"], spec.steps),
+    "constraints": lambda spec, t, H, stamp: t("bullets", bullets, H["constraints"], spec.constraints),
+    "tools": lambda spec, t, H, stamp: t("bullets", bullets, H["tools"], spec.tools),
+    "dod": lambda spec, t, H, stamp: t("bullets", bullets, H["dod"], spec.dod),
+    "examples": lambda spec, t, H, stamp: t("labelled", labelled, H["examples"], (
+        (H["example_inputs"], spec.example_inputs), (H["example_outputs"], spec.example_outputs),
+    )),
+    "changelog": lambda spec, t, H, stamp: t("changelog", doc_changelog, H["changelog"], spec.initial_note, stamp),
+}
+# Defaults matching meta_prompt.md and meta_skill.md; agent_template compiles the files themselves.
+PROMPT_LAYOUT = Layout(DOC_FM, tuple(PROMPT_SECTIONS))
+SKILL_LAYOUT = Layout(DOC_FM, tuple(SKILL_SECTIONS))
+
+
+def _render(
+    spec: PromptSpec | SkillSpec,
+    doc_id: str,
+    sections: dict[str, Callable],
+    H: dict[str, str],
+    timer: SectionTimer | None,
+    cache: FragmentCache | None,
+    layout: Layout,
+    stamp: str | None,
+) -> str:
+    # Laid out like the meta templates: a description under the title, sections split by rules.
+    t = timer.section(doc_id) if timer else _untimed
+    if cache is not None:
+        t = cache.wrap(t)
+    stamp = stamp or today()
+    values = {"id": doc_id, "name": spec.title, "version": DOC_VERSION, "last_updated": stamp, "language": ZH_CN.code}
+    head = t("fm", fm, **{k: values[k] for k in layout.fm}) + f"\n# {spec.title}\n\n{spec.description.strip()}\n"
+    return head + "".join("\n---\n\n" + sections[name](spec, t, H, stamp) for name in layout.sections)
+
+
+def render_prompt(
+    spec: PromptSpec,
+    timer: SectionTimer | None = None,
+    cache: FragmentCache | None = None,
+    labels: Labels = ZH_CN,
+    layout: Layout = PROMPT_LAYOUT,
+    stamp: str | None = None,
+) -> str:
+    return _render(spec, spec.prompt_id, PROMPT_SECTIONS, PROMPT_LABELS, timer, cache, layout, stamp)
+
+
+def render_skill(
+    spec: SkillSpec,
+    timer: SectionTimer | None = None,
+    cache: FragmentCache | None = None,
+    labels: Labels = ZH_CN,
+    layout: Layout = SKILL_LAYOUT,
+    stamp: str | None = None,
+) -> str:
+    return _render(spec, spec.skill_id, SKILL_SECTIONS, SKILL_LABELS, timer, cache, layout, stamp)
+
+
+_PROMPT_SCHEMA = flat_schema(
+    ("prompt_id", "title", "description", "initial_note"),
+    (
+        "goal", "input_fields", "input_defaults", "output_fields", "output_format", "constraints",
+        "success_criteria", "anti_patterns", "example_inputs", "example_outputs",
+    ),
+)
+_PROMPT_REQUIRED = frozenset({"prompt_id", "title", "description", "goal", "input_fields", "output_fields", "success_criteria"})
+_SKILL_SCHEMA = flat_schema(
+    ("skill_id", "title", "description", "initial_note"),
+    (
+        "overview", "inputs", "outputs", "preconditions", "steps", "constraints", "tools", "dod",
+        "example_inputs", "example_outputs",
+    ),
+)
+_SKILL_REQUIRED = frozenset({"skill_id", "title", "description", "overview", "inputs", "outputs", "steps", "dod"})
+
+
+def _from_dict(cls: type, id_field: str, data: dict):
+    from sys import intern
+
+    return cls(**{
+        k: tuple(map(intern, v)) if isinstance(v, list) else intern(v) if k == id_field else v
+        for k, v in data.items()
+    })
+
+
+class PromptCatalog(Catalog):
+    kind = "prompts"
+    id_field = "prompt_id"
+
+    def where(self, doc_id: str) -> str:
+        return f"{self.kind}/{doc_id}"
+
+    def check(self, data: object, doc_id: str) -> list[Problem]:
+        return check_schema(data, doc_id, _PROMPT_SCHEMA, _PROMPT_REQUIRED, self.id_field, self.where(doc_id))
+
+    def build(self, data: dict) -> PromptSpec:
+        return _from_dict(PromptSpec, self.id_field, data)
+
+
+class SkillCatalog(Catalog):
+    kind = "skills"
+    id_field = "skill_id"
+
+    def where(self, doc_id: str) -> str:
+        return f"{self.kind}/{doc_id}"
+
+    def check(self, data: object, doc_id: str) -> list[Problem]:
+        return check_schema(data, doc_id, _SKILL_SCHEMA, _SKILL_REQUIRED, self.id_field, self.where(doc_id))
+
+    def build(self, data: dict) -> SkillSpec:
+        return _from_dict(SkillSpec, self.id_field, data)
+
+
+class DocKind(NamedTuple):
+    name: str  # index.json section, output directory and doc key prefix
+    template: str  # repo-relative meta template that orders the sections
+    catalog: type[Catalog]
+    render: Callable[..., str]
+    layout: Layout  # used when the template is missing
+    labels: dict[str, str] | None  # template heading text per section; None: per-locale Labels
+    localized: bool
+
+
+KINDS = {
+    kind.name: kind
+    for kind in (
+        DocKind("agents", "meta-info/meta_agent.md", Catalog, render_agent, AGENT_LAYOUT, None, True),
+        DocKind("prompts", "meta-info/meta_prompt.md", PromptCatalog, render_prompt, PROMPT_LAYOUT, PROMPT_LABELS, False),
+        DocKind("skills", "meta-info/meta_skill.md", SkillCatalog, render_skill, SKILL_LAYOUT, SKILL_LABELS, False),
+    )
+}
+_RENDERERS = {AgentSpec: render_agent, PromptSpec: render_prompt, SkillSpec: render_skill}
+
+
+def render_doc(
+    spec: AgentSpec | PromptSpec | SkillSpec,
+    timer: SectionTimer | None = None,
+    cache: FragmentCache | None = None,
+    labels: Labels = ZH_CN,
+    layout: Layout | None = None,
+    stamp: str | None = None,
+) -> str:
+    """Render a spec of any kind with its kind's renderer; `stamp` defaults to today."""
+    render = _RENDERERS[type(spec)]
+    if layout is None:
+        return render(spec, timer, cache, labels, stamp=stamp)
+    return render(spec, timer, cache, labels, layout, stamp)
+
+
+def doc_key(kind: str, doc_id: str) -> str:
+    """How a doc is named in the manifest, --only and --list: agents by id, others as kind/id."""
+    return doc_id if kind == "agents" else f"{kind}/{doc_id}"
@@ -0,0 +1,159 @@
+"""Link and role cross-reference index over the generated docs, instructions/ and meta-info/.
+
+One pass collects every Markdown link and heading anchor per file; parses are cached by
+(size, mtime) so later runs only re-read files that changed. Validation is then a set
+lookup per link, and per upstream/downstream/RACI role reference against catalog/roles.json.
+"""
+from __future__ import annotations
+
+import json
+import os
+import posixpath
+import re
+from pathlib import Path
+
+from agent_docs import AgentSpec, Problem
+
+INDEX_VERSION = 1
+LINK_DIRS = ("agents", "prompts", "skills", "instructions", "meta-info")
+LINK_CACHE_PATH = ".cache/refactor_agents/links.json"
+
+_LINK = re.compile(r"(?<!!)\[[^\]]*\]\(([^)\s]+)(?:\s+\"[^\"]*\")?\)")
+_HEADING = re.compile(r"^#{1,6}\s+(.+?)\s*#*\s*$")
+_FENCE = re.compile(r"^(```|~~~)")
+_SLUG_DROP = re.compile(r"[^\w\- ]")
+_ROLE_SEP = re.compile(r"[/、,，]")
+
+
+def slugify(heading: str) -> str:
+    """GitHub-style heading anchor: lowercase, punctuation dropped, spaces to hyphens."""
+    return _SLUG_DROP.sub("", heading.strip().lower()).replace(" ", "-")
+
+
+def parse_markdown(text: str) -> tuple[list[tuple[int, str]], list[str]]:
+    """(line, target) of every link outside code fences, and the file's heading anchors."""
+    links: list[tuple[int, str]] = []
+    anchors: list[str] = []
+    seen: dict[str, int] = {}
+    fenced = False
+    for lineno, line in enumerate(text.splitlines(), 1):
+        if _FENCE.match(line):
+            fenced = not fenced
+            continue
+        if fenced:
+            continue
+        m = _HEADING.match(line)
+        if m:
+            slug = slugify(m.group(1))
+            # GitHub disambiguates repeated headings with -1, -2, ...
+            n = seen.get(slug, 0)
+            seen[slug] = n + 1
+            anchors.append(f"{slug}-{n}" if n else slug)
+        for target in _LINK.findall(line):
+            links.append((lineno, target))
+    return links, anchors
+
+
+def build_link_index(repo_root: Path, cache_path: Path | None = None) -> dict[str, dict]:
+    """Map repo-relative .md path -> {"stamp", "links", "anchors"}, reusing cached parses."""
+    cached: dict[str, dict] = {}
+    if cache_path is not None:
+        try:
+            data = json.loads(cache_path.read_text(encoding="utf-8"))
+            if data.get("version") == INDEX_VERSION:
+                cached = data["files"]
+        except (OSError, ValueError, KeyError):
+            pass
+
+    index: dict[str, dict] = {}
+    for top in LINK_DIRS:
+        for dirpath, _, filenames in os.walk(repo_root / top):
+            for name in filenames:
+                if not name.endswith(".md"):
+                    continue
+                path = Path(dirpath, name)
+                rel = path.relative_to(repo_root).as_posix()
+                st = path.stat()
+                stamp = [st.st_size, st.st_mtime_ns]
+                entry = cached.get(rel)
+                if entry is None or entry.get("stamp") != stamp:
+                    links, anchors = parse_markdown(path.read_text(encoding="utf-8"))
+                    entry = {"stamp": stamp, "links": [list(link) for link in links], "anchors": anchors}
+                index[rel] = entry
+
+    if cache_path is not None and index != cached:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        cache_path.write_text(json.dumps({"version": INDEX_VERSION, "files": index}, ensure_ascii=False), encoding="utf-8")
+    return index
+
+
+def check_links(index: dict[str, dict], repo_root: Path) -> list[Problem]:
+    problems: list[Problem] = []
+    for rel, entry in index.items():
+        base = posixpath.dirname(rel)
+        for lineno, target in entry["links"]:
+            if re.match(r"^[a-z][a-z0-9+.-]*:", target):
+                continue  # http:, mailto:, ... are out of scope
+            path, _, anchor = target.partition("#")
+            dest = posixpath.normpath(posixpath.join(base, path)) if path else rel
+            if dest.startswith(".."):
+                problems.append((f"{rel}:{lineno}", f"link escapes the repository: {target}"))
+                continue
+            if dest in index:
+                if anchor and anchor not in index[dest]["anchors"]:
+                    problems.append((f"{rel}:{lineno}", f"no heading #{anchor} in {dest}"))
+            elif not (repo_root / dest).exists():
+                problems.append((f"{rel}:{lineno}", f"broken link: {target}"))
+    return problems
+
+
+def load_roles(path: Path) -> dict[str, list[str] | None]:
+    """Role name -> agent ids it refers to (None for known roles outside the catalog)."""
+    data = json.loads(path.read_text(encoding="utf-8"))
+    roles: dict[str, list[str] | None] = {name: None for name in data.get("external", [])}
+    for agent_id, aliases in data.get("agents", {}).items():
+        roles[agent_id] = [agent_id]
+        for alias in aliases:
+            roles[alias] = [agent_id]
+    roles.update(data.get("groups", {}))
+    return roles
+
+
+def role_names(ref: str, roles: dict[str, list[str] | None]) -> list[str]:
+    """Split "架构师/开发" style references, keeping known names that contain a separator (UI/UX)."""
+    ref = ref.strip()
+    if ref in roles:
+        return [ref]
+    return [part.strip() for part in _ROLE_SEP.split(ref) if part.strip()]
+
+
+def handoff_role(item: str) -> str | None:
+    """The role an upstream/downstream bullet names before its "：" (None for free text)."""
+    for sep in ("：", ":"):
+        if sep in item:
+            return item.split(sep, 1)[0]
+    return None
+
+
+def check_roles(specs: list[AgentSpec], roles: dict[str, list[str] | None], agent_ids: set[str]) -> list[Problem]:
+    problems: list[Problem] = []
+
+    def check(where: str, ref: str) -> None:
+        for name in role_names(ref, roles):
+            if name not in roles:
+                problems.append((where, f"unknown role {name!r} (add it to catalog/roles.json)"))
+                continue
+            missing = [aid for aid in roles[name] or () if aid not in agent_ids]
+            if missing:
+                problems.append((where, f"role {name!r} maps to missing agent(s) {', '.join(missing)}"))
+
+    for spec in specs:
+        for field in ("upstream", "downstream"):
+            for i, item in enumerate(getattr(spec, field)):
+                role = handoff_role(item)
+                if role is not None:
+                    check(f"{spec.agent_id}.{field}[{i}]", role)
+        for i, row in enumerate(spec.raci_rows):
+            for col, cell in zip("RACI", row[1:]):
+                check(f"{spec.agent_id}.raci_rows[{i}].{col}", cell)
+    return problems
@@ -0,0 +1,247 @@
+"""Parse generated agent docs back into AgentSpec objects.
+
+The parser accepts exactly what render_agent() emits: the fm() frontmatter, the section()
+and sub() headings, the resp_block layout, fenced templates and the RACI table. It is a
+single pass over the lines with no regex per line, so thousands of docs parse in well
+under a second. Hand-written Markdown that strays from that layout is rejected with the
+line that did not match.
+"""
+from __future__ import annotations
+
+from dataclasses import fields, replace
+
+from agent_docs import AGENT_LAYOUT, ZH_CN, AgentSpec, Labels, Layout, spec_from_dict
+
+
+class ParseError(ValueError):
+    def __init__(self, where: str, lineno: int, message: str) -> None:
+        super().__init__(f"{where}:{lineno}: {message}")
+        self.where = where
+        self.lineno = lineno
+
+
+class _Lines:
+    def __init__(self, text: str, where: str) -> None:
+        self.lines = text.split("\n")
+        self.i = 0
+        self.where = where
+
+    def error(self, message: str) -> ParseError:
+        return ParseError(self.where, self.i + 1, message)
+
+    def skip_blank(self) -> None:
+        while self.i < len(self.lines) and not self.lines[self.i]:
+            self.i += 1
+
+    def peek(self) -> str | None:
+        self.skip_blank()
+        return self.lines[self.i] if self.i < len(self.lines) else None
+
+    def take(self) -> str:
+        line = self.peek()
+        if line is None:
+            raise self.error("unexpected end of document")
+        self.i += 1
+        return line
+
+    def expect(self, line: str) -> None:
+        got = self.take()
+        if got != line:
+            self.i -= 1
+            raise self.error(f"expected {line!r}, got {got!r}")
+
+    def prefixed(self, prefix: str) -> str:
+        got = self.take()
+        if not got.startswith(prefix):
+            self.i -= 1
+            raise self.error(f"expected a line starting with {prefix!r}, got {got!r}")
+        return got[len(prefix):]
+
+    def bullets(self) -> list[str]:
+        items = []
+        while self.i < len(self.lines) and self.lines[self.i].startswith("- "):
+            items.append(self.lines[self.i][2:])
+            self.i += 1
+        return items
+
+    def labelled(self, label: str, L: Labels) -> list[str]:
+        self.expect(f"**{label}**{L.colon}")
+        return self.bullets()
+
+
+def _role_desc(doc: _Lines, L: Labels, data: dict) -> None:
+    doc.expect(f"## {L.role_desc}")
+    start = doc.i
+    while doc.i < len(doc.lines) and doc.lines[doc.i] != "---":
+        doc.i += 1
+    data["role_desc"] = "\n".join(doc.lines[start:doc.i]).strip()
+    doc.expect("---")
+
+
+def _scope(doc: _Lines, L: Labels, data: dict) -> None:
+    doc.expect(f"## {L.scope}")
+    data["scope_in"] = doc.labelled(L.scope_in, L)
+    data["scope_out"] = doc.labelled(L.scope_out, L)
+
+
+def _contract(doc: _Lines, L: Labels, data: dict) -> None:
+    doc.expect(f"## {L.contract}")
+    data["inputs"] = doc.labelled(L.inputs, L)
+    data["outputs"] = doc.labelled(L.outputs, L)
+    data["missing_questions"] = doc.labelled(L.missing_questions, L)
+
+
+def _responsibilities(doc: _Lines, L: Labels, data: dict) -> None:
+    doc.expect(f"## {L.responsibilities}")
+    responsibilities = data["responsibilities"]
+    while (line := doc.peek()) is not None and line.startswith("### "):
+        title = doc.take()[4:]
+        duration = doc.prefixed(f"**{L.duration}**{L.value_sep}")
+        doc.expect(f"**{L.steps}**{L.colon}")
+        steps = []
+        while (line := doc.peek()) is not None and line.startswith(f"{len(steps) + 1}. "):
+            steps.append(doc.take()[len(f"{len(steps) + 1}. "):])
+        metrics = doc.labelled(L.metrics, L)
+        dod = doc.labelled(L.dod, L)
+        responsibilities.append({"title": title, "duration": duration, "steps": steps, "metrics": metrics, "dod": dod})
+
+
+def _tools(doc: _Lines, L: Labels, data: dict) -> None:
+    doc.expect(f"## {L.tools}")
+    suffix = f"**{L.colon}"
+    while (line := doc.peek()) is not None and line.startswith("**") and line.endswith(suffix):
+        group = doc.take()[2:-len(suffix)]
+        data["tools"][group] = doc.bullets()
+
+
+def _gates(doc: _Lines, L: Labels, data: dict) -> None:
+    doc.expect(f"## {L.gates}")
+    doc.expect(L.gates_intro)
+    data["gates"] = doc.labelled(L.gates_own, L)
+
+
+def _templates(doc: _Lines, L: Labels, data: dict) -> None:
+    doc.expect(f"## {L.templates}")
+    doc.expect(L.templates_intro)
+    while (line := doc.peek()) is not None and line.startswith("### "):
+        title = doc.take()[4:]
+        doc.expect("```")
+        start = doc.i
+        while doc.i < len(doc.lines) and doc.lines[doc.i] != "```":
+            doc.i += 1
+        body = "\n".join(doc.lines[start:doc.i])
+        doc.expect("```")
+        data["templates"].append([title, body])
+
+
+def _kpis(doc: _Lines, L: Labels, data: dict) -> None:
+    doc.expect(f"## {L.kpis}")
+    doc.expect(L.kpis_intro)
+    doc.skip_blank()
+    data["kpis"] = doc.bullets()
+
+
+def _handoff(doc: _Lines, L: Labels, data: dict) -> None:
+    doc.expect(f"## {L.handoff}")
+    data["upstream"] = doc.labelled(L.upstream, L)
+    data["downstream"] = doc.labelled(L.downstream, L)
+    doc.expect(f"**{L.raci}**{L.colon}")
+    doc.expect(f"| {L.raci_scene} | R | A | C | I |")
+    doc.expect("|---|---|---|---|---|")
+    while doc.i < len(doc.lines) and doc.lines[doc.i].startswith("| "):
+        cells = doc.lines[doc.i][2:-2].split(" | ")
+        if len(cells) != 5 or not doc.lines[doc.i].endswith(" |"):
+            raise doc.error(f"expected a RACI row with 5 cells, got {doc.lines[doc.i]!r}")
+        data["raci_rows"].append(cells)
+        doc.i += 1
+
+
+def _changelog(doc: _Lines, L: Labels, data: dict) -> None:
+    doc.expect(f"## {L.changelog}")
+    entry = doc.prefixed("- ")
+    _, sep, data["initial_note"] = entry.partition(" v0.2 — ")
+    if not sep:
+        doc.i -= 1
+        raise doc.error(f"expected '- <date> v0.2 — <note>', got {'- ' + entry!r}")
+
+
+# Parsers for the sections of agent_docs.AGENT_SECTIONS, by the same names.
+AGENT_PARSERS = {
+    "role_desc": _role_desc,
+    "scope": _scope,
+    "contract": _contract,
+    "responsibilities": _responsibilities,
+    "tools": _tools,
+    "gates": _gates,
+    "templates": _templates,
+    "kpis": _kpis,
+    "handoff": _handoff,
+    "changelog": _changelog,
+}
+
+
+def parse_agent(text: str, labels: Labels = ZH_CN, where: str = "<doc>", layout: Layout = AGENT_LAYOUT) -> AgentSpec:
+    """Inverse of render_agent(spec, labels=labels, layout=layout), up to canonical_spec().
+
+    Fields of sections the layout leaves out come back empty.
+    """
+    L = labels
+    doc = _Lines(text, where)
+
+    doc.expect("---")
+    meta: dict[str, str] = {}
+    while (line := doc.take()) != "---":
+        key, sep, value = line.partition(": ")
+        if not sep:
+            doc.i -= 1
+            raise doc.error(f"expected 'key: value' frontmatter, got {line!r}")
+        meta[key] = value
+    if "id" not in meta:
+        raise doc.error("frontmatter has no id")
+    if meta.get("language", L.code) != L.code:
+        raise doc.error(f"doc is in {meta['language']!r}, parsing with {L.code!r} labels")
+
+    data: dict = {
+        "agent_id": meta["id"], "title": doc.prefixed("# "), "role_desc": "", "initial_note": "",
+        "scope_in": [], "scope_out": [], "inputs": [], "outputs": [], "missing_questions": [],
+        "responsibilities": [], "tools": {}, "gates": [], "templates": [], "kpis": [],
+        "upstream": [], "downstream": [], "raci_rows": [],
+    }
+    for name in layout.sections:
+        AGENT_PARSERS[name](doc, L, data)
+    if doc.peek() is not None:
+        raise doc.error(f"unexpected content after the last section: {doc.peek()!r}")
+    return spec_from_dict(data)
+
+
+# The spec fields each layout section renders.
+SECTION_FIELDS = {
+    "role_desc": ("role_desc",),
+    "scope": ("scope_in", "scope_out"),
+    "contract": ("inputs", "outputs", "missing_questions"),
+    "responsibilities": ("responsibilities",),
+    "tools": ("tools",),
+    "gates": ("gates",),
+    "templates": ("templates",),
+    "kpis": ("kpis",),
+    "handoff": ("upstream", "downstream", "raci_rows"),
+    "changelog": ("initial_note",),
+}
+
+
+def canonical_spec(spec: AgentSpec, layout: Layout = AGENT_LAYOUT) -> AgentSpec:
+    """The spec as it reads back from its doc: the whitespace render_agent() trims is trimmed
+    and fields of sections the layout leaves out are empty."""
+    spec = replace(
+        spec,
+        role_desc=spec.role_desc.strip(),
+        templates=tuple((title, body.strip("\n")) for title, body in spec.templates),
+        initial_note=spec.initial_note.rstrip(),
+    )
+    dropped = [f for name, fs in SECTION_FIELDS.items() if name not in layout.sections for f in fs]
+    return replace(spec, **{f: type(getattr(spec, f))() for f in dropped})
+
+
+def spec_diff(a: AgentSpec, b: AgentSpec) -> list[str]:
+    """Names of the fields where two specs differ."""
+    return [f.name for f in fields(AgentSpec) if getattr(a, f.name) != getattr(b, f.name)]
@@ -0,0 +1,1332 @@
+"""Regeneration pipeline behind scripts/refactor_agents.py: selection, manifest, writes, CLI.
+
+Startup budget: importing this module must stay cheap so --list and --version answer in a
+few milliseconds. The spec model and renderer live in agent_docs, and heavier stdlib
+modules (argparse, json, hashlib, pathlib, ...) are imported inside the functions that
+need them. `python3 scripts/bench_agents.py startup` enforces this.
+"""
+from __future__ import annotations
+
+import os
+import sys
+
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    import argparse
+    from pathlib import Path
+
+    from agent_docs import AgentSpec, Catalog, FragmentCache, Labels, Layout, Span
+    from agent_kinds import DocKind, PromptSpec, SkillSpec
+
+    # The docs of one kind a command works on: (kind, its catalog, its layout, selected ids).
+    DocSet = tuple[DocKind, Catalog, Layout, list[str]]
+    # A render job is (manifest key, validated spec, output path, locale labels, layout,
+    # previous stamp and content hash from the manifest, or None).
+    RenderJob = tuple[str, AgentSpec | PromptSpec | SkillSpec, Path, Labels, Layout, str | None, str | None]
+    # (key, bytes written or None if identical, error, stamp, content hash).
+    RenderResult = tuple[str, int | None, str | None, str | None, str | None]
+    # Fragment cache counters of one batch: hits, misses, evictions, new fragments (dump() form).
+    FragmentReport = tuple[int, int, int, list[list]]
+
+GENERATOR_VERSION = "0.3.0"
+TEMPLATE_PATH = "meta-info/meta_agent.md"
+CATALOG_DIR = "catalog"
+# Per-locale output directories; the default locale renders into agents/.
+LOCALE_DIR = "agents-{locale}"
+MANIFEST_PATH = ".cache/refactor_agents/manifest.json"
+FRAGMENTS_PATH = ".cache/refactor_agents/fragments.json"
+INDEX_PATH = ".cache/refactor_agents/search.sqlite"
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.realpath(__file__)))
+# Generator code: a change here affects every rendered doc.
+GENERATOR_SOURCES = (
+    "scripts/refactor_agents.py", "scripts/agent_pipeline.py", "scripts/agent_docs.py", "scripts/agent_template.py",
+    "scripts/agent_kinds.py",
+)
+
+
+def default_catalog() -> Catalog:
+    from pathlib import Path
+
+    from agent_docs import Catalog
+
+    return Catalog(Path(REPO_ROOT, CATALOG_DIR))
+
+
+def build_specs() -> list[AgentSpec]:
+    return default_catalog().load()
+
+
+def spec_hash(source_hash: str, salt: str) -> str:
+    import hashlib
+
+    # Hash the raw spec file (Catalog.source_hash) so unchanged specs are skipped without being parsed.
+    return hashlib.sha256((salt + source_hash).encode("utf-8")).hexdigest()
+
+
+def load_docsets(catalog: Catalog, repo_root: Path) -> list[DocSet]:
+    """Every doc kind (agents first) with all of its ids; `catalog` holds the agents and its root the other kinds.
+
+    Layouts are compiled from the kinds' meta-info/ templates (cached by content hash).
+    """
+    from agent_kinds import KINDS
+    from agent_template import kind_layout
+
+    docsets: list[DocSet] = []
+    for kind in KINDS.values():
+        kind_catalog = catalog if kind.name == "agents" else kind.catalog(catalog.root)
+        docsets.append((kind, kind_catalog, kind_layout(kind, repo_root), kind_catalog.ids()))
+    return docsets
+
+
+def locale_dir(repo_root: Path, code: str) -> Path:
+    from agent_docs import DEFAULT_LOCALE
+
+    return repo_root / ("agents" if code == DEFAULT_LOCALE else LOCALE_DIR.format(locale=code))
+
+
+def doc_dir(repo_root: Path, kind: DocKind, code: str) -> Path:
+    return locale_dir(repo_root, code) if kind.localized else repo_root / kind.name
+
+
+def kind_bundles(kind: DocKind, bundles: list[Labels]) -> list[Labels]:
+    """The locales a kind renders in: all of them, or only the default for unlocalized kinds."""
+    from agent_docs import DEFAULT_LOCALE
+
+    return bundles if kind.localized else [labels for labels in bundles if labels.code == DEFAULT_LOCALE]
+
+
+def manifest_key(doc_key: str, code: str) -> str:
+    from agent_docs import DEFAULT_LOCALE
+
+    return doc_key if code == DEFAULT_LOCALE else f"{doc_key}@{code}"
+
+
+def generator_hash(repo_root: Path) -> str:
+    """sha256 over the GENERATOR_SOURCES files, so editing a renderer invalidates every doc."""
+    import hashlib
+
+    digest = hashlib.sha256()
+    for src in GENERATOR_SOURCES:
+        path = repo_root / src
+        digest.update(f"{src}\0".encode("utf-8"))
+        digest.update(path.read_bytes() if path.exists() else b"")
+    return digest.hexdigest()
+
+
+def manifest_salt(repo_root: Path, template_path: str = TEMPLATE_PATH) -> str:
+    import hashlib
+
+    # Anything that changes every doc of a kind at once: generator code, template. The date is
+    # not part of it: docs keep their stamp until their content changes (see render_batch()).
+    template = repo_root / template_path
+    template_hash = hashlib.sha256(template.read_bytes()).hexdigest() if template.exists() else ""
+    return f"{GENERATOR_VERSION}\0{generator_hash(repo_root)}\0{template_hash}\0"
+
+
+def doc_stamp(path: Path) -> str | None:
+    """The last_updated date in a doc's frontmatter, or None if it has none (or no doc)."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            if f.readline() != "---\n":
+                return None
+            for line in f:
+                if line == "---\n":
+                    return None
+                if line.startswith("last_updated: "):
+                    return line[len("last_updated: "):].strip() or None
+    except (OSError, UnicodeDecodeError):
+        return None
+    return None
+
+
+def previous_stamp(entry: object) -> tuple[str | None, str | None]:
+    """(stamp, content hash) a manifest entry recorded for its doc, or Nones."""
+    if not isinstance(entry, dict):
+        return None, None
+    return entry.get("stamp"), entry.get("content")
+
+
+def output_stamp(path: Path) -> list[int] | None:
+    """(size, mtime_ns) of a generated doc, so hand edits invalidate its manifest entry."""
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+
+def load_manifest(path: Path) -> dict[str, dict]:
+    import json
+
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    specs = data.get("specs") if isinstance(data, dict) else None
+    return specs if isinstance(specs, dict) else {}
+
+
+def save_manifest(path: Path, entries: dict[str, dict]) -> None:
+    import json
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = {"generator": GENERATOR_VERSION, "specs": entries}
+    path.write_text(json.dumps(data, ensure_ascii=False, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+
+
+def load_fragments(path: Path, salt: str) -> list[list]:
+    import json
+
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return []
+    # Fragments depend on everything the manifest salt covers (generator, template).
+    if not isinstance(data, dict) or data.get("salt") != salt or not isinstance(data.get("fragments"), list):
+        return []
+    return data["fragments"]
+
+
+def save_fragments(path: Path, salt: str, fragments: list[list], maxsize: int) -> None:
+    import json
+
+    # Later entries win and the newest `maxsize` are kept, as in the in-memory LRU.
+    merged = {json.dumps(key, ensure_ascii=False): [key, text] for key, text in fragments}
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = {"salt": salt, "fragments": list(merged.values())[-maxsize:]}
+    path.write_text(json.dumps(data, ensure_ascii=False) + "\n", encoding="utf-8")
+
+
+# This process's fragment cache: set by init_fragments() in the main process or,
+# as the pool initializer, in each worker.
+_fragments: FragmentCache | None = None
+
+
+def init_fragments(maxsize: int, track_new: bool = False, seed: list[list] | None = None) -> None:
+    global _fragments
+    from agent_docs import FragmentCache
+
+    _fragments = FragmentCache(maxsize, track_new) if maxsize > 0 else None
+    if _fragments is not None and seed:
+        _fragments.load(seed)
+
+
+class WriteStats:
+    def __init__(self) -> None:
+        self.bytes_written = 0
+        self.touched = 0
+        self.skipped = 0
+
+    def summary(self) -> str:
+        return f"{self.touched} files touched, {self.skipped} skipped, {self.bytes_written} bytes written"
+
+
+def same_bytes(path: Path, data: bytes) -> bool:
+    try:
+        return path.stat().st_size == len(data) and path.read_bytes() == data
+    except FileNotFoundError:
+        return False
+
+
+def write_if_changed(path: Path, data: bytes, dry_run: bool = False) -> bool:
+    """Atomically replace `path` with `data`; return False if it already holds those bytes."""
+    from agent_docs import atomic_path
+
+    try:
+        st = path.stat()
+        if st.st_size == len(data) and path.read_bytes() == data:
+            return False
+        # Keep the mode the doc had; a new doc gets what open() would give it.
+        mode = st.st_mode & 0o777
+    except FileNotFoundError:
+        mode = None
+    if dry_run:
+        return True
+    with atomic_path(path, mode) as tmp, open(tmp, "wb") as f:
+        f.write(data)
+    return True
+
+
+def render_batch(
+    jobs: list[RenderJob], dry_run: bool = False, timed: bool = False
+) -> tuple[list[RenderResult], list[Span], FragmentReport]:
+    """Render and write a batch; per job return (key, bytes written or None if identical, error,
+    stamp, content hash).
+
+    A doc keeps its previous date stamp (from the manifest, else its own frontmatter) when
+    rendering with that stamp reproduces what was generated before: the stored content hash,
+    else the doc on disk. Only docs whose content changed are stamped with today's date.
+
+    With `timed`, also return section/write spans for --timings. Sections go through this
+    process's fragment cache (see init_fragments()); its counters for the batch are returned too.
+    """
+    import hashlib
+
+    from agent_docs import SectionTimer, _untimed, today
+    from agent_kinds import render_doc
+
+    timer = SectionTimer() if timed else None
+    cache = _fragments
+    hits, misses, evictions = cache.stats() if cache else (0, 0, 0)
+    results: list[RenderResult] = []
+    for key, spec, out, labels, layout, stamp, content in jobs:
+        t = timer.section(key) if timer else _untimed
+        try:
+            stamp = stamp or doc_stamp(out) or today()
+            data = render_doc(spec, timer, cache, labels, layout, stamp).encode("utf-8")
+            digest = hashlib.sha256(data).hexdigest()
+            if stamp != today() and (digest != content if content else not same_bytes(out, data)):
+                # The content changed: restamp. Only fm and changelog differ, the rest are cache hits.
+                stamp = today()
+                data = render_doc(spec, timer, cache, labels, layout, stamp).encode("utf-8")
+                digest = hashlib.sha256(data).hexdigest()
+            changed = t("write", write_if_changed, out, data, dry_run)
+            results.append((key, len(data) if changed else None, None, stamp, digest))
+        except Exception as e:
+            results.append((key, None, f"{type(e).__name__}: {e}", None, None))
+    report: FragmentReport = (0, 0, 0, [])
+    if cache:
+        h, m, ev = cache.stats()
+        report = (h - hits, m - misses, ev - evictions, cache.dump(cache.drain_new()))
+    return results, timer.spans if timer else [], report
+
+
+def run_jobs(
+    jobs: list[RenderJob], workers: int, dry_run: bool = False, timed: bool = False,
+    fragments: tuple = (0, False, None),
+) -> tuple[list[RenderResult], list[Span], FragmentReport]:
+    """Render `jobs`, in worker processes when `workers` > 1.
+
+    `fragments` holds the init_fragments() arguments; it is applied in this process or,
+    with workers, in each worker.
+    """
+    if workers <= 1 or len(jobs) <= 1:
+        init_fragments(*fragments)
+        return render_batch(jobs, dry_run, timed)
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    # A few batches per worker amortizes pickling while still balancing uneven specs.
+    size = max(1, -(-len(jobs) // (workers * 4)))
+    batches = [jobs[i:i + size] for i in range(0, len(jobs), size)]
+    results: list[RenderResult] = []
+    spans: list[Span] = []
+    hits = misses = evictions = 0
+    new: list[list] = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_fragments, initargs=fragments) as pool:
+        futures = [pool.submit(render_batch, batch, dry_run, timed) for batch in batches]
+        for batch, fut in zip(batches, futures):
+            try:
+                batch_results, batch_spans, (h, m, ev, batch_new) = fut.result()
+            except Exception as e:
+                batch_results = [(key, None, f"{type(e).__name__}: {e}", None, None) for key, *_ in batch]
+                batch_spans, h, m, ev, batch_new = [], 0, 0, 0, []
+            results += batch_results
+            spans += batch_spans
+            hits, misses, evictions = hits + h, misses + m, evictions + ev
+            new += batch_new
+    return results, spans, (hits, misses, evictions, new)
+
+
+def timings_report(spans: list[Span], top: int = 10) -> str:
+    """Per-section totals, then the slowest agents with their slowest sections."""
+    by_section: dict[str, list[float]] = {}
+    by_agent: dict[str, dict[str, float]] = {}
+    for agent_id, name, _, seconds in spans:
+        by_section.setdefault(name, []).append(seconds)
+        agent = by_agent.setdefault(agent_id, {})
+        agent[name] = agent.get(name, 0.0) + seconds
+
+    total = sum(sum(v) for v in by_section.values()) or 1.0
+    lines = [f"{'section':<16} {'total ms':>10} {'share':>6} {'calls':>7} {'max ms':>8}"]
+    for name, secs in sorted(by_section.items(), key=lambda kv: -sum(kv[1])):
+        lines.append(
+            f"{name:<16} {sum(secs) * 1000:10.2f} {sum(secs) / total:6.1%} {len(secs):7d} {max(secs) * 1000:8.3f}"
+        )
+
+    lines.append("")
+    lines.append(f"slowest agents (top {top}):")
+    ranked = sorted(by_agent.items(), key=lambda kv: -sum(kv[1].values()))[:top]
+    for agent_id, sections in ranked:
+        worst = ", ".join(
+            f"{name} {secs * 1000:.2f}" for name, secs in sorted(sections.items(), key=lambda kv: -kv[1])[:3]
+        )
+        lines.append(f"  {agent_id:<28} {sum(sections.values()) * 1000:8.2f} ms  ({worst})")
+    return "\n".join(lines)
+
+
+def write_trace(path: Path, spans: list[Span]) -> None:
+    """Chrome trace-event JSON (chrome://tracing, Perfetto): one complete event per span."""
+    import json
+
+    origin = min((start for _, _, start, _ in spans), default=0.0)
+    events = [
+        {
+            "name": name,
+            "cat": "render",
+            "ph": "X",
+            "ts": round((start - origin) * 1e6, 3),
+            "dur": round(seconds * 1e6, 3),
+            "pid": 1,
+            "tid": agent_id,
+            "args": {"agent_id": agent_id},
+        }
+        for agent_id, name, start, seconds in spans
+    ]
+    path.write_text(json.dumps({"traceEvents": events, "displayTimeUnit": "ms"}), encoding="utf-8")
+
+
+def git_changed_files(repo_root: Path, ref: str) -> list[str]:
+    """Repo-relative paths changed between `ref` and the working tree, untracked files included."""
+    import subprocess
+
+    def git(*cmd: str) -> list[str]:
+        out = subprocess.run(
+            ["git", "-C", str(repo_root), *cmd], check=True, capture_output=True, text=True
+        ).stdout
+        return [line for line in out.splitlines() if line]
+
+    return git("diff", "--name-only", ref, "--") + git("ls-files", "--others", "--exclude-standard")
+
+
+def changed_docs(kind: DocKind, catalog: Catalog, repo_root: Path, changed: list[str]) -> list[str]:
+    """Ids of `kind` whose doc depends on one of the `changed` repo-relative paths."""
+    by_source = {p.resolve(): aid for aid, p in catalog.index.items()}
+    # Inputs shared by every doc of the kind (see also manifest_salt()).
+    global_inputs = {(catalog.root / "index.json").resolve(), (repo_root / kind.template).resolve()}
+    global_inputs.update((repo_root / src).resolve() for src in GENERATOR_SOURCES)
+    locales = (catalog.root / "locales").resolve()
+    affected: set[str] = set()
+    for rel in changed:
+        path = (repo_root / rel).resolve()
+        if path in global_inputs or (kind.localized and path.parent == locales):
+            return catalog.ids()
+        aid = by_source.get(path)
+        out_dir, _, name = rel.partition("/")
+        ours = out_dir == kind.name or (kind.localized and out_dir.startswith(f"{kind.name}-"))
+        if aid is None and ours and name.endswith(".md"):
+            # A hand edit (or deletion) of a generated doc: regenerate it.
+            aid = name[:-len(".md")]
+        if aid in catalog:
+            affected.add(aid)
+    return [aid for aid in catalog.ids() if aid in affected]
+
+
+def narrow_docsets(args: argparse.Namespace, docsets: list[DocSet]) -> list[DocSet]:
+    """Apply --kind and --only to freshly loaded docsets; KeyError names an --only pattern that matches nothing."""
+    if args.kind:
+        docsets = [(kind, cat, layout, ids if kind.name in args.kind else []) for kind, cat, layout, ids in docsets]
+    return select_docs(docsets, args.only) if args.only else docsets
+
+
+def select_docs(docsets: list[DocSet], patterns: list[str]) -> list[DocSet]:
+    """Narrow each doc set to the ids whose doc key (see agent_kinds.doc_key) matches an id or
+    fnmatch glob, in catalog order; raise KeyError for a pattern matching nothing."""
+    from fnmatch import fnmatchcase
+
+    from agent_kinds import doc_key
+
+    matched: set[str] = set()
+    for pattern in patterns:
+        hits = [
+            key for kind, _, _, ids in docsets for aid in ids if fnmatchcase(key := doc_key(kind.name, aid), pattern)
+        ]
+        if not hits:
+            raise KeyError(pattern)
+        matched.update(hits)
+    return [
+        (kind, catalog, layout, [aid for aid in ids if doc_key(kind.name, aid) in matched])
+        for kind, catalog, layout, ids in docsets
+    ]
+
+
+def snapshot(roots: list[Path]) -> dict[Path, tuple[int, int]]:
+    """(mtime_ns, size) of every file under `roots`; missing roots are ignored."""
+    from pathlib import Path
+
+    seen: dict[Path, tuple[int, int]] = {}
+    stack = list(roots)
+    while stack:
+        root = stack.pop()
+        try:
+            if root.is_file():
+                st = root.stat()
+                seen[root] = (st.st_mtime_ns, st.st_size)
+                continue
+            entries = list(os.scandir(root))
+        except OSError:
+            continue
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                stack.append(Path(entry.path))
+            elif not entry.name.startswith("."):
+                st = entry.stat()
+                seen[Path(entry.path)] = (st.st_mtime_ns, st.st_size)
+    return seen
+
+
+def watch(args: argparse.Namespace, docsets: list[DocSet], bundles: list[Labels], repo_root: Path) -> int:
+    """Re-render affected docs whenever spec sources, instructions/ or meta-info/ change."""
+    import time
+
+    from agent_docs import Catalog
+    from agent_kinds import doc_key
+
+    generator = [(repo_root / src).resolve() for src in GENERATOR_SOURCES]
+    shared = [repo_root / "instructions", repo_root / "meta-info"]
+    root = docsets[0][1].root
+    roots = [root, *shared, *generator]
+
+    # `docsets` arrive narrowed by run(); keep the full sets so new ids in index.json are seen.
+    wanted = docsets
+    docsets = load_docsets(docsets[0][1], repo_root)
+    regenerate(args, wanted, bundles, repo_root)
+    state = snapshot(roots)
+    print(f"Watching {', '.join(str(r.relative_to(repo_root)) for r in roots)} (Ctrl-C to stop)")
+
+    pending: set[Path] = set()
+    last_change = 0.0
+    try:
+        while True:
+            time.sleep(args.poll)
+            current = snapshot(roots)
+            changed = {p for p in current.keys() | state.keys() if current.get(p) != state.get(p)}
+            state = current
+            if changed:
+                pending |= changed
+                last_change = time.monotonic()
+                continue
+            # Debounce: wait until edits have been quiet for a moment, then render once.
+            if not pending or time.monotonic() - last_change < args.debounce:
+                continue
+
+            paths, pending = pending, set()
+            if any(p in paths for p in generator):
+                print("generator code changed; restart --watch to pick it up", file=sys.stderr)
+                continue
+            if any(p.parent == root / "locales" for p in paths):
+                try:
+                    bundles = [docsets[0][1].labels(labels.code) for labels in bundles]
+                except ValueError as e:
+                    print(f"error: {e}", file=sys.stderr)
+                    continue
+            templates = {repo_root / kind.template for kind, *_ in docsets}
+            if root / "index.json" in paths or any(p in templates for p in paths):
+                try:
+                    catalog = Catalog(root) if root / "index.json" in paths else docsets[0][1]
+                    docsets = load_docsets(catalog, repo_root)
+                except (OSError, ValueError) as e:
+                    print(f"error: {e}", file=sys.stderr)
+                    continue
+            try:
+                wanted = narrow_docsets(args, docsets)
+            except KeyError as e:
+                print(f"error: no doc matches {e.args[0]!r}", file=sys.stderr)
+                continue
+            rel = [os.path.relpath(p, repo_root) for p in paths]
+            everything = any(p.is_relative_to(d) for p in paths for d in shared)
+            affected: list[DocSet] = []
+            for (kind, catalog, layout, ids), (_, _, _, selected) in zip(docsets, wanted):
+                changed_ids = ids if everything else changed_docs(kind, catalog, repo_root, rel)
+                for doc_id in changed_ids:
+                    catalog.invalidate(doc_id)
+                keep = set(selected)
+                affected.append((kind, catalog, layout, [aid for aid in changed_ids if aid in keep]))
+            names = [doc_key(kind.name, aid) for kind, _, _, ids in affected for aid in ids]
+            if names:
+                print(f"[{time.strftime('%H:%M:%S')}] {', '.join(names[:5])}{' ...' if len(names) > 5 else ''}")
+                regenerate(args, affected, bundles, repo_root)
+    except KeyboardInterrupt:
+        return 0
+
+
+def validate(docsets: list[DocSet], repo_root: Path) -> int:
+    import time
+
+    from agent_kinds import doc_key
+
+    t0 = time.perf_counter()
+    invalid = {
+        doc_key(kind.name, aid): problems
+        for kind, catalog, _, selected in docsets
+        for aid, problems in catalog.validate(selected).items()
+    }
+    catalog = docsets[0][1]
+    for code in catalog.locales():
+        try:
+            catalog.labels(code)
+        except ValueError as e:
+            invalid[f"locale {code}"] = [(f"locale {code}", str(e))]
+    from agent_template import check_templates
+
+    for where, message in check_templates(repo_root):
+        invalid.setdefault(where, []).append((where, message))
+    elapsed = time.perf_counter() - t0
+    for problems in invalid.values():
+        for where, message in problems:
+            print(f"{where}: {message}")
+    n = sum(len(p) for p in invalid.values())
+    total = sum(len(selected) for *_, selected in docsets)
+    print(f"Validated {total} specs in {elapsed * 1000:.1f} ms: {n} problem(s) in {len(invalid)} spec(s)")
+    return 1 if invalid else 0
+
+
+def check(args: argparse.Namespace, docsets: list[DocSet], bundles: list[Labels], repo_root: Path) -> int:
+    """Render in memory and compare with the docs on disk; print unified diffs for drifted docs."""
+    import difflib
+    import time
+
+    from agent_kinds import doc_key, render_doc
+
+    t0 = time.perf_counter()
+    # Stamps are chosen as a regeneration would, so an unchanged doc is not drift on a new day.
+    previous = load_manifest(repo_root / MANIFEST_PATH)
+    invalid: dict[str, list] = {}
+    jobs: list[RenderJob] = []
+    for kind, catalog, layout, selected in docsets:
+        kind_invalid = catalog.validate(selected)
+        invalid.update((doc_key(kind.name, aid), problems) for aid, problems in kind_invalid.items())
+        for aid in selected:
+            if aid in kind_invalid:
+                continue
+            for labels in kind_bundles(kind, bundles):
+                key = manifest_key(doc_key(kind.name, aid), labels.code)
+                out = doc_dir(repo_root, kind, labels.code) / f"{aid}.md"
+                jobs.append((key, catalog.get(aid), out, labels, layout, *previous_stamp(previous.get(key))))
+    # A dry run compares rendered bytes with the file (size first) without writing;
+    # only the docs that differ are rendered again for a diff.
+    results, _, _ = run_jobs(jobs, args.jobs or os.cpu_count() or 1, True, False, (args.fragment_cache, False, None))
+    drifted = {key: stamp for key, written, _, stamp, _ in results if written is not None}
+    errors = [(key, error) for key, _, error, _, _ in results if error is not None]
+    for key, spec, out, labels, layout, *_ in jobs:
+        if key not in drifted:
+            continue
+        rel = str(out.relative_to(repo_root))
+        try:
+            current = out.read_text(encoding="utf-8").splitlines(keepends=True)
+        except FileNotFoundError:
+            print(f"drift: {rel} is missing")
+            continue
+        lines = list(difflib.unified_diff(
+            current, render_doc(spec, labels=labels, layout=layout, stamp=drifted[key]).splitlines(keepends=True),
+            fromfile=rel, tofile=f"{rel} (generated)", n=args.context,
+        ))
+        print(f"drift: {rel}")
+        for line in lines[:args.max_diff_lines]:
+            sys.stdout.write(line if line.endswith("\n") else line + "\n")
+        if len(lines) > args.max_diff_lines:
+            print(f"... {len(lines) - args.max_diff_lines} more diff lines")
+    elapsed = time.perf_counter() - t0
+    for where, error in [p for ps in invalid.values() for p in ps] + errors:
+        print(f"error: {where}: {error}", file=sys.stderr)
+    print(f"Checked {len(jobs)} docs in {elapsed * 1000:.0f} ms: {len(drifted)} drifted")
+    return 1 if drifted or errors or invalid else 0
+
+
+def roundtrip(catalog: Catalog, bundles: list[Labels], layout: Layout, selected: list[str], repo_root: Path) -> int:
+    """Check that every rendered doc parses back to its spec; report docs on disk that differ."""
+    import time
+
+    from agent_docs import render_agent
+    from agent_parse import ParseError, canonical_spec, parse_agent, spec_diff
+
+    invalid = catalog.validate(selected)
+    problems = [p for ps in invalid.values() for p in ps]
+    warnings = []
+    t0 = time.perf_counter()
+    n = 0
+    for agent_id in selected:
+        if agent_id in invalid:
+            continue
+        spec = catalog.get(agent_id)
+        expected = canonical_spec(spec, layout)
+        for labels in bundles:
+            n += 1
+            where = f"{agent_id}@{labels.code}"
+            try:
+                doc = render_agent(spec, labels=labels, layout=layout)
+                diff = spec_diff(parse_agent(doc, labels, where, layout), expected)
+            except ParseError as e:
+                problems.append((where, f"rendered doc does not parse: {e}"))
+                continue
+            if diff:
+                problems.append((where, f"round trip changes {', '.join(diff)}"))
+            doc = locale_dir(repo_root, labels.code) / f"{agent_id}.md"
+            rel = doc.relative_to(repo_root)
+            try:
+                diff = spec_diff(parse_agent(doc.read_text(encoding="utf-8"), labels, str(rel), layout), expected)
+            except FileNotFoundError:
+                continue
+            except ParseError as e:
+                warnings.append((str(rel), f"hand-edited beyond the generated layout: {e}"))
+                continue
+            if diff:
+                warnings.append((str(rel), f"differs from the catalog in {', '.join(diff)} (regenerating overwrites it)"))
+    elapsed = time.perf_counter() - t0
+    for where, message in problems:
+        print(f"{where}: {message}")
+    for where, message in warnings:
+        print(f"warning: {where}: {message}")
+    print(f"Round-tripped {n} docs in {elapsed * 1000:.1f} ms: {len(problems)} problem(s), {len(warnings)} warning(s)")
+    return 1 if problems else 0
+
+
+def export(args: argparse.Namespace, catalog: Catalog, bundles: list[Labels], layout: Layout, selected: list[str]) -> int:
+    import time
+
+    import agent_export
+
+    try:
+        fmt = agent_export.export_format(args.export, args.export_format)
+    except ValueError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    t0 = time.perf_counter()
+    invalid = catalog.validate(selected)
+    specs = (catalog.get(aid) for aid in selected if aid not in invalid)
+    items = agent_export.records(specs, bundles, layout, GENERATOR_VERSION)
+    args.export.parent.mkdir(parents=True, exist_ok=True)
+    if fmt == "sqlite":
+        import agent_links
+
+        n = agent_export.write_sqlite(args.export, items, agent_links.load_roles(catalog.root / "roles.json"))
+    else:
+        n = (agent_export.write_json if fmt == "json" else agent_export.write_jsonl)(args.export, items)
+    print(f"Exported {n} docs ({fmt}) to {args.export} in {(time.perf_counter() - t0) * 1000:.0f} ms")
+    for problems in invalid.values():
+        for where, error in problems:
+            print(f"error: {where}: {error}", file=sys.stderr)
+    return 1 if invalid else 0
+
+
+def check_links(catalog: Catalog, selected: list[str], repo_root: Path) -> int:
+    import agent_links
+
+    index = agent_links.build_link_index(repo_root, repo_root / agent_links.LINK_CACHE_PATH)
+    problems = agent_links.check_links(index, repo_root)
+    roles = agent_links.load_roles(catalog.root / "roles.json")
+    # Roles are only checked on specs that validate; the others are reported as they are.
+    invalid = catalog.validate(selected)
+    valid = [aid for aid in selected if aid not in invalid]
+    problems += [p for ps in invalid.values() for p in ps]
+    problems += agent_links.check_roles(catalog.load(valid), roles, set(catalog.ids()))
+
+    for where, message in problems:
+        print(f"{where}: {message}")
+    n_links = sum(len(entry["links"]) for entry in index.values())
+    print(f"Checked {n_links} links in {len(index)} files and roles of {len(valid)} agents: {len(problems)} problem(s)")
+    return 1 if problems else 0
+
+
+def metric_rules(args: argparse.Namespace, catalog: Catalog, selected: list[str], repo_root: Path) -> int:
+    """--rules lists the thresholds compiled from the selected specs; --evaluate checks samples against them."""
+    import json
+    import time
+
+    import agent_rules
+
+    aliases = agent_rules.load_aliases(repo_root / agent_rules.GLOSSARY_PATH)
+    invalid = catalog.validate(selected)
+    rules = [rule for aid in selected if aid not in invalid for rule in agent_rules.spec_rules(catalog.get(aid), aliases)]
+    for problems in invalid.values():
+        for where, error in problems:
+            print(f"error: {where}: {error}", file=sys.stderr)
+    if args.evaluate is None:
+        for rule in rules:
+            note = f"  ({rule.note})" if rule.note else ""
+            print(f"{rule.agent_id:<24} {rule.section:<8} {rule.describe()}{note}")
+        print(f"Compiled {len(rules)} rules from {len(selected) - len(invalid)} agents")
+        return 1 if invalid else 0
+
+    t0 = time.perf_counter()
+    try:
+        names: dict[str, str] = {}
+        cols = agent_rules.columns(agent_rules.read_samples(args.evaluate), aliases, names)
+    except (OSError, ValueError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    outcomes = agent_rules.evaluate(rules, cols)
+    seconds = time.perf_counter() - t0
+    for outcome in outcomes:
+        if outcome.samples or outcome.errors:
+            print(agent_rules.format_outcome(outcome))
+    if args.report:
+        args.report.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.report, "w", encoding="utf-8") as f:
+            f.writelines(json.dumps(agent_rules.outcome_record(o), ensure_ascii=False) + "\n" for o in outcomes)
+    n = sum(len(values) for by_agent in cols.values() for by_dim in by_agent.values() for values in by_dim.values())
+    keys = {rule.key for rule in rules}
+    unmatched = sorted(name for name, key in names.items() if key not in keys)
+    if unmatched:
+        print(f"warning: no rule for sample metric(s): {', '.join(unmatched)}", file=sys.stderr)
+    counts = {status: sum(o.status == status for o in outcomes) for status in ("PASS", "FAIL", "NO DATA")}
+    print(
+        f"Checked {n} samples against {len(rules)} rules in {seconds * 1000:.0f} ms: "
+        f"{counts['PASS']} passed, {counts['FAIL']} failed, {counts['NO DATA']} without samples"
+    )
+    return 1 if counts["FAIL"] or invalid else 0
+
+
+def role_graph(args: argparse.Namespace, catalog: Catalog) -> int:
+    """--graph reports handoff cycles and orphaned roles (and exports the graph); --handoffs
+    ROLE prints who ROLE receives from, hands off to and depends on, directly and transitively."""
+    import json
+    import time
+    from pathlib import Path
+
+    import agent_graph
+    import agent_links
+
+    t0 = time.perf_counter()
+    roles = agent_links.load_roles(catalog.root / "roles.json")
+    # Dependencies cross any selection, so the graph always covers the whole catalog.
+    ids = catalog.ids()
+    invalid = catalog.validate(ids)
+    graph = agent_graph.build_graph((catalog.get(aid) for aid in ids if aid not in invalid), roles)
+    for problems in invalid.values():
+        for where, error in problems:
+            print(f"error: {where}: {error}", file=sys.stderr)
+
+    if args.handoffs:
+        names = [name for ref in args.handoffs for name in agent_links.role_names(ref, roles)]
+        nodes = [aid if aid in graph.index else name for name in names for aid in roles.get(name) or [name]]
+        unknown = [name for name in nodes if name not in graph.index]
+        if unknown:
+            print(f"error: no role {', '.join(map(repr, unknown))} in the handoff graph", file=sys.stderr)
+            return 2
+        for name in dict.fromkeys(nodes):
+            print("\n".join(agent_graph.describe(graph, name)))
+        return 1 if invalid else 0
+
+    cycles = graph.cycles()
+    orphans = graph.orphans()
+    seconds = time.perf_counter() - t0
+    if args.graph != "-":
+        path = Path(args.graph)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if path.suffix.lower() == ".json":
+            path.write_text(json.dumps(graph.to_json(), ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+        else:
+            path.write_text(graph.to_dot(), encoding="utf-8")
+        print(f"Wrote the role graph to {path}")
+    for component in cycles:
+        loop = [graph.names[n] for n in graph.shortest_cycle(component)]
+        print(f"cycle of {len(component)} roles: {', '.join(graph.names[n] for n in component)}")
+        print(f"  e.g. {' -> '.join(loop + loop[:1])}")
+    for n in orphans:
+        print(f"orphan: {graph.names[n]} ({graph.kinds[n]}) is in no handoff or RACI row")
+    kinds = {kind: graph.kinds.count(kind) for kind in ("agent", "external", "unknown")}
+    handoffs = sum(e.kind == agent_graph.HANDOFF for e in graph.edges)
+    print(
+        f"Role graph: {len(graph.names)} roles ({kinds['agent']} agents, {kinds['external']} external, "
+        f"{kinds['unknown']} unknown), {handoffs} handoffs, {len(graph.edges) - handoffs} RACI assignments; "
+        f"{len(cycles)} cycle(s), {len(orphans)} orphan(s) in {seconds * 1000:.0f} ms"
+    )
+    return 1 if invalid else 0
+
+
+def query(args: argparse.Namespace, repo_root: Path) -> int:
+    import agent_index
+
+    sections = ["raci"] if args.role else args.section or agent_index.SECTIONS
+    try:
+        hits = agent_index.search(repo_root / INDEX_PATH, args.query, sections, args.limit)
+    except FileNotFoundError:
+        print(f"error: no search index at {INDEX_PATH}; regenerate first", file=sys.stderr)
+        return 2
+    except ValueError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    for hit in hits:
+        print(agent_index.format_hit(hit, args.role, args.query))
+    return 0 if hits else 1
+
+
+def publish_url(value: str) -> str:
+    """argparse type for --publish: reject a bad URL before anything is regenerated."""
+    import argparse
+
+    from agent_publish import check_url
+
+    try:
+        check_url(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from None
+    return value
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    import argparse
+    from pathlib import Path
+
+    parser = argparse.ArgumentParser(
+        prog="refactor_agents.py", description="Regenerate agents/, prompts/ and skills/ docs from the spec catalog."
+    )
+    parser.add_argument("--version", action="version", version=f"%(prog)s {GENERATOR_VERSION}")
+    parser.add_argument("--list", action="store_true", help="print the selected doc keys and exit")
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=1,
+        help="render and write with N worker processes (0 = one per CPU; default: 1)",
+    )
+    parser.add_argument(
+        "--only", action="append", metavar="PATTERN",
+        help="render only docs whose key (agent id, prompts/ID or skills/ID) matches this key or glob (repeatable); "
+        "other specs are not loaded",
+    )
+    parser.add_argument(
+        "--kind", action="append", choices=("agents", "prompts", "skills"),
+        help="render only docs of this kind (repeatable; default: all)",
+    )
+    parser.add_argument(
+        "--changed-since", metavar="REF",
+        help="render only docs affected by files changed since git REF (working tree and untracked files included)",
+    )
+    locales = parser.add_mutually_exclusive_group()
+    locales.add_argument(
+        "--locale", action="append", metavar="CODE",
+        help=f"render with the labels of catalog/locales/CODE.json into {LOCALE_DIR.format(locale='CODE')}/ "
+        "(repeatable; default: zh-CN into agents/)",
+    )
+    locales.add_argument(
+        "--all-locales", action="store_true",
+        help="render every agent for the default locale and every bundle in catalog/locales/ in one pass",
+    )
+    parser.add_argument("--catalog", type=Path, metavar="DIR", help=f"spec catalog directory (default: {CATALOG_DIR}/)")
+    parser.add_argument("--force", action="store_true", help="ignore the manifest and re-render every selected spec")
+    parser.add_argument(
+        "--timings", action="store_true",
+        help="report per-section and per-agent timings (fm, resp_block, templates_block, handoff_block, write, ...)",
+    )
+    parser.add_argument("--trace", type=Path, metavar="FILE", help="write section timings as Chrome trace-event JSON")
+    parser.add_argument(
+        "--profile", type=Path, metavar="FILE",
+        help="run under cProfile and dump stats to FILE (forces --jobs 1 so workers are profiled too)",
+    )
+    parser.add_argument(
+        "--fragment-cache", type=int, default=4096, metavar="N",
+        help="keep up to N rendered sections per process and reuse them for identical inputs (0 = off; default: 4096)",
+    )
+    parser.add_argument(
+        "--persist-fragments", action="store_true",
+        help=f"reuse the fragment cache across runs via {FRAGMENTS_PATH}",
+    )
+    parser.add_argument(
+        "--export-format", choices=("json", "jsonl", "sqlite"),
+        help="format for --export (default: from the file suffix)",
+    )
+    parser.add_argument(
+        "--context", type=int, default=2, metavar="N",
+        help="with --check, lines of context in unified diffs (default: 2)",
+    )
+    parser.add_argument(
+        "--max-diff-lines", type=int, default=60, metavar="N",
+        help="with --check, print at most N diff lines per doc (default: 60)",
+    )
+    parser.add_argument(
+        "--section", action="append", choices=("gates", "kpis", "tools", "raci", "templates"),
+        help="with --query, search only this section (repeatable; default: all)",
+    )
+    parser.add_argument(
+        "--role", choices=("R", "A", "C", "I"),
+        help="with --query, search RACI rows and print who holds this role",
+    )
+    parser.add_argument("--limit", type=int, default=20, metavar="N", help="with --query, print at most N matches (default: 20)")
+    parser.add_argument("--no-index", action="store_true", help=f"do not update the search index ({INDEX_PATH})")
+    parser.add_argument(
+        "--report", type=Path, metavar="FILE",
+        help="with --evaluate, write every rule's outcome (PASS, FAIL or NO DATA) to FILE as JSON lines",
+    )
+    parser.add_argument(
+        "--publish", type=publish_url, metavar="URL",
+        help="after regenerating, upload the selected docs that changed since they were last published to URL "
+        "(batched JSON POSTs; a bearer token is read from $REFACTOR_AGENTS_PUBLISH_TOKEN)",
+    )
+    parser.add_argument(
+        "--publish-jobs", type=int, default=8, metavar="N",
+        help="with --publish, keep up to N requests in flight over N pooled connections (default: 8)",
+    )
+    parser.add_argument(
+        "--publish-batch", type=int, default=50, metavar="N", help="with --publish, send N docs per request (default: 50)"
+    )
+    parser.add_argument(
+        "--publish-retries", type=int, default=3, metavar="N",
+        help="with --publish, retry a batch N times on connection errors, timeouts, 429 and 5xx (default: 3)",
+    )
+    parser.add_argument("--poll", type=float, default=0.1, help=argparse.SUPPRESS)
+    parser.add_argument(
+        "--debounce", type=float, default=0.2, metavar="SECONDS",
+        help="with --watch, wait until edits are quiet this long before rendering (default: 0.2)",
+    )
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("-n", "--dry-run", action="store_true", help="report which docs would change without writing")
+    mode.add_argument("--stdout", action="store_true", help="write rendered docs to stdout instead of agents/")
+    mode.add_argument(
+        "--validate", action="store_true",
+        help="schema-check the selected specs and report every problem with its field path; exit 1 on problems",
+    )
+    mode.add_argument(
+        "--check", action="store_true",
+        help="render in memory and diff against the docs on disk without writing; exit 1 on drift (CI gate)",
+    )
+    mode.add_argument(
+        "--roundtrip", action="store_true",
+        help="check that each selected doc (per --locale) parses back to its spec; warn about docs on disk that differ",
+    )
+    mode.add_argument(
+        "--export", type=Path, metavar="FILE",
+        help="write the selected specs and their rendered docs (for each --locale) to one .json, .jsonl or .sqlite file",
+    )
+    mode.add_argument(
+        "--check-links", action="store_true",
+        help="validate links in agents/, prompts/, skills/, instructions/, meta-info/ and the selected agents' role references; exit 1 on problems",
+    )
+    mode.add_argument(
+        "--watch", action="store_true",
+        help="stay running and re-render affected agents when specs, instructions/ or meta-info/ change",
+    )
+    mode.add_argument(
+        "--rules", action="store_true",
+        help="list the thresholds in the selected agents' KPIs, gates and responsibility metrics as typed rules",
+    )
+    mode.add_argument(
+        "--evaluate", type=Path, metavar="FILE",
+        help="check metric samples (.csv or .jsonl with metric, value and optional unit, agent_id) against "
+        "the selected agents' rules; exit 1 if any rule fails",
+    )
+    mode.add_argument(
+        "--graph", nargs="?", const="-", metavar="FILE",
+        help="analyse the handoff/RACI graph of the catalog (cycles, orphaned roles) and optionally "
+        "write it to FILE as Graphviz .dot or .json",
+    )
+    mode.add_argument(
+        "--handoffs", action="append", metavar="ROLE",
+        help="print who ROLE (agent id or roles.json name) receives from and hands off to, "
+        "directly and transitively, and its RACI assignments (repeatable)",
+    )
+    mode.add_argument(
+        "--query", metavar="TEXT",
+        help="print the gates, KPIs, tools, RACI rows and templates containing every term of TEXT, "
+        "from the search index as of the last regeneration; exit 1 if none",
+    )
+    return parser.parse_args(argv)
+
+
+def fast_command(argv: list[str]) -> int | None:
+    """Answer --version / --list (with no other options) without argparse or the renderer."""
+    if argv == ["--version"]:
+        print(f"refactor_agents.py {GENERATOR_VERSION}")
+        return 0
+    if argv == ["--list"]:
+        with open(os.path.join(REPO_ROOT, CATALOG_DIR, "index.json"), encoding="utf-8") as f:
+            text = f.read()
+        keys = index_keys(text)
+        if keys is None:
+            import json
+
+            keys = [(kind, aid) for kind, docs in json.loads(text).items() for aid in docs]
+        # Doc keys as agent_kinds.doc_key() forms them.
+        print("\n".join(aid if kind == "agents" else f"{kind}/{aid}" for kind, aid in keys))
+        return 0
+    return None
+
+
+def index_keys(text: str) -> list[tuple[str, str]] | None:
+    """(kind, id) pairs of an index.json of plain string entries, or None for anything else.
+
+    Spares --list the json import (which pulls in re); the caller falls back to json for
+    escapes, non-string values or malformed input.
+    """
+    keys: list[tuple[str, str]] = []
+    depth, kind, is_key, i = 0, "", True, 0
+    while i < len(text):
+        c = text[i]
+        if c == '"':
+            end = text.find('"', i + 1)
+            if end < 0:
+                return None
+            s = text[i + 1:end]
+            if "\\" in s:
+                return None
+            if is_key and depth == 1:
+                kind = s
+            elif is_key and depth == 2:
+                keys.append((kind, s))
+            elif not is_key and depth != 2:
+                return None
+            i = end
+        elif c == "{":
+            if depth >= 2 or (depth == 1 and is_key):
+                return None
+            depth, is_key = depth + 1, True
+        elif c == "}":
+            depth -= 1
+        elif c == ",":
+            is_key = True
+        elif c == ":":
+            is_key = False
+        elif not c.isspace():
+            return None
+        i += 1
+    return keys if depth == 0 else None
+
+
+def main(argv: list[str] | None = None) -> int:
+    code = fast_command(sys.argv[1:] if argv is None else argv)
+    if code is not None:
+        return code
+    args = parse_args(argv)
+    if args.profile:
+        import cProfile
+
+        args.jobs = 1
+        profiler = cProfile.Profile()
+        try:
+            return profiler.runcall(run, args)
+        finally:
+            profiler.dump_stats(args.profile)
+            print(f"cProfile stats written to {args.profile} (inspect with: python3 -m pstats {args.profile})", file=sys.stderr)
+    return run(args)
+
+
+def run(args: argparse.Namespace) -> int:
+    from pathlib import Path
+
+    from agent_docs import DEFAULT_LOCALE, Catalog, stream_agent
+    from agent_kinds import doc_key, render_doc
+
+    repo_root = Path(REPO_ROOT)
+    if args.query is not None:
+        return query(args, repo_root)
+    catalog = Catalog(args.catalog) if args.catalog else default_catalog()
+    try:
+        docsets = load_docsets(catalog, repo_root)
+    except ValueError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    try:
+        docsets = narrow_docsets(args, docsets)
+    except KeyError as e:
+        print(f"error: no doc matches {e.args[0]!r}", file=sys.stderr)
+        return 2
+    if args.changed_since:
+        try:
+            changed = git_changed_files(repo_root, args.changed_since)
+        except Exception as e:
+            print(f"error: cannot diff against {args.changed_since!r}: {e}", file=sys.stderr)
+            return 2
+        narrowed = []
+        for kind, cat, layout, ids in docsets:
+            affected = set(changed_docs(kind, cat, repo_root, changed))
+            narrowed.append((kind, cat, layout, [aid for aid in ids if aid in affected]))
+        docsets = narrowed
+
+    if args.list:
+        print("\n".join(doc_key(kind.name, aid) for kind, _, _, ids in docsets for aid in ids))
+        return 0
+    try:
+        codes = catalog.locales() if args.all_locales else args.locale or [DEFAULT_LOCALE]
+        bundles = [catalog.labels(code) for code in dict.fromkeys(codes)]
+    except ValueError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    if args.stdout:
+        import io
+
+        invalid: dict[str, list] = {}
+        out = io.TextIOWrapper(sys.stdout.buffer, encoding="utf-8", newline="")
+        try:
+            for kind, cat, layout, ids in docsets:
+                kind_invalid = cat.validate(ids)
+                invalid.update((doc_key(kind.name, aid), problems) for aid, problems in kind_invalid.items())
+                for labels in kind_bundles(kind, bundles):
+                    for doc_id in ids:
+                        if doc_id in kind_invalid:
+                            continue
+                        if kind.name == "agents":
+                            stream_agent(cat.get(doc_id), out, labels=labels, layout=layout)
+                        else:
+                            out.write(render_doc(cat.get(doc_id), labels=labels, layout=layout))
+        finally:
+            out.flush()
+            out.detach()
+        for where, error in [p for ps in invalid.values() for p in ps]:
+            print(f"error: {where}: {error}", file=sys.stderr)
+        return 1 if invalid else 0
+
+    # --roundtrip, --export, --check-links, --rules, --evaluate, --graph and --handoffs work on agent docs.
+    _, _, layout, selected = docsets[0]
+    if args.validate:
+        return validate(docsets, repo_root)
+    if args.check:
+        return check(args, docsets, bundles, repo_root)
+    if args.roundtrip:
+        return roundtrip(catalog, bundles, layout, selected, repo_root)
+    if args.export:
+        return export(args, catalog, bundles, layout, selected)
+    if args.check_links:
+        return check_links(catalog, selected, repo_root)
+    if args.rules or args.evaluate:
+        return metric_rules(args, catalog, selected, repo_root)
+    if args.graph or args.handoffs:
+        return role_graph(args, catalog)
+    if args.watch:
+        return watch(args, docsets, bundles, repo_root)
+    return regenerate(args, docsets, bundles, repo_root)
+
+
+def regenerate(args: argparse.Namespace, docsets: list[DocSet], bundles: list[Labels], repo_root: Path) -> int:
+    import hashlib
+
+    from agent_docs import ZH_CN
+    from agent_kinds import doc_key
+
+    workers = args.jobs or os.cpu_count() or 1
+    timed = args.timings or args.trace is not None
+    out_dirs = {
+        (kind.name, labels.code): doc_dir(repo_root, kind, labels.code)
+        for kind, _, _, selected in docsets if selected
+        for labels in kind_bundles(kind, bundles)
+    }
+    manifest_path = repo_root / MANIFEST_PATH
+
+    if not args.dry_run:
+        for out_dir in out_dirs.values():
+            out_dir.mkdir(parents=True, exist_ok=True)
+    previous = load_manifest(manifest_path)
+    # A locale's labels affect all of its docs. The built-in default keeps the plain spec hash.
+    label_salts = {
+        labels.code: "" if labels == ZH_CN else hashlib.sha256("\0".join(labels).encode("utf-8")).hexdigest()
+        for labels in bundles
+    }
+    # Start from the previous manifest so a partial run keeps entries of docs it did not touch.
+    known = {doc_key(kind.name, aid) for kind, catalog, _, _ in docsets for aid in catalog.ids()}
+    entries = {key: e for key, e in previous.items() if key.partition("@")[0] in known}
+    stats = WriteStats()
+    errors: list[tuple[str, str]] = []
+    jobs: list[RenderJob] = []
+    # Raw spec hashes of the valid selected agents, for the search index.
+    indexable: dict[str, str] = {}
+
+    for kind, catalog, layout, selected in docsets:
+        salt = manifest_salt(repo_root, kind.template)
+        targets = kind_bundles(kind, bundles)
+        # Specs are hashed, parsed and validated once however many locales are rendered.
+        dirty: list[tuple[str, str, Path, Labels, str | None, str | None]] = []
+        for doc_id in selected:
+            name = doc_key(kind.name, doc_id)
+            try:
+                source = catalog.source_hash(doc_id)
+            except OSError as e:
+                errors.append((name, f"{type(e).__name__}: {e}"))
+                for labels in targets:
+                    entries.pop(manifest_key(name, labels.code), None)
+                continue
+            base = spec_hash(source, salt)
+            if kind.name == "agents":
+                indexable[doc_id] = source
+            for labels in targets:
+                key = manifest_key(name, labels.code)
+                out = out_dirs[kind.name, labels.code] / f"{doc_id}.md"
+                lsalt = label_salts[labels.code]
+                digest = hashlib.sha256((lsalt + base).encode("utf-8")).hexdigest() if lsalt else base
+                entries[key] = {"hash": digest}
+                prev = previous.get(key)
+                if not args.force and isinstance(prev, dict) and prev.get("hash") == digest and prev.get("stat") == output_stamp(out):
+                    entries[key] = prev
+                    stats.skipped += 1
+                    continue
+                dirty.append((key, doc_id, out, labels, *previous_stamp(prev)))
+
+        # Validate everything about to be rendered before rendering any of it.
+        invalid = catalog.validate(list(dict.fromkeys(doc_id for _, doc_id, *_ in dirty)))
+        for doc_id, problems in invalid.items():
+            errors += problems
+            if kind.name == "agents":
+                indexable.pop(doc_id, None)
+            for labels in targets:
+                entries.pop(manifest_key(doc_key(kind.name, doc_id), labels.code), None)
+        jobs += [
+            (key, catalog.get(doc_id), out, labels, layout, stamp, content)
+            for key, doc_id, out, labels, stamp, content in dirty if doc_id not in invalid
+        ]
+    outputs = {key: out for key, _, out, *_ in jobs}
+
+    # Persisted fragments are dropped together with the agent docs' hashes (generator, template).
+    salt = manifest_salt(repo_root)
+    fragments_path = repo_root / FRAGMENTS_PATH
+    persisted = load_fragments(fragments_path, salt) if args.persist_fragments and args.fragment_cache > 0 else []
+    results, spans, (hits, misses, evictions, new) = run_jobs(
+        jobs, workers, args.dry_run, timed, (args.fragment_cache, args.persist_fragments, persisted)
+    )
+    for key, written, error, stamp, content in results:
+        if error is not None:
+            errors.append((key, error))
+            # Not recording a hash makes the next run retry this spec.
+            del entries[key]
+            continue
+        entries[key].update(stat=output_stamp(outputs[key]), stamp=stamp, content=content)
+        if written is None:
+            stats.skipped += 1
+        else:
+            stats.touched += 1
+            stats.bytes_written += written
+            if args.dry_run:
+                print(f"would write {outputs[key].relative_to(repo_root)} ({written} bytes)")
+
+    docs_dirs = ", ".join(str(d) for d in out_dirs.values())
+    if args.dry_run:
+        print(f"Dry run for {docs_dirs}: {stats.touched} docs would change ({stats.bytes_written} bytes), {stats.skipped} unchanged")
+    else:
+        save_manifest(manifest_path, entries)
+        if indexable and not args.no_index:
+            import agent_index
+
+            _, agent_catalog, _, _ = docsets[0]
+            reindexed, dropped = agent_index.update(
+                repo_root / INDEX_PATH, indexable, agent_catalog.get, set(agent_catalog.ids()), args.force
+            )
+            if reindexed or dropped:
+                print(f"Search index: {reindexed} agents re-indexed, {dropped} dropped")
+        if args.persist_fragments and new:
+            save_fragments(fragments_path, salt, persisted + new, args.fragment_cache)
+        print(f"Regenerated docs into {docs_dirs}: {stats.summary()}")
+    if args.publish:
+        import agent_publish
+
+        # Docs of invalid or failed specs have no manifest entry and are not published.
+        paths = [
+            out_dirs[kind.name, labels.code] / f"{doc_id}.md"
+            for kind, _, _, selected in docsets
+            for labels in kind_bundles(kind, bundles)
+            for doc_id in selected
+            if manifest_key(doc_key(kind.name, doc_id), labels.code) in entries
+        ]
+        try:
+            result = agent_publish.publish_docs(
+                args.publish, [path for path in paths if path.exists()], repo_root,
+                args.publish_jobs, args.publish_batch, args.publish_retries, dry_run=args.dry_run,
+            )
+        except ValueError as e:
+            errors.append(("--publish", str(e)))
+        else:
+            if args.dry_run:
+                print(f"Would publish {result.published} docs to {args.publish}, {result.unchanged} unchanged")
+            else:
+                print(
+                    f"Published {result.published} docs to {args.publish} in {result.seconds:.2f} s "
+                    f"({result.requests} requests, {result.retries} retries), {result.unchanged} unchanged"
+                )
+            errors += [(path, f"publish failed: {error}") for path, error in result.failed]
+    if hits + misses:
+        print(
+            f"Fragment cache: {hits} hits, {misses} misses ({hits / (hits + misses):.0%} hit rate), "
+            f"{evictions} evictions"
+        )
+    if args.timings:
+        print(timings_report(spans))
+    if args.trace:
+        write_trace(args.trace, spans)
+        print(f"Trace written to {args.trace}")
+    for where, error in errors:
+        print(f"error: {where}: {error}", file=sys.stderr)
+    return 1 if errors else 0
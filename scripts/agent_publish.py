@@ -0,0 +1,348 @@
+"""Publish rendered docs to the docs/config service: only changed docs, in batches, over a
+small pool of keep-alive connections.
+
+The service takes `POST <url>` with a JSON body `{"docs": [{"path", "sha256", "content"}]}`
+and answers 2xx once the batch is stored. `jobs` workers each own one HTTP/1.1 connection
+and take batches from a shared queue, so at most `jobs` requests are in flight and no
+connection is opened per doc. Connection errors, timeouts, 429 and 5xx answers are retried
+with exponential backoff (honouring Retry-After); other answers fail the batch.
+
+Progress is resumable: every stored batch is appended to a journal next to the state file
+before the next one is sent, so an interrupted run re-sends only what the service has not
+acknowledged. A doc is skipped while its sha256 matches what was last published to the
+same URL. The client and the stand-in server (`serve`) use only the standard library.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import random
+import time
+from pathlib import Path
+from typing import Iterable, NamedTuple
+from urllib.parse import SplitResult, urlsplit
+
+PUBLISH_DIR = ".cache/refactor_agents/publish"
+TOKEN_ENV = "REFACTOR_AGENTS_PUBLISH_TOKEN"
+_RETRY_STATUS = frozenset({408, 425, 429, 500, 502, 503, 504})
+_MAX_BACKOFF = 10.0
+
+
+class Doc(NamedTuple):
+    path: str  # repo-relative, e.g. agents/qa-engineer.md
+    sha256: str
+    content: bytes
+
+
+class PublishResult(NamedTuple):
+    published: int
+    unchanged: int
+    failed: list[tuple[str, str]]  # (doc path, error)
+    requests: int
+    retries: int
+    seconds: float
+
+
+class PublishError(Exception):
+    def __init__(self, message: str, retry: bool, after: float | None = None) -> None:
+        super().__init__(message)
+        self.retry = retry
+        self.after = after
+
+
+class Journal:
+    """What has been published to one URL: a compacted JSON map plus an append-only log of
+    the batches acknowledged since, replayed on load and folded in by `compact()`."""
+
+    def __init__(self, state_dir: Path, url: str) -> None:
+        name = hashlib.sha256(url.encode("utf-8")).hexdigest()[:16]
+        self.path = state_dir / f"{name}.json"
+        self.log_path = state_dir / f"{name}.log"
+        self.url = url
+        self.published: dict[str, str] = {}
+        self._log = None
+
+    def load(self) -> dict[str, str]:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            if data.get("url") == self.url:
+                self.published = dict(data.get("docs", {}))
+        except (OSError, ValueError, AttributeError):
+            self.published = {}
+        try:
+            with open(self.log_path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        self.published.update(json.loads(line))
+                    except ValueError:
+                        break  # a torn last line from an interrupted write
+        except OSError:
+            pass
+        return self.published
+
+    def record(self, docs: list[Doc]) -> None:
+        if self._log is None:
+            self.log_path.parent.mkdir(parents=True, exist_ok=True)
+            self._log = open(self.log_path, "a", encoding="utf-8")
+        entries = {doc.path: doc.sha256 for doc in docs}
+        self._log.write(json.dumps(entries, ensure_ascii=False) + "\n")
+        self._log.flush()
+        self.published.update(entries)
+
+    def compact(self) -> None:
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"url": self.url, "docs": self.published}, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, self.path)
+        self.log_path.unlink(missing_ok=True)
+
+
+def changed_docs(paths: Iterable[Path], repo_root: Path, published: dict[str, str]) -> tuple[list[Doc], int]:
+    """Docs whose content differs from what was last published, and how many did not."""
+    docs, unchanged = [], 0
+    for path in paths:
+        content = path.read_bytes()
+        digest = hashlib.sha256(content).hexdigest()
+        rel = path.relative_to(repo_root).as_posix()
+        if published.get(rel) == digest:
+            unchanged += 1
+        else:
+            docs.append(Doc(rel, digest, content))
+    return docs, unchanged
+
+
+def batch_body(docs: list[Doc]) -> bytes:
+    return json.dumps(
+        {"docs": [{"path": d.path, "sha256": d.sha256, "content": d.content.decode("utf-8")} for d in docs]},
+        ensure_ascii=False,
+    ).encode("utf-8")
+
+
+def check_url(url: str) -> SplitResult:
+    """Split a publish URL; ValueError unless it is http(s) with a host."""
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise ValueError(f"not an http(s) URL: {url!r}")
+    return parts
+
+
+class Connection:
+    """One keep-alive HTTP/1.1 connection, reopened after errors or `Connection: close`."""
+
+    def __init__(self, url: str, headers: dict[str, str], timeout: float) -> None:
+        parts = check_url(url)
+        self.host = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == "https" else 80)
+        self.tls = parts.scheme == "https"
+        self.target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        netloc = parts.netloc.rpartition("@")[2]
+        self.head = "".join(f"{k}: {v}\r\n" for k, v in {"Host": netloc, **headers}.items())
+        self.timeout = timeout
+        self.reader: asyncio.StreamReader | None = None
+        self.writer: asyncio.StreamWriter | None = None
+
+    async def post(self, body: bytes) -> tuple[int, dict[str, str], bytes]:
+        reused = self.writer is not None
+        try:
+            try:
+                return await asyncio.wait_for(self._post(body), self.timeout)
+            except (EOFError, ConnectionError):
+                if not reused:
+                    raise
+                # The server dropped an idle keep-alive connection: resend once on a fresh one.
+                self.close()
+                return await asyncio.wait_for(self._post(body), self.timeout)
+        except (OSError, EOFError, asyncio.TimeoutError, ValueError) as e:
+            self.close()
+            raise PublishError(f"{type(e).__name__}: {e}" if str(e) else type(e).__name__, retry=True) from None
+
+    async def _post(self, body: bytes) -> tuple[int, dict[str, str], bytes]:
+        if self.writer is None:
+            ssl = None
+            if self.tls:
+                import ssl as ssl_module
+
+                ssl = ssl_module.create_default_context()
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port, ssl=ssl)
+        request = (
+            f"POST {self.target} HTTP/1.1\r\n{self.head}"
+            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n"
+        )
+        self.writer.write(request.encode("latin-1") + body)
+        await self.writer.drain()
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise EOFError("connection closed by the server")
+        version, status, *_ = status_line.decode("latin-1").split(" ", 2)
+        headers: dict[str, str] = {}
+        while (line := await self.reader.readline()) not in (b"\r\n", b"\n", b""):
+            key, _, value = line.decode("latin-1").partition(":")
+            headers[key.strip().lower()] = value.strip()
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while size := int((await self.reader.readline()).split(b";")[0], 16):
+                chunks.append(await self.reader.readexactly(size))
+                await self.reader.readline()
+            while await self.reader.readline() not in (b"\r\n", b"\n", b""):
+                pass  # trailers
+            data = b"".join(chunks)
+        elif "content-length" in headers:
+            data = await self.reader.readexactly(int(headers["content-length"]))
+        else:
+            data = await self.reader.read()
+            headers["connection"] = "close"
+        if headers.get("connection", "").lower() == "close" or version == "HTTP/1.0":
+            self.close()
+        return int(status), headers, data
+
+    def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+
+def _retry_after(headers: dict[str, str]) -> float | None:
+    try:
+        return min(float(headers["retry-after"]), _MAX_BACKOFF)
+    except (KeyError, ValueError):
+        return None
+
+
+async def publish(
+    url: str,
+    docs: list[Doc],
+    journal: Journal | None = None,
+    jobs: int = 8,
+    batch_size: int = 50,
+    retries: int = 3,
+    timeout: float = 30.0,
+    headers: dict[str, str] | None = None,
+) -> tuple[int, list[tuple[str, str]], int, int]:
+    """Upload `docs` in batches; return (published, failures, requests, retries)."""
+    queue: asyncio.Queue[list[Doc]] = asyncio.Queue()
+    for i in range(0, len(docs), batch_size):
+        queue.put_nowait(docs[i:i + batch_size])
+    counts = {"published": 0, "requests": 0, "retries": 0}
+    failed: list[tuple[str, str]] = []
+
+    async def send(conn: Connection, batch: list[Doc]) -> str | None:
+        """Post one batch, retrying transient failures; the final error, or None once stored."""
+        body = batch_body(batch)
+        for attempt in range(retries + 1):
+            counts["requests"] += 1
+            try:
+                status, answer, data = await conn.post(body)
+                if 200 <= status < 300:
+                    return None
+                text = data[:200].decode("utf-8", "replace").strip()
+                raise PublishError(
+                    f"HTTP {status}: {text}" if text else f"HTTP {status}", status in _RETRY_STATUS, _retry_after(answer)
+                )
+            except PublishError as e:
+                if not e.retry or attempt == retries:
+                    return str(e)
+                counts["retries"] += 1
+                # Jittered exponential backoff, unless the server said when to come back.
+                await asyncio.sleep(e.after if e.after is not None else min(_MAX_BACKOFF, 0.05 * 2 ** attempt) * random.uniform(0.5, 1))
+
+    async def worker() -> None:
+        conn = Connection(url, headers or {}, timeout)
+        try:
+            while not queue.empty():
+                batch = queue.get_nowait()
+                error = await send(conn, batch)
+                if error is not None:
+                    failed.extend((doc.path, error) for doc in batch)
+                    continue
+                counts["published"] += len(batch)
+                if journal is not None:
+                    journal.record(batch)
+        finally:
+            conn.close()
+
+    await asyncio.gather(*(worker() for _ in range(max(1, min(jobs, queue.qsize())))))
+    return counts["published"], failed, counts["requests"], counts["retries"]
+
+
+def publish_docs(
+    url: str,
+    paths: Iterable[Path],
+    repo_root: Path,
+    jobs: int = 8,
+    batch_size: int = 50,
+    retries: int = 3,
+    timeout: float = 30.0,
+    dry_run: bool = False,
+) -> PublishResult:
+    """Publish the docs at `paths` that changed since they were last published to `url`."""
+    t0 = time.perf_counter()
+    journal = Journal(repo_root / PUBLISH_DIR, url)
+    docs, unchanged = changed_docs(paths, repo_root, journal.load())
+    if dry_run or not docs:
+        return PublishResult(len(docs) if dry_run else 0, unchanged, [], 0, 0, time.perf_counter() - t0)
+    headers = {}
+    token = os.environ.get(TOKEN_ENV)
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    try:
+        published, failed, requests, retried = asyncio.run(
+            publish(url, docs, journal, jobs, batch_size, retries, timeout, headers)
+        )
+    finally:
+        journal.compact()
+    return PublishResult(published, unchanged, failed, requests, retried, time.perf_counter() - t0)
+
+
+def serve(host: str = "127.0.0.1", port: int = 0, latency: float = 0.0, fail_rate: float = 0.0, seed: int = 0):
+    """A stand-in for the docs service on a background thread: stores batches in memory
+    (`server.docs`: path -> content), answering after `latency` seconds and with 503 for
+    a `fail_rate` share of requests. Returns the server; its URL is `server.url`."""
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    rng = random.Random(seed)
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive
+
+        def do_POST(self) -> None:
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            if latency:
+                time.sleep(latency)
+            with lock:
+                server.requests += 1
+                fail = rng.random() < fail_rate
+            if fail:
+                return self._answer(503, b'{"error": "try again"}')
+            try:
+                docs = json.loads(body)["docs"]
+            except (ValueError, KeyError, TypeError):
+                return self._answer(400, b'{"error": "expected {\\"docs\\": [...]}"}')
+            with lock:
+                for doc in docs:
+                    server.docs[doc["path"]] = doc["content"]
+            self._answer(200, json.dumps({"stored": len(docs)}).encode("utf-8"))
+
+        def _answer(self, status: int, data: bytes) -> None:
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args: object) -> None:
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    server.docs = {}
+    server.requests = 0
+    server.url = f"http://{host}:{server.server_address[1]}/docs/batch"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
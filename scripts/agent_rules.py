@@ -0,0 +1,336 @@
+"""Thresholds as data: compile the KPI, gate and responsibility metric strings of agent specs
+into typed rules and check batches of metric samples against them.
+
+A threshold such as `变更失败率 ≤ 15%（DORA）`, `MTTR ≤ 60min（按等级）` or
+`缺陷修复SLA：P0≤24h，P1≤3d（示例）` becomes one rule per clause: metric, operator, value,
+unit, an optional `/window` (`≤ 2/迭代`) and the parenthesized note. Text before a `：`
+qualifies the metrics after it (`缺陷修复SLA P0`), and so does text around a parenthesized
+threshold (`自动化在CI稳定运行 Flaky`). A bare target (`核心流程覆盖 100%`) means at least
+that value (at most, for `0`), and `3-8 条` a range. Items without a numeric threshold
+(`部署频率提升或维持高水平`) yield no rule.
+
+Metric names match after NFKC normalization, case folding and removing spaces, and through
+the aliases in instructions/metrics-glossary.md (`Change Failure Rate（变更失败率）`).
+Time units convert to seconds on both sides; a sample without a unit is read in the rule's
+unit, so a CSV of plain numbers works for percentages and minutes alike.
+
+Samples are grouped into typed arrays per metric, agent and unit dimension, and each rule is
+applied to its arrays with `map(operator, values, repeat(threshold))` and `min`/`max`, so
+the per-sample work runs in C: a batch of millions of samples costs one comparison per
+(sample, rule) pair that shares a metric, with no Python loop over samples.
+"""
+from __future__ import annotations
+
+import operator
+import re
+import unicodedata
+from array import array
+from dataclasses import dataclass, field
+from itertools import repeat
+from pathlib import Path
+from typing import Iterable, Iterator, NamedTuple
+
+from agent_docs import AgentSpec
+
+GLOSSARY_PATH = "instructions/metrics-glossary.md"
+
+OPS = {"≤": "<=", "<=": "<=", "⩽": "<=", "≥": ">=", ">=": ">=", "⩾": ">=", "=": "==", "==": "==", "<": "<", ">": ">"}
+_COMPARE = {"<=": operator.le, ">=": operator.ge, "==": operator.eq, "<": operator.lt, ">": operator.gt}
+
+# Unit -> (dimension, factor to the dimension's base unit). Time is kept in seconds; counts
+# and percentages are compared as written. Longer spellings come first in the pattern.
+UNITS = {
+    "ms": ("time", 0.001), "s": ("time", 1.0), "min": ("time", 60.0), "分钟": ("time", 60.0),
+    "h": ("time", 3600.0), "小时": ("time", 3600.0), "d": ("time", 86400.0), "天": ("time", 86400.0),
+    "个工作日": ("workdays", 1.0), "工作日": ("workdays", 1.0), "%": ("percent", 1.0),
+    "条": ("count", 1.0), "人": ("count", 1.0), "轮": ("count", 1.0), "次": ("count", 1.0), "个": ("count", 1.0),
+}
+_UNIT = "|".join(
+    re.escape(u) + ("(?![A-Za-z])" if u.isascii() and u.isalpha() else "") for u in sorted(UNITS, key=len, reverse=True)
+)
+_NUMBER = r"\d+(?:\.\d+)?"
+_TAIL = rf"\s*(?P<unit>{_UNIT})?(?:\s*/\s*(?P<per>[^\s()，,；;]+))?(?P<rest>.*)"
+_COMPARISON = re.compile(rf"(?P<metric>.+?)\s*(?P<op>{'|'.join(map(re.escape, sorted(OPS, key=len, reverse=True)))})\s*(?P<value>{_NUMBER}){_TAIL}")
+_RANGE = re.compile(rf"(?P<metric>.+?)\s+(?P<value>{_NUMBER})\s*[-~–]\s*(?P<upper>{_NUMBER}){_TAIL}")
+_TARGET = re.compile(rf"(?P<metric>.+?)\s+(?P<value>{_NUMBER}){_TAIL}")
+_PAREN = re.compile(r"\(([^()]*)\)")
+_INNER = re.compile(r"(?P<outer>[^()]*)\((?P<inner>[^()]*)\)(?P<rest>[^()]*)")
+_CLAUSES = re.compile(r"[，,；;](?![^()]*\))")
+_VALUE = re.compile(rf"\s*(-?{_NUMBER})\s*({_UNIT})?\s*")
+_GLOSSARY_TERM = re.compile(r"^\s*-\s*\*\*(.+?)\*\*")
+
+
+@dataclass(frozen=True, slots=True)
+class Rule:
+    agent_id: str
+    section: str  # kpis, gates or metrics (a responsibility's)
+    source: str  # the spec item the rule was compiled from
+    metric: str
+    op: str  # <=, >=, ==, <, > or "between"
+    value: float
+    unit: str = ""
+    upper: float | None = None  # "between" only
+    per: str = ""
+    note: str = ""
+    key: str = field(default="", compare=False)  # metric as matched against samples
+
+    @property
+    def dimension(self) -> str:
+        return UNITS[self.unit][0] if self.unit else ""
+
+    @property
+    def factor(self) -> float:
+        return UNITS[self.unit][1] if self.unit else 1.0
+
+    def describe(self) -> str:
+        unit = f"{self.unit}/{self.per}" if self.per else self.unit
+        if self.op == "between":
+            return f"{self.metric} {_fmt(self.value)}-{_fmt(self.upper)}{unit}"
+        return f"{self.metric} {self.op} {_fmt(self.value)}{unit}"
+
+
+class Sample(NamedTuple):
+    metric: str
+    value: float
+    unit: str  # "" when the sample gave a plain number
+    agent_id: str  # "" applies the sample to every agent with a rule on the metric
+
+
+class Outcome(NamedTuple):
+    rule: Rule
+    samples: int
+    failed: int
+    worst: float | None  # in the rule's unit
+    errors: int  # samples whose unit cannot be compared with the rule's
+
+    @property
+    def status(self) -> str:
+        if self.failed or self.errors:
+            return "FAIL"
+        return "PASS" if self.samples else "NO DATA"
+
+
+def _fmt(value: float | None) -> str:
+    return "" if value is None else f"{value:g}"
+
+
+def normalize(name: str) -> str:
+    return "".join(unicodedata.normalize("NFKC", name).casefold().split())
+
+
+def load_aliases(path: Path) -> dict[str, str]:
+    """Metric name -> name of its alias group, from the bold `Name（Alias）` glossary terms."""
+    aliases: dict[str, str] = {}
+    if not path.exists():
+        return aliases
+    for line in path.read_text(encoding="utf-8").splitlines():
+        m = _GLOSSARY_TERM.match(line)
+        if not m:
+            continue
+        term = unicodedata.normalize("NFKC", m.group(1))
+        names = [_PAREN.sub("", term), *_PAREN.findall(term)]
+        group = normalize(names[0])
+        for name in names:
+            if normalize(name):
+                aliases[normalize(name)] = group
+    return aliases
+
+
+def parse_threshold(text: str) -> list[tuple[str, str, float, str, float | None, str, str]]:
+    """(metric, op, value, unit, upper, per, note) for every clause of `text` with a threshold."""
+    found = []
+    prefix = ""
+    for clause in _CLAUSES.split(unicodedata.normalize("NFKC", text)):
+        clause = clause.strip()
+        head, sep, tail = clause.partition(":")
+        if sep and not any(op in head for op in OPS):
+            prefix, clause = head.strip(), tail.strip()
+        scope = prefix
+        # `安全扫描通过（Critical/High=0）`: the threshold is the parenthesized part.
+        m = _INNER.fullmatch(clause)
+        if m and not any(op in m["outer"] for op in OPS) and any(op in m["inner"] for op in OPS):
+            scope = f"{prefix} {m['outer'].strip()}".strip()
+            clause = f"{m['inner'].strip()} {m['rest'].strip()}".strip()
+        for pattern, op in ((_COMPARISON, None), (_RANGE, "between"), (_TARGET, ">=")):
+            m = pattern.fullmatch(clause)
+            if m:
+                break
+        else:
+            continue
+        metric = m["metric"].strip()
+        notes = _PAREN.findall(metric) + _PAREN.findall(m["rest"])
+        metric = _PAREN.sub("", metric).strip()
+        rest = _PAREN.sub("", m["rest"]).strip()
+        if not metric or metric[-1] in "-~–":
+            continue
+        if scope:
+            metric = f"{scope} {metric}"
+        if op == ">=" and float(m["value"]) == 0:
+            op = "<="  # a bare `0 error` is a ceiling
+        upper = float(m["upper"]) if op == "between" else None
+        note = "；".join(n.strip() for n in notes + [rest] if n.strip())
+        found.append((metric, op or OPS[m["op"]], float(m["value"]), m["unit"] or "", upper, m["per"] or "", note))
+    return found
+
+
+def spec_rules(spec: AgentSpec, aliases: dict[str, str] | None = None) -> list[Rule]:
+    """Every threshold in a spec's KPIs, gates and responsibility metrics, compiled to rules."""
+    aliases = aliases or {}
+    items = [("kpis", x) for x in spec.kpis] + [("gates", x) for x in spec.gates]
+    items += [("metrics", x) for r in spec.responsibilities for x in r.metrics]
+    rules = []
+    for section, text in items:
+        for metric, op, value, unit, upper, per, note in parse_threshold(text):
+            key = normalize(metric)
+            rules.append(Rule(spec.agent_id, section, text, metric, op, value, unit, upper, per, note, aliases.get(key, key)))
+    return rules
+
+
+def parse_value(raw: object) -> tuple[float, str]:
+    """A sample value as (number, unit): 0.12, "0.12%", "45 min" or "3天"."""
+    try:
+        return float(raw), ""  # the common case: a plain number
+    except (TypeError, ValueError):
+        pass
+    m = _VALUE.fullmatch(unicodedata.normalize("NFKC", str(raw)))
+    if not m:
+        raise ValueError(f"not a number with an optional unit: {raw!r}")
+    return float(m[1]), m[2] or ""
+
+
+def read_samples(path: Path) -> Iterator[Sample]:
+    """Samples from CSV (header with metric, value and optional unit, agent_id) or JSONL
+    (objects with the same keys); other columns are ignored."""
+    import csv
+    import json
+
+    fields = ("metric", "value", "unit", "agent_id")
+    with open(path, encoding="utf-8", newline="") as f:
+        if path.suffix.lower() == ".csv":
+            reader = csv.reader(f)
+            header = {name.strip(): i for i, name in enumerate(next(reader, []))}
+            missing = [name for name in fields[:2] if name not in header]
+            if missing:
+                raise ValueError(f"{path}:1: missing column(s) {', '.join(missing)}")
+            # Tuples instead of csv.DictReader's per-row dicts: a third of the read time.
+            idx = [header.get(name) for name in fields]
+            rows: Iterable[tuple] = (tuple(row[i] if i is not None and i < len(row) else "" for i in idx) for row in reader)
+            start = 2
+        else:
+            rows = (tuple(map(obj.get, fields)) for obj in map(json.loads, filter(str.strip, f)))
+            start = 1
+        for lineno, (metric, raw, unit, agent_id) in enumerate(rows, start):
+            try:
+                if metric is None or raw is None:
+                    raise ValueError("missing metric or value")
+                value, parsed = parse_value(raw)
+                unit = str(unit or "").strip() or parsed
+                if unit and unit not in UNITS:
+                    raise ValueError(f"unknown unit {unit!r} (known: {', '.join(UNITS)})")
+                yield Sample(str(metric), value, unit, str(agent_id or ""))
+            except ValueError as e:
+                raise ValueError(f"{path}:{lineno}: {e}") from None
+
+
+# metric key -> agent id ("" for every agent) -> sample dimension ("" for plain numbers) -> values,
+# in the dimension's base unit (plain numbers as given).
+Columns = dict[str, dict[str, dict[str, array]]]
+
+
+def columns(samples: Iterable[Sample], aliases: dict[str, str] | None = None, keys: dict[str, str] | None = None) -> Columns:
+    """Group samples by metric key; `keys` collects each metric name as written -> its key."""
+    aliases = aliases or {}
+    cols: Columns = {}
+    keys = {} if keys is None else keys  # each distinct name is normalized once
+    for metric, value, unit, agent_id in samples:
+        key = keys.get(metric)
+        if key is None:
+            key = keys[metric] = aliases.get(normalize(metric), normalize(metric))
+        dim, factor = UNITS[unit] if unit else ("", 1.0)
+        by_dim = cols.setdefault(key, {}).setdefault(agent_id, {})
+        values = by_dim.get(dim)
+        if values is None:
+            values = by_dim[dim] = array("d")
+        values.append(value * factor)
+    return cols
+
+
+def _check(op: str, values: array, value: float, upper: float | None) -> tuple[int, float]:
+    """(failures, worst value) of one column against a threshold in the column's unit."""
+    if op == "between":
+        failed = sum(map(operator.lt, values, repeat(value))) + sum(map(operator.gt, values, repeat(upper)))
+        lo, hi = min(values), max(values)
+        return failed, lo if value - lo > hi - upper else hi
+    failed = len(values) - sum(map(_COMPARE[op], values, repeat(value)))
+    if op in ("<=", "<"):
+        return failed, max(values)
+    if op in (">=", ">"):
+        return failed, min(values)
+    lo, hi = min(values), max(values)
+    return failed, lo if value - lo > hi - value else hi
+
+
+def evaluate(rules: Iterable[Rule], cols: Columns) -> list[Outcome]:
+    """Check every rule against the samples of its metric (its agent's and agent-less ones)."""
+    outcomes = []
+    for rule in rules:
+        n = failed = errors = 0
+        worst: float | None = None
+        factor = rule.factor
+        by_agent = cols.get(rule.key, {})
+        for by_dim in (by_agent.get(""), by_agent.get(rule.agent_id)):
+            for dim, values in (by_dim or {}).items():
+                if dim and dim != rule.dimension:
+                    errors += len(values)
+                    continue
+                # Plain numbers are in the rule's unit; the others in base units.
+                scale = 1.0 if not dim else factor
+                upper = None if rule.upper is None else rule.upper * scale
+                bad, edge = _check(rule.op, values, rule.value * scale, upper)
+                n, failed = n + len(values), failed + bad
+                edge /= scale
+                if worst is None or _worse(rule, edge, worst):
+                    worst = edge
+        outcomes.append(Outcome(rule, n, failed, worst, errors))
+    return outcomes
+
+
+def _worse(rule: Rule, a: float, b: float) -> bool:
+    if rule.op in ("<=", "<"):
+        return a > b
+    if rule.op in (">=", ">"):
+        return a < b
+    hi = rule.value if rule.upper is None else rule.upper
+    return max(rule.value - a, a - hi) > max(rule.value - b, b - hi)
+
+
+def format_outcome(outcome: Outcome) -> str:
+    rule = outcome.rule
+    line = f"{outcome.status:<7} {rule.agent_id:<24} {rule.section:<8} {rule.describe()}"
+    parts = []
+    if outcome.samples:
+        parts.append(f"{outcome.samples - outcome.failed}/{outcome.samples} ok, worst {_fmt(outcome.worst)}{rule.unit}")
+    if outcome.errors:
+        parts.append(f"{outcome.errors} sample(s) in an incompatible unit")
+    return f"{line}   {', '.join(parts)}" if parts else line
+
+
+def outcome_record(outcome: Outcome) -> dict:
+    rule = outcome.rule
+    return {
+        "agent_id": rule.agent_id,
+        "section": rule.section,
+        "source": rule.source,
+        "metric": rule.metric,
+        "op": rule.op,
+        "value": rule.value,
+        "upper": rule.upper,
+        "unit": rule.unit,
+        "per": rule.per,
+        "note": rule.note,
+        "status": outcome.status,
+        "samples": outcome.samples,
+        "failed": outcome.failed,
+        "errors": outcome.errors,
+        "worst": outcome.worst,
+    }
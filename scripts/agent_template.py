@@ -0,0 +1,132 @@
+"""Compile the meta-info/*.md skeletons into the layouts the renderers follow.
+
+A meta template is a readable skeleton: frontmatter, a `# ` title and one `## ` heading
+per section, with placeholder bodies. Compiling keeps what drives rendering (frontmatter
+key order and section order) and binds every heading to a section renderer, so
+reordering or dropping a section is a template edit. Compiled templates are cached by
+the file's content hash; rendering through a layout is a tuple walk, as fast as the
+hand-written joins it replaced.
+"""
+from __future__ import annotations
+
+import hashlib
+from pathlib import Path
+from typing import NamedTuple
+
+from agent_docs import AGENT_LAYOUT, AGENT_SECTIONS, ZH_CN, Labels, Layout
+from agent_kinds import KINDS, DocKind
+
+TEMPLATE_DIR = "meta-info"
+# Doc type -> its skeleton in meta-info/; the ones with a renderer are agent_kinds.KINDS.
+DOC_TEMPLATES = {
+    "agent": "meta_agent.md",
+    "instruction": "meta_instruction.md",
+    "prompt": "meta_prompt.md",
+    "skill": "meta_skill.md",
+}
+
+
+class Template(NamedTuple):
+    digest: str
+    fm: tuple[str, ...]
+    title: str
+    headings: tuple[str, ...]
+
+
+_compiled: dict[str, Template] = {}
+
+
+def compile_template(text: str, where: str = "<template>", digest: str = "") -> Template:
+    lines = text.split("\n")
+    if not lines or lines[0] != "---":
+        raise ValueError(f"{where}:1: expected '---' frontmatter")
+    fm: list[str] = []
+    i = 1
+    while i < len(lines) and lines[i] != "---":
+        key, sep, _ = lines[i].partition(":")
+        if not sep:
+            raise ValueError(f"{where}:{i + 1}: expected 'key: value' frontmatter, got {lines[i]!r}")
+        fm.append(key.strip())
+        i += 1
+    if i == len(lines):
+        raise ValueError(f"{where}: unterminated frontmatter")
+    title = ""
+    headings: list[str] = []
+    fence = False
+    for lineno, line in enumerate(lines[i + 1:], i + 2):
+        if line.startswith("```"):
+            fence = not fence
+        elif fence:
+            continue
+        elif line.startswith("# ") and not title:
+            title = line[2:].strip()
+        elif line.startswith("## "):
+            heading = line[3:].strip()
+            if heading in headings:
+                raise ValueError(f"{where}:{lineno}: duplicate section {heading!r}")
+            headings.append(heading)
+    return Template(digest, tuple(fm), title, tuple(headings))
+
+
+def load_template(path: Path) -> Template:
+    """Compile `path`, reusing the compiled form while the file's content hash is unchanged."""
+    data = path.read_bytes()
+    digest = hashlib.sha256(data).hexdigest()
+    template = _compiled.get(digest)
+    if template is None:
+        template = _compiled[digest] = compile_template(data.decode("utf-8"), str(path), digest)
+    return template
+
+
+def bind(template: Template, sections: dict[str, str], fm_keys: tuple[str, ...], where: str) -> Layout:
+    """Map a template's headings to section names (`sections`: heading -> name)."""
+    unknown = [k for k in template.fm if k not in fm_keys]
+    if unknown:
+        raise ValueError(f"{where}: unknown frontmatter key(s) {', '.join(unknown)} (known: {', '.join(fm_keys)})")
+    missing = [h for h in template.headings if h not in sections]
+    if missing:
+        known = ", ".join(repr(h) for h in sections)
+        raise ValueError(f"{where}: no renderer for section(s) {', '.join(map(repr, missing))} (known: {known})")
+    return Layout(template.fm, tuple(sections[h] for h in template.headings))
+
+
+def _layout(path: Path, sections: dict[str, str], default: Layout) -> Layout:
+    if not path.exists():
+        return default
+    layout = bind(load_template(path), sections, default.fm, str(path))
+    if "id" not in layout.fm:
+        raise ValueError(f"{path}: frontmatter must keep 'id' (docs are matched to specs by it)")
+    return layout
+
+
+def agent_layout(path: Path, labels: Labels = ZH_CN) -> Layout:
+    """The agent layout from meta_agent.md, whose headings use the default-locale labels."""
+    return _layout(path, {getattr(labels, name): name for name in AGENT_SECTIONS}, AGENT_LAYOUT)
+
+
+def kind_layout(kind: DocKind, repo_root: Path) -> Layout:
+    """The layout of a doc kind, from its template in meta-info/."""
+    path = repo_root / kind.template
+    if kind.labels is None:
+        return agent_layout(path)
+    return _layout(path, {kind.labels[name]: name for name in kind.layout.sections}, kind.layout)
+
+
+def check_templates(repo_root: Path) -> list[tuple[str, str]]:
+    """Compile every meta template and bind the ones with a renderer; return problems."""
+    kinds = {kind.template: kind for kind in KINDS.values()}
+    problems = []
+    for name in DOC_TEMPLATES.values():
+        path = repo_root / TEMPLATE_DIR / name
+        rel = f"{TEMPLATE_DIR}/{name}"
+        if not path.exists():
+            problems.append((rel, "missing"))
+            continue
+        try:
+            if rel in kinds:
+                kind_layout(kinds[rel], repo_root)
+            else:
+                load_template(path)
+        except (OSError, ValueError) as e:
+            problems.append((rel, str(e)))
+    return problems
@@ -0,0 +1,682 @@
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass, fields, make_dataclass
+from pathlib import Path
+from typing import Iterator
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from agent_docs import (  # noqa: E402
+    AgentSpec, Catalog, Responsibility, iter_agent, render_agent, spec_from_dict, spec_to_dict, stream_agent,
+)
+from agent_pipeline import write_if_changed  # noqa: E402
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+RESULTS_DIR = ".cache/bench"
+
+
+def synthetic_spec(i: int, size: int) -> AgentSpec:
+    """A spec shaped like the catalog's, with every list section `size` items long."""
+    items = tuple(f"条目 {i}-{n}：覆盖率 ≥ {n % 100}%（示例）" for n in range(size))
+    return AgentSpec(
+        agent_id=f"synthetic-{i:06d}",
+        title=f"Synthetic Agent {i}",
+        role_desc="合成角色，用于基准测试渲染与写入的吞吐量。",
+        scope_in=items,
+        scope_out=items,
+        inputs=items,
+        outputs=items,
+        missing_questions=items,
+        responsibilities=tuple(
+            Responsibility(f"职责 {n}", "1-3 个工作日", items[:10], items[:5], items[:5]) for n in range(size)
+        ),
+        tools={f"工具组 {n}": items[:5] for n in range(max(1, size // 10))},
+        gates=items,
+        templates=tuple((f"模板 {n}", "- 字段：\n" * 10) for n in range(size)),
+        kpis=items,
+        upstream=items,
+        downstream=items,
+        raci_rows=tuple((f"场景 {n}", "DevOps", "QA", "PM", "全体") for n in range(size)),
+        initial_note="synthetic",
+    )
+
+
+def measure(fn, repeat: int) -> tuple[float, int]:
+    """Best wall time over `repeat` runs and the tracemalloc peak of one run."""
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak
+
+
+def bench_stream(args: argparse.Namespace) -> int:
+    specs = [synthetic_spec(i, args.size) for i in range(args.count)]
+    sink = open(os.devnull, "w", encoding="utf-8")
+
+    def joined() -> None:
+        for spec in specs:
+            sink.write(render_agent(spec))
+
+    def streamed() -> None:
+        for spec in specs:
+            stream_agent(spec, sink)
+
+    def streamed_buffer() -> None:
+        for spec in specs:
+            buf = io.StringIO()
+            stream_agent(spec, buf)
+            sink.write(buf.getvalue())
+
+    if any(render_agent(s) != "".join(iter_agent(s)) for s in specs[:3]):
+        print("error: streaming output differs from render_agent()", file=sys.stderr)
+        return 1
+
+    doc_bytes = len(render_agent(specs[0]).encode("utf-8"))
+    print(f"{args.count} docs x ~{doc_bytes / 1024:.0f} KiB (section size {args.size})")
+    for name, fn in (("render_agent + write", joined), ("stream_agent -> file", streamed), ("stream_agent -> StringIO", streamed_buffer)):
+        seconds, peak = measure(fn, args.repeat)
+        print(f"  {name:<26} {seconds * 1000:9.1f} ms   peak {peak / 1024:9.1f} KiB")
+    sink.close()
+    return 0
+
+
+def write_synthetic_catalog(root: Path, count: int, size: int) -> None:
+    (root / "agents").mkdir(parents=True)
+    index = {}
+    for i in range(count):
+        spec = synthetic_spec(i, size)
+        rel = f"agents/{spec.agent_id}.json"
+        (root / rel).write_text(json.dumps(spec_to_dict(spec), ensure_ascii=False), encoding="utf-8")
+        index[spec.agent_id] = rel
+    (root / "index.json").write_text(json.dumps({"agents": index}), encoding="utf-8")
+
+
+def peak_rss_kb() -> int | None:
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == "darwin" else rss
+
+
+def stage(seconds: float, docs: int, nbytes: int) -> dict:
+    return {
+        "seconds": round(seconds, 6),
+        "docs_per_sec": round(docs / seconds, 1) if seconds else None,
+        "mb_per_sec": round(nbytes / 1e6 / seconds, 3) if seconds else None,
+    }
+
+
+def run_size(count: int, size: int) -> dict:
+    """Time construction, rendering and I/O for one synthetic catalog, in this process."""
+    tmp = Path(tempfile.mkdtemp(prefix="bench-agents-"))
+    try:
+        write_synthetic_catalog(tmp / "catalog", count, size)
+        out_dir = tmp / "agents"
+        out_dir.mkdir()
+        source_bytes = sum(p.stat().st_size for p in (tmp / "catalog" / "agents").iterdir())
+
+        t0 = time.perf_counter()
+        specs = Catalog(tmp / "catalog").load()
+        construct = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        docs = [render_agent(spec).encode("utf-8") for spec in specs]
+        render = time.perf_counter() - t0
+        nbytes = sum(len(d) for d in docs)
+
+        t0 = time.perf_counter()
+        for spec, data in zip(specs, docs):
+            write_if_changed(out_dir / f"{spec.agent_id}.md", data)
+        write = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        for spec, data in zip(specs, docs):
+            write_if_changed(out_dir / f"{spec.agent_id}.md", data)
+        skip = time.perf_counter() - t0
+
+        return {
+            "agents": count,
+            "section_size": size,
+            "rendered_bytes": nbytes,
+            "stages": {
+                "construct": stage(construct, count, source_bytes),
+                "render": stage(render, count, nbytes),
+                "write": stage(write, count, nbytes),
+                "write_unchanged": stage(skip, count, nbytes),
+            },
+            "peak_rss_kb": peak_rss_kb(),
+        }
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "-C", str(REPO_ROOT), "rev-parse", "--short", "HEAD"], check=True, capture_output=True, text=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def bench_suite(args: argparse.Namespace) -> int:
+    if args.single is not None:
+        # Child mode: one catalog size per process, so peak RSS is not shared between sizes.
+        json.dump(run_size(args.single, args.size), sys.stdout)
+        return 0
+
+    commit = git_commit()
+    results = []
+    for count in args.agents:
+        proc = subprocess.run(
+            [sys.executable, __file__, "suite", "--single", str(count), "--size", str(args.size)],
+            check=True, stdout=subprocess.PIPE, text=True,
+        )
+        res = json.loads(proc.stdout)
+        results.append(res)
+        st = res["stages"]
+        print(
+            f"{count:>7} agents  "
+            + "  ".join(f"{name} {st[name]['docs_per_sec']:>9,.0f} docs/s {st[name]['mb_per_sec']:>7.1f} MB/s" for name in ("construct", "render", "write"))
+            + f"  peak RSS {res['peak_rss_kb'] or 0:,} KiB"
+        )
+
+    out = args.out or REPO_ROOT / RESULTS_DIR / f"{commit}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    report = {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "section_size": args.size,
+        "results": results,
+    }
+    out.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    print(f"Results written to {out}")
+    return 0
+
+
+def bench_compare(args: argparse.Namespace) -> int:
+    """Print throughput ratios new/old per size and stage; exit 1 past the regression threshold."""
+    old, new = (json.loads(p.read_text(encoding="utf-8")) for p in (args.baseline, args.current))
+    old_by_size = {(r["agents"], r["section_size"]): r for r in old["results"]}
+    regressions = 0
+    print(f"{old['commit']} -> {new['commit']}")
+    for res in new["results"]:
+        base = old_by_size.get((res["agents"], res["section_size"]))
+        if base is None:
+            continue
+        cells = []
+        for name, cur in res["stages"].items():
+            prev = base["stages"].get(name)
+            if not prev or not prev["docs_per_sec"] or not cur["docs_per_sec"]:
+                continue
+            ratio = cur["docs_per_sec"] / prev["docs_per_sec"]
+            flag = ""
+            if ratio < 1 - args.threshold:
+                flag = " !"
+                regressions += 1
+            cells.append(f"{name} x{ratio:.2f}{flag}")
+        if base.get("peak_rss_kb") and res.get("peak_rss_kb"):
+            cells.append(f"rss x{res['peak_rss_kb'] / base['peak_rss_kb']:.2f}")
+        print(f"{res['agents']:>7} agents  " + "  ".join(cells))
+    if regressions:
+        print(f"{regressions} stage(s) slower than {args.threshold:.0%} threshold", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+# Modules the light commands must never import; see the note at the top of agent_pipeline.py.
+# json pulls in re (about 10 ms), so --list scans index.json itself (agent_pipeline.index_keys).
+STARTUP_FORBIDDEN = ("agent_docs", "argparse", "dataclasses", "json", "pathlib", "re")
+
+
+def import_times(args: list[str]) -> dict[str, int]:
+    """Cumulative -X importtime microseconds per top-level module for `python3 -X importtime ARGS`."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, cwd=REPO_ROOT / "scripts",
+    )
+    times: dict[str, int] = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+def best_wall_ms(cmd: list[str], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, cwd=REPO_ROOT)
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def bench_startup(args: argparse.Namespace) -> int:
+    """Fail (exit 1) if importing the CLI or answering --version/--list exceeds the budget."""
+    import compileall
+
+    # Measure the cached-bytecode import a user sees, not a one-off compile.
+    compileall.compile_dir(REPO_ROOT / "scripts", quiet=1)
+    script = str(REPO_ROOT / "scripts" / "refactor_agents.py")
+    failures = []
+
+    # Best of --repeat runs, as for the wall times: a single run is too noisy for a gate.
+    import_us = min(import_times(["-c", "import refactor_agents"]).get("refactor_agents", 0) for _ in range(args.repeat))
+    print(f"import refactor_agents      {import_us / 1000:7.2f} ms  (budget {args.import_budget_ms} ms)")
+    if import_us / 1000 > args.import_budget_ms:
+        failures.append("import refactor_agents over budget")
+
+    bare = best_wall_ms([sys.executable, "-c", "pass"], args.repeat)
+    for command in ("--version", "--list"):
+        loaded = import_times([script, command])
+        forbidden = [m for m in STARTUP_FORBIDDEN if m in loaded]
+        extra = best_wall_ms([sys.executable, script, command], args.repeat) - bare
+        print(f"refactor_agents.py {command:<9}{extra:7.2f} ms over bare interpreter  (budget {args.command_budget_ms} ms)")
+        if forbidden:
+            failures.append(f"{command} imports {', '.join(forbidden)}")
+        if extra > args.command_budget_ms:
+            failures.append(f"{command} over budget")
+
+    for failure in failures:
+        print(f"startup regression: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+# The pre-slots representation (plain frozen dataclasses over lists), kept only as the
+# baseline for `memory`.
+@dataclass(frozen=True)
+class _ListResponsibility:
+    title: str
+    duration: str
+    steps: list
+    metrics: list
+    dod: list
+
+
+_ListSpec = make_dataclass("_ListSpec", [f.name for f in fields(AgentSpec)], frozen=True)
+
+
+def list_spec_from_dict(data: dict):
+    kwargs = {k: list(v) if isinstance(v, list) else v for k, v in data.items()}
+    kwargs["responsibilities"] = [_ListResponsibility(**r) for r in data["responsibilities"]]
+    kwargs["tools"] = {k: list(v) for k, v in data["tools"].items()}
+    kwargs["templates"] = [(t, body) for t, body in data["templates"]]
+    kwargs["raci_rows"] = [tuple(row) for row in data["raci_rows"]]
+    return _ListSpec(**kwargs)
+
+
+def catalog_copies(count: int) -> Iterator[dict]:
+    """`count` freshly parsed spec dicts cycling through the real catalog.
+
+    Every copy gets its own id, title and description, while list items repeat
+    verbatim, as shared phrases do across a large catalog.
+    """
+    catalog = Catalog(REPO_ROOT / "catalog")
+    texts = [catalog.path(agent_id).read_text(encoding="utf-8") for agent_id in catalog.ids()]
+    for n in range(count):
+        data = json.loads(texts[n % len(texts)])
+        for key in ("agent_id", "title", "role_desc"):
+            data[key] = f"{data[key]}-{n}"
+        yield data
+
+
+def retained_bytes(build, count: int) -> tuple[int, float]:
+    """Bytes still allocated after parsing and building `count` specs, and the time taken.
+
+    Parsed dicts are dropped as the specs are built, as they are when loading a catalog.
+    """
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    specs = [build(d) for d in catalog_copies(count)]
+    seconds = time.perf_counter() - t0
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del specs
+    return current, seconds
+
+
+def bench_memory(args: argparse.Namespace) -> int:
+    sample = next(catalog_copies(1))
+    if spec_to_dict(spec_from_dict(sample)) != sample:
+        print("error: spec_from_dict() does not round-trip the catalog", file=sys.stderr)
+        return 1
+    print(f"{args.count} specs parsed from copies of the catalog")
+    baseline = None
+    for name, build in (("dataclass + lists", list_spec_from_dict), ("slots + tuples + intern", spec_from_dict)):
+        retained, seconds = retained_bytes(build, args.count)
+        baseline = baseline or retained
+        print(
+            f"  {name:<24} {retained / args.count:9.0f} B/spec   {retained / 1024 / 1024:8.1f} MiB"
+            f"   {retained / baseline:6.1%}   load {seconds * 1000:8.1f} ms"
+        )
+    return 0
+
+
+def bench_parse(args: argparse.Namespace) -> int:
+    from agent_parse import canonical_spec, parse_agent
+
+    specs = [synthetic_spec(i, args.size) for i in range(args.count)]
+    docs = [render_agent(spec) for spec in specs]
+    parsed: list[AgentSpec] = []
+
+    def parse_all() -> None:
+        parsed[:] = [parse_agent(doc) for doc in docs]
+
+    seconds, peak = measure(parse_all, args.repeat)
+    if any(p != canonical_spec(s) for p, s in zip(parsed, specs)):
+        print("error: parse_agent() does not round-trip render_agent()", file=sys.stderr)
+        return 1
+    nbytes = sum(len(doc.encode("utf-8")) for doc in docs)
+    print(
+        f"parsed {args.count} docs ({nbytes / 1e6:.1f} MB) in {seconds * 1000:.1f} ms: "
+        f"{args.count / seconds:,.0f} docs/s, {nbytes / 1e6 / seconds:.1f} MB/s, peak {peak / 1024:,.0f} KiB"
+    )
+    return 0
+
+
+def bench_index(args: argparse.Namespace) -> int:
+    import random
+
+    import agent_index
+
+    specs = {spec.agent_id: spec for spec in (synthetic_spec(i, args.size) for i in range(args.count))}
+    hashes = {aid: "0" for aid in specs}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp, "search.sqlite")
+        t0 = time.perf_counter()
+        agent_index.update(path, hashes, specs.__getitem__, set(specs))
+        build = time.perf_counter() - t0
+        n_entries = sum(1 for spec in specs.values() for _ in agent_index.entries(spec))
+        print(
+            f"indexed {args.count} agents ({n_entries:,} entries) in {build:.1f} s, "
+            f"{path.stat().st_size / 1024 / 1024:.1f} MiB"
+        )
+        rng = random.Random(0)
+        picks = [rng.randrange(args.count) for _ in range(args.repeat)]
+        cases = [
+            ("common phrase", ["覆盖率"], agent_index.SECTIONS),
+            ("single character", ["覆"], agent_index.SECTIONS),
+            ("one agent's gate", [f"条目 {i}-{args.size - 1}" for i in picks], ("gates",)),
+            ("RACI scene", [f"场景 {args.size - 1}"], ("raci",)),
+            ("no match", ["发布Go/No-Go"], agent_index.SECTIONS),
+        ]
+        for name, queries, sections in cases:
+            times = []
+            for q in queries * (args.repeat if len(queries) == 1 else 1):
+                t0 = time.perf_counter()
+                hits = agent_index.search(path, q, sections, args.limit)
+                times.append(time.perf_counter() - t0)
+            if name == "one agent's gate" and not hits:
+                print(f"error: {queries[-1]!r} found nothing", file=sys.stderr)
+                return 1
+            times.sort()
+            print(
+                f"  {name:<18} {len(hits):4} hits   median {times[len(times) // 2] * 1000:7.2f} ms"
+                f"   max {times[-1] * 1000:7.2f} ms"
+            )
+
+        # Incremental update: one changed spec, one removed.
+        changed, removed = next(iter(specs)), list(specs)[-1]
+        hashes[changed] = "1"
+        del hashes[removed]
+        t0 = time.perf_counter()
+        counts = agent_index.update(path, hashes, specs.__getitem__, set(hashes))
+        print(f"  update (1 changed, 1 removed): {counts} in {(time.perf_counter() - t0) * 1000:.1f} ms")
+    return 0
+
+
+def bench_rules(args: argparse.Namespace) -> int:
+    import random
+
+    import agent_rules
+
+    t0 = time.perf_counter()
+    rules = [rule for i in range(args.count) for rule in agent_rules.spec_rules(synthetic_spec(i, args.size))]
+    compiled = time.perf_counter() - t0
+    rng = random.Random(0)
+    # Plain numbers, numbers with the rule's unit and agent-scoped samples, as a scorecard export mixes them.
+    picks = [rules[rng.randrange(len(rules))] for _ in range(args.samples)]
+    rows = [
+        (rule.metric, f"{rng.uniform(0, 100):.2f}{rule.unit if n % 2 else ''}", rule.agent_id if n % 3 == 0 else "")
+        for n, rule in enumerate(picks)
+    ]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp, "samples.csv")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("metric,value,agent_id\n")
+            f.writelines(f"{metric},{value},{agent}\n" for metric, value, agent in rows)
+        t0 = time.perf_counter()
+        cols = agent_rules.columns(agent_rules.read_samples(path))
+        loaded = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    outcomes = agent_rules.evaluate(rules, cols)
+    evaluated = time.perf_counter() - t0
+    checked = sum(o.samples for o in outcomes)
+    failed = sum(o.status == "FAIL" for o in outcomes)
+    print(f"{len(rules):,} rules from {args.count} agents compiled in {compiled * 1000:.0f} ms")
+    print(f"{args.samples:,} samples read and grouped in {loaded * 1000:.0f} ms ({args.samples / loaded:,.0f}/s)")
+    print(
+        f"{checked:,} (sample, rule) checks in {evaluated * 1000:.0f} ms ({checked / evaluated:,.0f}/s): "
+        f"{failed:,} of {len(outcomes):,} rules failed"
+    )
+    return 0
+
+
+def bench_graph(args: argparse.Namespace) -> int:
+    import random
+    from dataclasses import replace
+
+    import agent_graph
+
+    rng = random.Random(0)
+    teams = max(1, args.count // args.team_size)
+    roles: dict[str, list[str] | None] = {f"synthetic-{i:06d}": [f"synthetic-{i:06d}"] for i in range(args.count)}
+    roles.update({f"team-{t}": [f"synthetic-{i:06d}" for i in range(t, args.count, teams)] for t in range(teams)})
+    roles.update({"PM": None, "全体": None})
+
+    def ref() -> str:
+        # Mostly agents, some teams (groups) and "a/b" pairs, like the real catalog.
+        r = rng.random()
+        if r < 0.05:
+            return f"team-{rng.randrange(teams)}"
+        if r < 0.15:
+            return f"synthetic-{rng.randrange(args.count):06d}/PM"
+        return f"synthetic-{rng.randrange(args.count):06d}"
+
+    base = synthetic_spec(0, 1)
+    specs = [
+        replace(
+            base,
+            agent_id=f"synthetic-{i:06d}",
+            upstream=tuple(f"{ref()}：输入 {n}" for n in range(args.fanout)),
+            downstream=tuple(f"{ref()}：交付 {n}" for n in range(args.fanout)),
+            raci_rows=tuple((f"场景 {n}", ref(), ref(), "PM", "全体") for n in range(args.fanout)),
+        )
+        for i in range(args.count)
+    ]
+    t0 = time.perf_counter()
+    graph = agent_graph.build_graph(specs, roles)
+    built = time.perf_counter() - t0
+    print(f"{len(graph.names):,} roles, {len(graph.edges):,} edges built in {built * 1000:.0f} ms")
+    timings = [
+        ("cycles", graph.cycles),
+        ("orphans", graph.orphans),
+        ("downstream closure", lambda: graph.reachable(0)),
+        ("upstream closure", lambda: graph.reachable(0, downstream=False)),
+        ("cached closure", lambda: graph.reachable(0)),
+        ("DOT export", graph.to_dot),
+    ]
+    for name, fn in timings:
+        t0 = time.perf_counter()
+        result = fn()
+        print(f"  {name:<20} {(time.perf_counter() - t0) * 1000:8.1f} ms   ({len(result):,} items)")
+    return 0
+
+
+def bench_publish(args: argparse.Namespace) -> int:
+    import urllib.request
+
+    import agent_publish
+
+    server = agent_publish.serve(latency=args.latency)
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        (root / "agents").mkdir()
+        paths = []
+        for i in range(args.count):
+            path = root / "agents" / f"synthetic-{i:06d}.md"
+            path.write_text(render_agent(synthetic_spec(i, args.size)), encoding="utf-8")
+            paths.append(path)
+        nbytes = sum(p.stat().st_size for p in paths)
+        print(f"{args.count} docs ({nbytes / 1e6:.1f} MB), server latency {args.latency * 1000:.0f} ms per request")
+
+        # What publishing looked like before: one request (and connection) per doc, in sequence.
+        sample = paths[: args.baseline]
+        t0 = time.perf_counter()
+        for path in sample:
+            doc, _ = agent_publish.changed_docs([path], root, {})
+            request = urllib.request.Request(server.url, agent_publish.batch_body(doc), {"Content-Type": "application/json"})
+            urllib.request.urlopen(request).read()
+        per_doc = (time.perf_counter() - t0) / max(1, len(sample))
+        print(f"  one request per doc      {per_doc * args.count:8.2f} s  (extrapolated from {len(sample)} docs)")
+
+        server.docs.clear()
+        for label in ("first publish", "nothing changed"):
+            result = agent_publish.publish_docs(server.url, paths, root, args.jobs, args.batch)
+            print(
+                f"  {label:<24} {result.seconds:8.2f} s  ({result.published} published, "
+                f"{result.unchanged} unchanged, {result.requests} requests)"
+            )
+        if server.docs != {p.relative_to(root).as_posix(): p.read_text(encoding="utf-8") for p in paths}:
+            print("error: the stand-in server does not hold every doc", file=sys.stderr)
+            return 1
+
+        # Resume after failures: a flaky service and no retries leaves gaps; the next run fills only those.
+        flaky = agent_publish.serve(latency=args.latency, fail_rate=0.3)
+        first = agent_publish.publish_docs(flaky.url, paths, root, args.jobs, args.batch, retries=0)
+        second = agent_publish.publish_docs(flaky.url, paths, root, args.jobs, args.batch, retries=10)
+        print(
+            f"  {'30% failing, no retries':<24} {first.seconds:8.2f} s  "
+            f"({first.published} published, {len(first.failed)} failed)"
+        )
+        print(
+            f"  {'resume with retries':<24} {second.seconds:8.2f} s  "
+            f"({second.published} published, {second.unchanged} unchanged, {second.retries} retries)"
+        )
+        if second.failed or first.published + second.published != args.count:
+            print("error: resuming did not publish exactly the missing docs", file=sys.stderr)
+            return 1
+    return 0
+
+
+def _sizes(value: str) -> list[int]:
+    return [int(v) for v in value.split(",") if v]
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks for scripts/refactor_agents.py.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("stream", help="compare render_agent() joins with the streaming stream_agent() path")
+    p.add_argument("--count", type=int, default=20, help="number of synthetic specs (default: 20)")
+    p.add_argument("--size", type=int, default=500, help="items per section (default: 500)")
+    p.add_argument("--repeat", type=int, default=3, help="timing repetitions, best is reported (default: 3)")
+    p.set_defaults(func=bench_stream)
+
+    p = sub.add_parser("suite", help="time construction, rendering and I/O on synthetic catalogs")
+    p.add_argument(
+        "--agents", type=_sizes, default=[10, 1000, 100000],
+        help="comma-separated catalog sizes (default: 10,1000,100000)",
+    )
+    p.add_argument("--size", type=int, default=5, help="items per section (default: 5, close to the real catalog)")
+    p.add_argument("--out", type=Path, help=f"results JSON (default: {RESULTS_DIR}/<commit>.json)")
+    p.add_argument("--single", type=int, help=argparse.SUPPRESS)
+    p.set_defaults(func=bench_suite)
+
+    p = sub.add_parser("startup", help="check import time and --version/--list latency against a budget")
+    # Budgets leave headroom over typical runs (import ~1.5 ms, --version/--list ~3 ms over a bare
+    # interpreter) so the gate trips on regressions such as a new heavy import, not on noise.
+    p.add_argument("--import-budget-ms", type=float, default=10.0, help="budget for importing refactor_agents (default: 10)")
+    p.add_argument(
+        "--command-budget-ms", type=float, default=15.0,
+        help="budget for --version/--list over a bare interpreter start (default: 15)",
+    )
+    p.add_argument("--repeat", type=int, default=10, help="timing repetitions, best is used (default: 10)")
+    p.set_defaults(func=bench_startup)
+
+    p = sub.add_parser("memory", help="compare retained memory of the spec representation with plain dataclasses")
+    p.add_argument("--count", type=int, default=10000, help="number of specs to build (default: 10000)")
+    p.set_defaults(func=bench_memory)
+
+    p = sub.add_parser("parse", help="parse rendered docs back into specs and check the round trip")
+    p.add_argument("--count", type=int, default=5000, help="number of synthetic docs (default: 5000)")
+    p.add_argument("--size", type=int, default=5, help="items per section (default: 5)")
+    p.add_argument("--repeat", type=int, default=3, help="timing repetitions, best is reported (default: 3)")
+    p.set_defaults(func=bench_parse)
+
+    p = sub.add_parser("index", help="build the search index over synthetic agents and time queries and updates")
+    p.add_argument("--count", type=int, default=100000, help="number of synthetic agents (default: 100000)")
+    p.add_argument("--size", type=int, default=5, help="items per section (default: 5)")
+    p.add_argument("--limit", type=int, default=20, help="matches per query (default: 20)")
+    p.add_argument("--repeat", type=int, default=20, help="runs per query, median and max are reported (default: 20)")
+    p.set_defaults(func=bench_index)
+
+    p = sub.add_parser("rules", help="compile threshold rules of synthetic agents and evaluate a large sample batch")
+    p.add_argument("--count", type=int, default=1000, help="number of synthetic agents (default: 1000)")
+    p.add_argument("--size", type=int, default=5, help="items per section (default: 5)")
+    p.add_argument("--samples", type=int, default=1000000, help="number of metric samples (default: 1000000)")
+    p.set_defaults(func=bench_rules)
+
+    p = sub.add_parser("graph", help="build the handoff/RACI graph of a synthetic multi-team catalog and time its analyses")
+    p.add_argument("--count", type=int, default=100000, help="number of synthetic agents (default: 100000)")
+    p.add_argument("--fanout", type=int, default=3, help="upstream, downstream and RACI rows per agent (default: 3)")
+    p.add_argument("--team-size", type=int, default=10, help="agents per team group (default: 10)")
+    p.set_defaults(func=bench_graph)
+
+    p = sub.add_parser("publish", help="publish synthetic docs to a local stand-in docs service")
+    p.add_argument("--count", type=int, default=5000, help="number of docs (default: 5000)")
+    p.add_argument("--size", type=int, default=5, help="items per section (default: 5)")
+    p.add_argument("--latency", type=float, default=0.01, help="stand-in server latency per request in seconds (default: 0.01)")
+    p.add_argument("--jobs", type=int, default=8, help="concurrent requests (default: 8)")
+    p.add_argument("--batch", type=int, default=50, help="docs per request (default: 50)")
+    p.add_argument("--baseline", type=int, default=200, help="docs sent one request at a time for comparison (default: 200)")
+    p.set_defaults(func=bench_publish)
+
+    p = sub.add_parser("compare", help="compare two suite result files")
+    p.add_argument("baseline", type=Path)
+    p.add_argument("current", type=Path)
+    p.add_argument(
+        "--threshold", type=float, default=0.1,
+        help="flag stages whose throughput dropped by more than this fraction (default: 0.1)",
+    )
+    p.set_defaults(func=bench_compare)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,834 +1,12 @@
-from __future__ import annotations
+"""Regenerate agents/*.md from the spec catalog; see `python3 scripts/refactor_agents.py --help`.
 
-from dataclasses import dataclass
-from datetime import date
-from pathlib import Path
-
-TODAY = date.today().isoformat()
-BASE_LINK = "../instructions/agent-base.md"
-METRICS_LINK = "../instructions/metrics-glossary.md"
-
-
-def fm(**kwargs) -> str:
-    lines = ["---"]
-    for k, v in kwargs.items():
-        if isinstance(v, list):
-            lines.append(f"{k}:")
-            for item in v:
-                lines.append(f"  - {item}")
-        else:
-            lines.append(f"{k}: {v}")
-    lines.append("---")
-    return "\n".join(lines)
-
-
-def section(title: str) -> str:
-    return f"\n## {title}\n"
-
-
-def sub(title: str) -> str:
-    return f"\n### {title}\n"
-
-
-def resp_block(title: str, duration: str, steps: list[str], metrics: list[str], dod: list[str]) -> str:
-    parts: list[str] = []
-    parts.append(sub(title))
-    parts.append(f"**建议时长**：{duration}\n")
-    parts.append("**标准化流程**：\n")
-    for i, step in enumerate(steps, 1):
-        parts.append(f"{i}. {step}")
-
-    parts.append("\n**可量化指标（建议阈值）**：")
-    for m in metrics:
-        parts.append(f"- {m}")
-
-    parts.append("\n**交付标准（DoD）**：")
-    for d in dod:
-        parts.append(f"- {d}")
-
-    return "\n".join(parts) + "\n"
-
-
-def contract(inputs: list[str], outputs: list[str], missing_questions: list[str]) -> str:
-    parts = [section("输入/输出契约（Contract）"), "**输入（Inputs）**："]
-    parts += [f"- {i}" for i in inputs]
-    parts.append("\n**输出（Outputs）**：")
-    parts += [f"- {o}" for o in outputs]
-    parts.append("\n**输入缺失时优先追问（默认问题清单）**：")
-    parts += [f"- {q}" for q in missing_questions]
-    return "\n".join(parts) + "\n"
-
-
-def quality_gates(gates: list[str]) -> str:
-    parts = [
-        section("质量门禁（Quality Gates）"),
-        f"通用门禁定义见 [{BASE_LINK}]({BASE_LINK})。\n",
-        "**本角色专属门禁**：",
-    ]
-    parts += [f"- {g}" for g in gates]
-    return "\n".join(parts) + "\n"
-
-
-def tools_block(items: dict[str, list[str]]) -> str:
-    parts = [section("技能与工具")]
-    for k, vs in items.items():
-        parts.append(f"**{k}**：")
-        parts += [f"- {v}" for v in vs]
-        parts.append("")
-    return "\n".join(parts) + "\n"
-
-
-def templates_block(items: list[tuple[str, str]]) -> str:
-    parts = [section("模板（可复制使用）"), f"通用模板见 [{BASE_LINK}]({BASE_LINK})。\n"]
-    for title, body in items:
-        parts.append(f"### {title}\n")
-        parts.append("```\n" + body.strip("\n") + "\n```\n")
-    return "\n".join(parts) + "\n"
-
-
-def kpi_block(items: list[str]) -> str:
-    parts = [section("KPI（用于复盘与绩效）"), f"常用指标口径见 [{METRICS_LINK}]({METRICS_LINK})。\n"]
-    parts += [f"- {it}" for it in items]
-    return "\n".join(parts) + "\n"
-
-
-def handoff_block(
-    upstream: list[str],
-    downstream: list[str],
-    raci_rows: list[tuple[str, str, str, str, str]],
-) -> str:
-    parts = [section("协作与交接（Handoff + RACI）")]
-
-    parts.append("**上游我需要（Upstream）**：")
-    parts += [f"- {u}" for u in upstream]
-
-    parts.append("\n**我交付给下游（Downstream）**：")
-    parts += [f"- {d}" for d in downstream]
-
-    parts.append("\n**RACI（示例）**：\n")
-    parts.append("| 场景 | R | A | C | I |")
-    parts.append("|---|---|---|---|---|")
-    for scene, r, a, c, i in raci_rows:
-        parts.append(f"| {scene} | {r} | {a} | {c} | {i} |")
-
-    return "\n".join(parts) + "\n"
-
-
-def changelog(initial_note: str) -> str:
-    return f"\n## Changelog\n\n- {TODAY} v0.2 — {initial_note}\n"
-
-
-@dataclass(frozen=True)
-class AgentSpec:
-    agent_id: str
-    title: str
-    role_desc: str
-    scope_in: list[str]
-    scope_out: list[str]
-    inputs: list[str]
-    outputs: list[str]
-    missing_questions: list[str]
-    responsibilities: list[str]
-    tools: dict[str, list[str]]
-    gates: list[str]
-    templates: list[tuple[str, str]]
-    kpis: list[str]
-    upstream: list[str]
-    downstream: list[str]
-    raci_rows: list[tuple[str, str, str, str, str]]
-    initial_note: str
-
-
-def render_agent(spec: AgentSpec) -> str:
-    parts = [
-        fm(id=spec.agent_id, name=spec.title, version="0.2", last_updated=TODAY, language="zh-CN"),
-        f"# {spec.title}\n",
-        "## 角色描述\n" + spec.role_desc.strip() + "\n",
-        "---\n",
-        section("适用范围 / 不适用范围"),
-        "**适用范围**：\n" + "\n".join([f"- {x}" for x in spec.scope_in]) + "\n\n" +
-        "**不适用范围**：\n" + "\n".join([f"- {x}" for x in spec.scope_out]) + "\n",
-        contract(spec.inputs, spec.outputs, spec.missing_questions),
-        section("核心职责与标准化流程"),
-        "\n".join(spec.responsibilities) + "\n",
-        tools_block(spec.tools),
-        quality_gates(spec.gates),
-        templates_block(spec.templates),
-        kpi_block(spec.kpis),
-        handoff_block(spec.upstream, spec.downstream, spec.raci_rows),
-        changelog(spec.initial_note),
-    ]
-    return "\n".join(parts).rstrip() + "\n"
-
-
-def build_specs() -> list[AgentSpec]:
-    return [
-        AgentSpec(
-            agent_id="requirements-analyst",
-            title="Requirements Analyst Agent",
-            role_desc="需求分析师负责发现、收集、分析与管理需求，把业务目标转化为可实现、可测试、可交付的需求资产，并在项目全周期维护一致性与可追溯性。",
-            scope_in=["新功能/迭代需求梳理", "跨团队需求对齐", "需求文档化与验收标准制定", "需求变更与范围管理"],
-            scope_out=["代替产品经理做商业决策", "代替架构师做技术架构拍板", "代替QA执行测试"],
-            inputs=["业务目标/OKR、目标用户与关键场景", "现有系统/流程与约束", "利益相关者列表与决策链", "上线窗口与里程碑"],
-            outputs=[
-                "PRD/需求清单（Epic/Feature/Story）",
-                "验收标准（Given-When-Then）与DoD",
-                "范围边界（In/Out）与假设、风险、Open Questions",
-                "需求追踪（需求→设计→任务→测试→发布）",
-            ],
-            missing_questions=[
-                "成功是什么？可量化指标是什么（时间/成本/转化/留存/错误率）？",
-                "谁是决策人？谁能拍板范围变更？",
-                "必须支持的端/地区/合规约束有哪些？",
-                "最小可交付（MVP）是什么？哪些明确不做？",
-                "验收时谁来验收，用什么数据/日志证明？",
-            ],
-            responsibilities=[
-                resp_block(
-                    "需求发现与澄清",
-                    "3-7 个工作日/功能域",
-                    [
-                        "识别利益相关者与决策链（RACI）",
-                        "访谈/工作坊/问卷收集输入并沉淀原始事实",
-                        "形成问题陈述（Problem Statement）与目标（SMART）",
-                        "输出范围边界（In/Out）与约束、假设",
-                    ],
-                    [
-                        "关键利益相关者覆盖率 ≥ 90%",
-                        "需求澄清轮次 ≤ 2 轮/迭代",
-                        "Open Questions（未定项）≤ 10 且全部有Owner/截止日期",
-                    ],
-                    [
-                        "形成《需求背景+目标+范围》1-2页摘要",
-                        "访谈纪要可追溯（含结论与行动项）",
-                    ],
-                ),
-                resp_block(
-                    "需求建模与拆分（Epic/Story）",
-                    "2-5 个工作日",
-                    [
-                        "按用户旅程拆分主流程/分支流程",
-                        "用用户故事格式描述并补齐业务规则",
-                        "标注依赖（前置Story/外部系统/数据准备）",
-                        "与开发/QA评审可实现性与可测试性",
-                    ],
-                    [
-                        "Story 满足 INVEST ≥ 90%",
-                        "每个Story验收标准 3-8 条",
-                        "需求歧义项（评审提出）≤ 3%",
-                    ],
-                    [
-                        "需求清单进入管理系统（Jira/ADO等），状态清晰",
-                        "依赖关系可视化（列表/矩阵均可）",
-                    ],
-                ),
-                resp_block(
-                    "优先级与范围管理（RICE/MoSCoW）",
-                    "1-2 个工作日/迭代",
-                    [
-                        "定义评估维度（Reach/Impact/Confidence/Effort）并收集数据",
-                        "与关键干系人对齐优先级与范围边界",
-                        "给出发布路线图（本迭代/下迭代/后续）",
-                    ],
-                    [
-                        "Must Have ≤ 30%（避免范围膨胀）",
-                        "单迭代重大优先级调整 ≤ 15%",
-                        "范围变更引发返工工时占比 ≤ 5%",
-                    ],
-                    [
-                        "输出优先级清单（含理由与数据）",
-                        "范围边界在文档与任务系统同步更新",
-                    ],
-                ),
-                resp_block(
-                    "验收标准与可测试性",
-                    "0.5-2 个工作日/功能",
-                    [
-                        "把需求转换为可验证断言（Given-When-Then）",
-                        "补齐测试数据要求与边界/异常场景",
-                        "与QA确认自动化可行性与断言口径",
-                    ],
-                    [
-                        "需求项验收标准覆盖率 = 100%",
-                        "可自动化验收标准占比 ≥ 60%（按项目类型调整）",
-                        "边界+异常场景覆盖 ≥ 80%",
-                    ],
-                    [
-                        "验收标准可直接映射到测试用例ID",
-                        "验收数据来源明确（日志/指标/DB查询/截图）",
-                    ],
-                ),
-                resp_block(
-                    "需求追踪与变更控制",
-                    "持续",
-                    [
-                        "建立追踪链路：需求→设计→任务→测试→发布版本",
-                        "变更评估：范围/成本/工期/风险/依赖",
-                        "变更评审并记录决策（Decision Log）",
-                    ],
-                    [
-                        "追踪覆盖率 = 100%",
-                        "变更响应时间：紧急 ≤ 1天；一般 ≤ 3天",
-                        "上线后需求遗漏（逃逸）≤ 2%",
-                    ],
-                    [
-                        "变更单有编号、版本号与影响评估",
-                        "所有相关方被通知（I）并确认理解",
-                    ],
-                ),
-            ],
-            tools={
-                "方法论": ["5W2H、用户旅程、用例/用户故事、RICE/MoSCoW", "场景法、边界值、业务规则表"],
-                "协作与沉淀": ["Confluence/Notion/飞书文档", "Jira/Azure DevOps/禅道"],
-            },
-            gates=[
-                "每个Story都具备：范围边界、验收标准、依赖、非功能需求（如有）",
-                "需求评审通过：开发/QA/PM均确认无阻塞",
-                "需求-测试可追溯（Story ↔ Test Case/Check）",
-            ],
-            templates=[
-                ("PRD 1页摘要", "- 背景/问题\n- 目标（SMART+指标）\n- 范围（In/Out）\n- 关键流程\n- 风险与假设\n- 里程碑"),
-                ("验收标准（GWT）", "Given ...\nWhen ...\nThen ...\n\n数据口径：...\n异常/边界：..."),
-            ],
-            kpis=["需求评审一次通过率 ≥ 80%", "需求歧义导致的返工 ≤ 5% 工时", "上线后需求遗漏 ≤ 2%", "干系人满意度 ≥ 4.0/5.0"],
-            upstream=["PM：业务目标/策略、约束、里程碑", "业务方：现状流程与痛点、数据口径", "架构师：技术约束与非功能建议"],
-            downstream=["UI/UX：用户流程与信息架构输入", "开发：可实现的Story+验收标准+依赖", "QA：验收标准+测试数据需求"],
-            raci_rows=[
-                ("需求评审", "需求分析师", "PM", "架构师/开发/QA", "业务方"),
-                ("范围变更", "需求分析师", "PM", "架构师/开发/QA", "业务方"),
-            ],
-            initial_note="统一骨架、抽取共享基座、压缩重复内容",
-        ),
-        AgentSpec(
-            agent_id="ui-ux-designer",
-            title="UI/UX Designer Agent",
-            role_desc="UI/UX 设计师负责用户研究、信息架构、交互与视觉设计，并通过可用性验证与设计系统沉淀，确保体验一致、可实现、可度量。",
-            scope_in=["用户研究与洞察输出", "信息架构/用户流程设计", "原型与视觉交付", "可用性测试与迭代", "设计系统建设"],
-            scope_out=["代替PM决定商业优先级", "代替开发实现功能", "代替品牌团队做整体品牌战略"],
-            inputs=["目标用户与业务目标", "需求清单（含范围边界）", "技术约束（端/性能/兼容/实现难点）", "品牌/视觉规范（如有）"],
-            outputs=["用户旅程/信息架构/关键任务流", "线框图/可交互原型/高保真设计稿", "交互说明与状态覆盖（空/错/加载/权限）", "设计系统（组件、Token、规范）或增量变更"],
-            missing_questions=["核心任务是什么？成功衡量指标是什么（转化、完成率、时长）？", "必须覆盖哪些端/分辨率/无障碍等级？", "有哪些必须保留的业务规则/风控限制？", "上线节奏与设计交付节奏如何对齐？"],
-            responsibilities=[
-                resp_block(
-                    "用户研究与洞察",
-                    "5-10 个工作日/主题",
-                    ["定义研究问题与假设", "招募用户并开展访谈/可用性评估", "提炼痛点与机会点", "输出可行动洞察与设计原则"],
-                    ["定性访谈 5-8 人/轮", "关键洞察 ≥ 10 条/轮", "跨团队共识会议 1 次/轮"],
-                    ["研究报告含：方法、样本、结论、建议、证据链接"],
-                ),
-                resp_block(
-                    "信息架构与用户流程",
-                    "3-7 个工作日",
-                    ["梳理内容清单与层级", "设计导航与关键路径", "输出User Flow/IA", "用快速验证（树测试/首点）校准"],
-                    ["核心任务首点正确率 ≥ 70%", "核心任务流程步骤 ≤ 7", "信息层级 ≤ 4"],
-                    ["IA/流程图可追溯到需求ID，关键分支有说明"],
-                ),
-                resp_block(
-                    "原型与交互说明",
-                    "3-8 个工作日/迭代",
-                    ["低保真→中保真→高保真迭代", "覆盖状态（空/错/加载/权限/边界）", "输出交互说明与埋点需求（如有）"],
-                    ["核心流程覆盖 100%", "状态覆盖 ≥ 80%", "设计评审一次通过 ≥ 75%"],
-                    ["原型可点击，交互说明可被开发直接消费"],
-                ),
-                resp_block(
-                    "视觉设计与一致性",
-                    "3-10 个工作日/迭代",
-                    ["定义视觉方向（色彩/字体/栅格）", "关键页面出稿并走查", "对齐品牌与可访问性"],
-                    ["设计系统引用率 ≥ 80%", "WCAG AA 对比度通过率 ≥ 90%", "还原偏差（走查）≤ 5%"],
-                    ["交付标注完整（间距/字体/颜色/状态），资源可导出"],
-                ),
-                resp_block(
-                    "可用性测试与迭代",
-                    "5-8 个工作日/轮",
-                    ["定义任务脚本", "执行测试并记录问题", "分级（P0-P2）并提出改进", "复测验证"],
-                    ["核心任务成功率 ≥ 85%", "SUS ≥ 70", "P0问题修复率 100%"],
-                    ["输出问题清单+改进方案+复测结果"],
-                ),
-                resp_block(
-                    "设计系统沉淀",
-                    "持续（每月）",
-                    ["维护组件库与Token", "规范命名与版本", "与前端组件（Storybook）对齐"],
-                    ["组件文档覆盖率 100%", "设计-代码同步率 ≥ 95%", "团队采用率 ≥ 85%"],
-                    ["变更有Changelog与迁移说明"],
-                ),
-            ],
-            tools={
-                "设计": ["Figma/Sketch/即时设计", "FigJam/Miro"],
-                "验证": ["Maze/Lookback/问卷工具", "可访问性检查（对比度/键盘可达）"],
-                "沉淀": ["设计系统 Library、Design Tokens", "Storybook 对齐"],
-            },
-            gates=[
-                "关键页面与核心流程覆盖=100%，且状态（空/错/加载/权限）明确",
-                "可访问性：对比度满足 WCAG AA（或明确豁免）",
-                "交互说明可落地：开发评审无阻塞",
-            ],
-            templates=[
-                (
-                    "交互说明最小模板",
-                    "- 页面/组件：\n- 入口/出口：\n- 状态：默认/加载/空/错误/禁用\n- 校验规则：\n- 埋点：事件名/属性/触发时机",
-                )
-            ],
-            kpis=["设计还原度 ≥ 95%", "核心任务成功率 ≥ 85%", "设计返工率 ≤ 10%", "设计系统采用率 ≥ 85%"],
-            upstream=["需求分析：范围边界+验收标准", "架构师/开发：技术约束+组件可行性"],
-            downstream=["前端/移动/桌面：设计稿+交互说明+资源包", "QA：可视化验收点/交互验收要点"],
-            raci_rows=[
-                ("设计评审", "设计师", "PM", "开发/QA", "需求方"),
-                ("设计系统变更", "设计师", "前端负责人", "移动/桌面", "全体"),
-            ],
-            initial_note="统一骨架、抽取共享基座、压缩为可维护文档",
-        ),
-
-        AgentSpec(
-            agent_id="architect",
-            title="Software Architect Agent",
-            role_desc="软件架构师负责把业务需求转化为可演进的技术方案：边界划分、架构决策、非功能指标、风险控制与技术标准。",
-            scope_in=["技术方案与架构设计", "非功能需求定义（性能/可用性/安全）", "技术选型与评审", "跨团队技术对齐"],
-            scope_out=["代替PM决定业务方向", "代替DevOps日常运维", "代替开发实现所有模块"],
-            inputs=["需求清单与优先级", "现有系统现状（拓扑/依赖/瓶颈）", "合规与安全要求", "交付里程碑与预算/人力"],
-            outputs=["架构蓝图（组件边界/数据流/部署拓扑）", "关键架构决策（ADR/Decision Log）", "NFR（SLO/容量/安全/一致性）与验证方案", "接口契约（API/事件/数据模型）"],
-            missing_questions=["系统规模预估（QPS/DAU/数据量/增长率）？", "可用性目标（SLO/SLA）与故障代价？", "数据一致性要求（强一致/最终一致）？", "合规要求（隐私/审计/数据驻留）？"],
-            responsibilities=[
-                resp_block(
-                    "需求与NFR提取",
-                    "2-5 个工作日",
-                    ["参加需求评审", "提取NFR并量化", "形成风险清单", "对齐验收口径与指标来源"],
-                    ["NFR识别覆盖 ≥ 95%", "Top风险清单 ≥ 5 条且都有Owner"],
-                    ["NFR文档包含：指标、阈值、测量方法、压测/演练计划"],
-                ),
-                resp_block(
-                    "架构设计与边界划分",
-                    "3-10 个工作日",
-                    ["定义系统边界/子域", "划分服务/模块与职责", "定义数据流与依赖", "输出组件图/部署图"],
-                    ["跨模块循环依赖 = 0", "关键链路依赖可解释且可替换"],
-                    ["架构图可追溯到需求与NFR，关键路径标注"],
-                ),
-                resp_block(
-                    "接口与数据契约",
-                    "2-7 个工作日",
-                    ["定义API/事件契约", "定义数据模型与版本策略", "制定兼容性策略（向后兼容）"],
-                    ["契约覆盖率 = 100%（对外/跨服务）", "破坏性变更 = 0（无迁移方案时）"],
-                    ["接口文档可被生成工具消费（OpenAPI/AsyncAPI等）"],
-                ),
-                resp_block(
-                    "技术选型与PoC",
-                    "3-10 个工作日",
-                    ["列出候选方案与评估维度", "PoC验证关键风险", "输出选型报告与迁移计划"],
-                    ["PoC命中Top风险 ≥ 80%", "选型决策有证据（数据/对比）"],
-                    ["选型报告包含：成本、团队能力、运维复杂度、风险"],
-                ),
-                resp_block(
-                    "架构评审与治理",
-                    "持续",
-                    ["制定编码/接口/安全标准", "评审关键变更（ADR）", "推动可观测/韧性建设"],
-                    ["关键变更评审覆盖=100%", "ADR记录率=100%（关键决策）"],
-                    ["标准可执行：CI Gate/模板/检查清单"],
-                ),
-            ],
-            tools={
-                "建模": ["C4/BPMN/UML", "ADR/Decision Log"],
-                "平台": ["云服务（AWS/Azure/GCP）", "容器与编排（Docker/K8s）"],
-                "质量": ["压测/容量规划", "安全评估与威胁建模"],
-            },
-            gates=[
-                "关键链路有明确SLO与告警策略（否则不进入上线）",
-                "架构决策（ADR）齐全：选项、取舍、影响",
-                "接口契约版本策略明确且可回滚/可迁移",
-            ],
-            templates=[("ADR 最小模板", "- Context\n- Decision\n- Options\n- Consequences\n- Owner\n- Date")],
-            kpis=["重大架构缺陷导致事故数 ≤ 1/季度", "NFR达标率 ≥ 90%（按发布验证）", "关键变更ADR覆盖率=100%"],
-            upstream=["需求分析：需求边界+验收标准", "DevOps：平台约束与SLO基线"],
-            downstream=["开发：模块边界+接口契约+NFR", "QA：可验证的NFR与验收口径", "发布：风险与回滚策略"],
-            raci_rows=[("架构方案定稿", "架构师", "技术负责人", "DevOps/开发/安全", "PM/QA")],
-            initial_note="统一骨架并抽取共享基座，减少重复",
-        ),
-
-        AgentSpec(
-            agent_id="frontend-developer",
-            title="Frontend Developer Agent",
-            role_desc="前端开发负责把设计与需求落地为可维护、可访问、性能达标的用户界面与前端业务逻辑，并保证工程质量与可观测性。",
-            scope_in=["Web UI/交互实现", "前端工程化与组件化", "前后端集成", "前端性能与可访问性"],
-            scope_out=["代替后端设计数据模型", "代替UI做视觉方向", "代替QA制定全量测试策略"],
-            inputs=["设计稿与交互说明（含状态）", "需求/验收标准", "API契约（OpenAPI/Mock）", "性能与兼容要求"],
-            outputs=["可复用组件/页面实现", "前端测试（单测/集成/E2E协作）", "性能与可访问性达标报告（必要时）", "变更说明与回滚要点（如涉及配置/开关）"],
-            missing_questions=["目标浏览器/最低版本？", "关键路径性能指标（LCP/INP/CLS）阈值？", "API是否稳定？Mock与错误码定义？"],
-            responsibilities=[
-                resp_block(
-                    "组件与页面实现",
-                    "2-8 个工作日/迭代",
-                    ["评审设计与需求，拆组件/页面", "实现状态覆盖与错误处理", "补齐Storybook/文档", "联调与验收"],
-                    ["设计还原度 ≥ 95%", "组件单测覆盖 ≥ 70%（关键组件≥80%）", "无P0可访问性问题"],
-                    ["核心流程页面覆盖=100%，状态齐全（空/错/加载）"],
-                ),
-                resp_block(
-                    "状态管理与数据流",
-                    "1-3 个工作日",
-                    ["定义状态边界（本地/全局/服务端状态）", "实现缓存/重试/幂等处理", "定义错误与降级策略"],
-                    ["数据请求失败可恢复率 ≥ 80%", "前端异常上报覆盖=100%（关键页面）"],
-                    ["状态模型可解释，可定位问题（日志/埋点）"],
-                ),
-                resp_block(
-                    "前后端集成",
-                    "持续",
-                    ["基于契约对接API", "处理分页/权限/错误码", "联调用例与回归"],
-                    ["联调阻塞缺陷 ≤ 2/迭代", "API兼容变更响应 ≤ 1 天"],
-                    ["接口适配有单测/Mock覆盖（关键接口）"],
-                ),
-                resp_block(
-                    "性能优化（Web Vitals）",
-                    "1-3 个工作日/问题",
-                    ["测量（Lighthouse）", "定位瓶颈（bundle/渲染/请求）", "实施优化（拆包/缓存/懒加载）", "复测对比"],
-                    ["LCP ≤ 2.5s（或项目阈值）", "CLS ≤ 0.1", "INP ≤ 200ms"],
-                    ["优化前后对比数据与结论"],
-                ),
-                resp_block(
-                    "质量与工程化",
-                    "持续",
-                    ["统一lint/format/类型检查", "构建/CI Gate", "依赖治理与安全扫描"],
-                    ["CI通过率 ≥ 95%", "构建时间 ≤ 10min（按规模调整）", "高危依赖漏洞=0"],
-                    ["代码审查通过且无阻塞问题"],
-                ),
-            ],
-            tools={
-                "框架": ["React/Vue/Angular（按项目）", "TypeScript"],
-                "工程化": ["Vite/Webpack", "ESLint/Prettier", "Storybook"],
-                "测试": ["Jest/Vitest", "Playwright/Cypress"],
-                "性能": ["Lighthouse", "Chrome DevTools"],
-            },
-            gates=[
-                "关键页面 Web Vitals 达标（阈值见 metrics-glossary）",
-                "TypeScript 无新增阻塞错误；lint 0 error",
-                "关键路径错误处理与空态齐全",
-            ],
-            templates=[("PR 描述模板", "- 需求/Issue：\n- 变更摘要：\n- 风险与回滚：\n- 截图/录屏：\n- 测试：单测/手测/E2E")],
-            kpis=["线上前端错误率持续下降或 ≤ 阈值", "关键页面LCP/INP/CLS达标率 ≥ 90%", "缺陷逃逸率（前端相关）≤ 2%"],
-            upstream=["设计师：高保真+交互说明+资源", "后端：API契约+错误码", "需求分析：验收标准"],
-            downstream=["QA：可测的验收点/测试账号与数据", "DevOps：前端配置/环境变量/构建产物"],
-            raci_rows=[("页面交付验收", "前端", "前端负责人", "设计/QA/后端", "PM")],
-            initial_note="统一骨架，精简为可维护版本并引用共享基座",
-        ),
-
-        AgentSpec(
-            agent_id="backend-developer",
-            title="Backend Developer Agent",
-            role_desc="后端开发负责实现稳定、安全、高性能的服务端能力：API与业务逻辑、数据存储、集成与可观测，并保障可交付性。",
-            scope_in=["API/服务开发", "数据模型与存储", "性能/缓存/并发", "安全与鉴权", "系统集成"],
-            scope_out=["代替架构师做整体架构拍板", "代替DevOps维护生产集群", "代替QA制定完整测试策略"],
-            inputs=["需求与验收标准", "接口契约或期望（REST/GraphQL）", "数据约束（合规/保留/审计）", "SLO/容量预估"],
-            outputs=["API实现+OpenAPI/Schema", "数据迁移/模型变更", "测试（单测/集成）", "可观测（日志/指标/告警要点）"],
-            missing_questions=["关键API的P95阈值？", "一致性要求与事务边界？", "数据保留/脱敏/审计要求？", "回滚策略（DB变更怎么回退）？"],
-            responsibilities=[
-                resp_block(
-                    "API设计与实现",
-                    "3-8 个工作日/模块",
-                    ["设计资源与错误模型", "实现鉴权/校验/幂等", "补齐文档与示例", "联调与回归"],
-                    ["P95 ≤ 200ms（按系统）", "5xx 错误率 ≤ 0.1%", "文档覆盖率=100%"],
-                    ["OpenAPI/Schema可生成客户端；错误码有语义与可追踪ID"],
-                ),
-                resp_block(
-                    "数据库设计与迁移",
-                    "1-5 个工作日",
-                    ["设计表结构与索引", "评审变更与回滚", "实施迁移并监控", "压测关键查询"],
-                    ["慢查询占比 ≤ 1%", "关键查询 P95 ≤ 50ms（按业务）", "迁移失败率=0（有演练）"],
-                    ["迁移脚本可重放；有灰度与回滚方案"],
-                ),
-                resp_block(
-                    "安全与合规",
-                    "持续",
-                    ["鉴权与权限模型", "输入校验与注入防护", "秘密管理", "审计与脱敏"],
-                    ["Critical/High 漏洞=0", "敏感字段日志脱敏覆盖=100%", "权限绕过缺陷=0"],
-                    ["安全评审通过；关键路径有审计日志"],
-                ),
-                resp_block(
-                    "测试与可观测",
-                    "持续",
-                    ["单测/集成测试", "指标与日志埋点", "告警与仪表盘联动"],
-                    ["服务层覆盖率 ≥ 70%（关键模块≥80%）", "告警误报率 ≤ 10%"],
-                    ["关键SLO有仪表盘；故障可定位"],
-                ),
-            ],
-            tools={
-                "语言/框架": ["Node.js（Nest/Fastify）/Python（FastAPI）/Go（Gin）等"],
-                "数据": ["PostgreSQL/MySQL", "Redis", "消息队列（Kafka/RabbitMQ）"],
-                "文档": ["OpenAPI/Swagger", "GraphQL Schema"],
-                "可观测": ["OpenTelemetry", "Prometheus/Grafana", "ELK"],
-            },
-            gates=[
-                "关键API性能达标（P95/错误率）且有压测证据",
-                "DB变更必须可回滚或有向前修复方案",
-                "安全扫描：Critical/High=0",
-            ],
-            templates=[(
-                "API 变更说明",
-                "- Endpoint/Schema：\n- 兼容性：向后兼容/破坏性（含迁移）\n- 错误码：\n- 监控：指标/告警\n- 回滚：",
-            )],
-            kpis=["关键API P95 达标率 ≥ 90%", "线上5xx错误率 ≤ 0.1%", "变更失败率 ≤ 15%（DORA）"],
-            upstream=["架构师：边界/契约/NFR", "需求分析：验收标准与范围", "DevOps：环境约束与SLO"],
-            downstream=["前端/移动：OpenAPI/错误码/示例", "QA：测试账号/数据/接口用例", "发布：变更与回滚要点"],
-            raci_rows=[("API发布", "后端", "后端负责人", "架构师/QA/DevOps", "PM")],
-            initial_note="统一骨架，删除重复手册内容并引用共享基座",
-        ),
-
-        AgentSpec(
-            agent_id="mobile-developer",
-            title="Mobile Developer Agent",
-            role_desc="移动端开发负责 iOS/Android（含跨平台）客户端功能实现、性能与稳定性、端侧数据与发布合规。",
-            scope_in=["移动端功能与UI实现", "端侧性能/稳定性", "端侧存储与同步", "应用发布与合规"],
-            scope_out=["代替后端设计服务协议", "代替DevOps搭建全套CI", "代替产品做需求取舍"],
-            inputs=["设计稿与交互说明", "API契约与错误码", "发布窗口与商店要求", "隐私合规要求（权限/数据采集）"],
-            outputs=["iOS/Android实现", "端侧监控（崩溃/性能）配置", "发布说明与版本变更点", "测试构建包（TestFlight/内测）"],
-            missing_questions=["最低支持系统版本？", "崩溃率/启动时长阈值？", "权限申请与隐私声明是否已准备？"],
-            responsibilities=[
-                resp_block(
-                    "功能实现与架构维护",
-                    "3-10 个工作日/迭代",
-                    ["评审需求与设计", "实现功能与状态覆盖", "保持架构一致性（MVVM等）", "联调与回归"],
-                    ["核心功能完成率 ≥ 95%", "代码审查覆盖=100%"],
-                    ["关键模块有单测/集成测试；变更点记录"],
-                ),
-                resp_block(
-                    "性能与稳定性",
-                    "持续",
-                    ["监控启动/卡顿/内存", "定位并优化", "发布前回归"],
-                    ["崩溃率 ≤ 0.1%（或项目阈值）", "冷启动 ≤ 3s（或阈值）"],
-                    ["性能报告含：现状、根因、优化、复测"],
-                ),
-                resp_block(
-                    "测试与发布",
-                    "持续",
-                    ["单测/UI测试", "内测分发", "商店素材与隐私配置检查", "灰度/回滚预案"],
-                    ["关键模块覆盖率 ≥ 70%", "商店审核退回次数 ≤ 1/版本"],
-                    ["发布Checklist通过；版本说明齐全"],
-                ),
-            ],
-            tools={
-                "iOS": ["Swift/SwiftUI/UIKit", "Instruments/TestFlight"],
-                "Android": ["Kotlin/Compose", "Android Profiler/Firebase"],
-                "跨平台": ["React Native/Flutter（按项目）"],
-                "质量": ["Crashlytics/Sentry", "CI：Fastlane/GitHub Actions"],
-            },
-            gates=[
-                "崩溃率与启动性能达标（阈值在文档中明确）",
-                "隐私合规：权限说明与采集项对齐",
-                "发布包来源可追溯（构建号/commit）",
-            ],
-            templates=[(
-                "发布说明（移动端）",
-                "- 新增/改动\n- 已知问题\n- 影响范围（设备/系统）\n- 回滚/降级方案\n- 审核注意事项",
-            )],
-            kpis=["崩溃率 ≤ 0.1%", "启动时长达标率 ≥ 90%", "商店审核一次通过率 ≥ 80%"],
-            upstream=["设计师：移动端适配稿+交互说明", "后端：API契约与错误码", "QA：测试策略与用例"],
-            downstream=["发布管理：版本变更点+风险+回滚", "DevOps：移动端CI需求与证书/签名信息"],
-            raci_rows=[("商店发布", "移动端", "移动端负责人", "发布/QA/DevOps", "PM")],
-            initial_note="统一骨架并精简，引用共享基座",
-        ),
-
-        AgentSpec(
-            agent_id="desktop-developer",
-            title="Desktop Developer Agent",
-            role_desc="桌面端开发负责 Windows/macOS/Linux 桌面应用实现、系统集成、性能与打包分发，并保障自动更新与稳定性。",
-            scope_in=["桌面应用开发（Electron/.NET/Qt等）", "系统集成（托盘/文件/权限）", "自动更新与分发"],
-            scope_out=["代替DevOps维护所有服务器", "代替安全团队做完整合规审计"],
-            inputs=["需求/验收标准", "设计稿与交互说明", "最低支持系统版本", "签名/证书/发布渠道要求"],
-            outputs=["桌面应用实现", "安装包/更新包", "更新与回滚说明", "平台差异说明"],
-            missing_questions=["分发渠道（自建/商店）？", "自动更新策略（强更/可选）？", "文件/权限/安全限制？"],
-            responsibilities=[
-                resp_block(
-                    "桌面功能实现",
-                    "3-10 个工作日/迭代",
-                    ["技术方案选择（Electron/.NET/Qt）", "实现核心功能与状态覆盖", "平台适配（Win/macOS/Linux）"],
-                    ["关键流程覆盖=100%", "平台特有Bug ≤ 2/迭代"],
-                    ["平台差异文档齐全"],
-                ),
-                resp_block(
-                    "自动更新与分发",
-                    "2-5 个工作日",
-                    ["设计更新策略", "实现差分/全量更新", "签名校验与回滚", "灰度发布"],
-                    ["更新成功率 ≥ 98%", "回滚演练通过率=100%"],
-                    ["更新包可追溯（版本/签名/构建号）"],
-                ),
-            ],
-            tools={
-                "框架": ["Electron/Tauri", ".NET（WPF/MAUI）", "Qt"],
-                "打包": ["electron-builder/NSIS/DMG/AppImage"],
-                "质量": ["Sentry/Crashpad", "自动更新（Squirrel/自建）"],
-            },
-            gates=["安装/升级/回滚链路演练通过", "签名与校验齐全（防篡改）", "关键性能达标（启动/内存/响应）"],
-            templates=[("平台兼容矩阵", "| OS | Version | CPU | Status | Notes |\n|---|---|---|---|---|")],
-            kpis=["更新成功率 ≥ 98%", "安装成功率 ≥ 99%", "崩溃率 ≤ 0.1%"],
-            upstream=["发布管理：发布窗口与策略", "DevOps：签名/证书/构建环境"],
-            downstream=["QA：安装/升级用例与测试矩阵", "支持团队：已知问题与排障手册"],
-            raci_rows=[("桌面版本发布", "桌面端", "桌面端负责人", "QA/发布/DevOps", "PM")],
-            initial_note="统一骨架、引用共享基座、压缩重复内容",
-        ),
-
-        AgentSpec(
-            agent_id="qa-engineer",
-            title="QA Engineer Agent",
-            role_desc="QA 工程师负责质量策略、测试设计与执行、自动化与E2E流程、缺陷管理与质量度量，确保发布可控。",
-            scope_in=["测试策略与计划", "用例设计与执行", "自动化与E2E", "性能/安全验证（协作）", "质量度量与复盘"],
-            scope_out=["代替开发修复缺陷", "代替发布管理做上线拍板"],
-            inputs=["需求/验收标准", "设计与架构说明", "可用测试环境与账号/数据", "发布窗口与风险等级"],
-            outputs=["测试计划与覆盖矩阵", "测试用例（手动/自动）", "缺陷报告与趋势分析", "发布准入建议（Go/No-Go）"],
-            missing_questions=["验收口径与数据来源？", "关键风险点与优先级？", "环境是否可复现生产关键配置？"],
-            responsibilities=[
-                resp_block(
-                    "测试策略与计划",
-                    "2-5 个工作日/迭代",
-                    ["参与需求评审并识别风险", "定义测试范围与类型", "制定进度与资源", "定义准入/准出标准"],
-                    ["需求覆盖率 = 100%", "计划偏差 ≤ 15%"],
-                    ["测试计划含：范围、策略、环境、数据、风险、准入准出"],
-                ),
-                resp_block(
-                    "自动化与E2E",
-                    "持续",
-                    ["选择自动化分层（API/UI）", "建设关键链路E2E", "接入CI并稳定运行"],
-                    ["关键链路自动化覆盖 ≥ 60%", "自动化稳定性（Flaky）≤ 2%"],
-                    ["E2E在CI中可一键运行，报告可读"],
-                ),
-                resp_block(
-                    "缺陷管理与质量度量",
-                    "持续",
-                    ["统一缺陷分级与模板", "跟踪修复与回归", "输出趋势与根因分类"],
-                    ["缺陷修复SLA：P0≤24h，P1≤3d（示例）", "缺陷逃逸率 ≤ 2%"],
-                    ["每次发布有质量报告（缺陷、覆盖、风险）"],
-                ),
-            ],
-            tools={
-                "管理": ["Jira/禅道", "TestRail（如有）"],
-                "自动化": ["Playwright/Cypress", "Postman/Newman", "pytest/JUnit"],
-                "性能/安全": ["k6/JMeter（协作）", "OWASP ZAP（协作）"],
-            },
-            gates=["发布前：P0=0；P1有明确豁免/延期决定", "需求-测试追溯=100%（关键需求）", "自动化在CI稳定运行（Flaky≤2%）"],
-            templates=[
-                (
-                    "缺陷报告模板",
-                    "- 标题：\n- 环境：\n- 复现步骤：\n- 实际结果：\n- 期望结果：\n- 影响范围：\n- 截图/日志：\n- 严重级别(P0-P3)：",
-                ),
-                ("发布Go/No-Go模板", "- 范围：\n- 覆盖：\n- P0/P1列表：\n- 风险与回滚：\n- 建议：Go / No-Go"),
-            ],
-            kpis=["缺陷逃逸率 ≤ 2%", "P0清零率=100%（发布前）", "自动化覆盖率逐季提升（目标≥60%关键链路）"],
-            upstream=["需求分析：验收标准", "开发：可测构建包/特性开关", "DevOps：测试环境"],
-            downstream=["发布管理：质量报告+风险", "支持团队：已知问题与复现条件"],
-            raci_rows=[("发布准入", "QA", "发布经理", "开发/DevOps", "PM")],
-            initial_note="统一骨架并瘦身，保留流程/指标/模板",
-        ),
-
-        AgentSpec(
-            agent_id="devops-engineer",
-            title="DevOps Engineer Agent",
-            role_desc="DevOps 工程师负责CI/CD、基础设施即代码、可观测与事故响应，确保系统可持续交付与可靠运行。",
-            scope_in=["CI/CD流水线", "环境与IaC", "监控/日志/告警", "部署与回滚", "安全与成本优化"],
-            scope_out=["代替开发写业务代码", "代替发布经理做发布协调"],
-            inputs=["应用架构与部署拓扑", "环境清单（dev/stage/prod）", "SLO/SLA与告警要求", "合规/安全要求"],
-            outputs=["CI/CD配置", "IaC（Terraform/Ansible等）", "监控与告警仪表盘", "事故复盘（RCA）与改进项"],
-            missing_questions=["发布策略（蓝绿/金丝雀）？", "RTO/RPO？", "成本预算与峰值容量？"],
-            responsibilities=[
-                resp_block(
-                    "CI/CD建设",
-                    "3-10 个工作日/流水线",
-                    ["设计流水线阶段与触发", "集成测试与制品管理", "加速（缓存/并行）", "失败回滚与通知"],
-                    ["构建成功率 ≥ 95%", "平均构建时长 ≤ 30min（按规模）"],
-                    ["流水线可复用且文档化"],
-                ),
-                resp_block(
-                    "可观测与告警",
-                    "持续",
-                    ["定义SLI/SLO", "接入指标/日志/Trace", "告警分级与演练"],
-                    ["关键SLO有仪表盘=100%", "告警误报率 ≤ 10%"],
-                    ["告警手册与值班流程齐全"],
-                ),
-                resp_block(
-                    "事故响应与复盘",
-                    "持续",
-                    ["分级响应（P0-P3）", "止血→定位→恢复", "RCA与改进项跟踪"],
-                    ["MTTR ≤ 60min（按等级）", "RCA完成 ≤ 5个工作日"],
-                    ["复盘含：时间线、根因、行动项、Owner"],
-                ),
-            ],
-            tools={
-                "CI/CD": ["GitHub Actions/GitLab CI/Jenkins"],
-                "IaC": ["Terraform/Ansible"],
-                "可观测": ["Prometheus/Grafana", "ELK/Opensearch", "OpenTelemetry"],
-                "容器": ["Docker/Kubernetes/Helm"],
-            },
-            gates=["关键发布必须可回滚且演练过", "生产告警分级与oncall流程就绪", "安全扫描通过（Critical/High=0）"],
-            templates=[("事故RCA模板", "- 影响范围：\n- 时间线：\n- 根因：\n- 修复：\n- 预防：\n- 行动项（Owner/DDL）：")],
-            kpis=["部署频率提升或维持高水平（DORA）", "变更失败率 ≤ 15%", "MTTR ≤ 60min（按等级）", "SLO达标率 ≥ 99.9%（按服务）"],
-            upstream=["架构师：SLO与拓扑", "开发：构建/运行需求", "安全：合规要求"],
-            downstream=["发布管理：发布策略与风险", "QA：测试环境与数据刷新策略"],
-            raci_rows=[("生产故障响应", "DevOps", "DevOps负责人", "开发/安全", "发布/PM")],
-            initial_note="统一骨架并瘦身，引用共享指标与模板",
-        ),
-
-        AgentSpec(
-            agent_id="release-manager",
-            title="Release Manager Agent",
-            role_desc="发布管理负责发布计划、发布协调、风险控制、发布执行与回滚演练，确保变更可控、可追溯、可复盘。",
-            scope_in=["发布计划与节奏", "发布准入/准出", "风险与回滚", "发布沟通与文档"],
-            scope_out=["代替DevOps执行所有运维操作", "代替PM决定产品范围"],
-            inputs=["发布范围清单（需求/PR/版本）", "QA质量报告与Go/No-Go建议", "DevOps发布方案与回滚策略", "变更窗口与业务限制"],
-            outputs=["发布计划与Checklist", "发布公告/Release Notes", "发布执行报告", "发布复盘与改进项"],
-            missing_questions=["本次发布的风险等级？", "回滚条件与RTO？", "对外沟通对象与渠道？"],
-            responsibilities=[
-                resp_block(
-                    "发布计划与范围冻结",
-                    "1-3 个工作日/发布",
-                    ["收集范围与依赖", "冻结窗口与变更策略", "定义发布节奏与演练计划"],
-                    ["计划偏差 ≤ 5%", "范围变更次数 ≤ 2/发布"],
-                    ["发布计划含：范围、时间线、owner、风险、回滚"],
-                ),
-                resp_block(
-                    "发布准入（Go/No-Go）",
-                    "0.5-1 天",
-                    ["收集QA质量报告", "核对门禁与风险", "主持Go/No-Go会议并记录决策"],
-                    ["阻塞缺陷（P0）=0", "准入检查项通过率=100%"],
-                    ["决策记录（Decision Log）可追溯"],
-                ),
-                resp_block(
-                    "发布执行与监控",
-                    "发布窗口内",
-                    ["按Runbook执行", "监控关键指标", "异常时按预案处置"],
-                    ["发布成功率 ≥ 98%", "变更失败率 ≤ 15%"],
-                    ["执行报告含：步骤、时间点、结果、证据"],
-                ),
-                resp_block(
-                    "回滚与应急",
-                    "随时",
-                    ["定义回滚触发条件", "演练回滚", "重大异常快速止损"],
-                    ["回滚演练通过率=100%", "回滚RTO ≤ 30min（示例）"],
-                    ["回滚脚本/步骤可复现"],
-                ),
-            ],
-            tools={
-                "协作": ["发布日历/会议机制", "Jira/Confluence/Notion"],
-                "发布": ["Git Tag/版本管理", "Feature Flags", "Runbook"],
-                "观测": ["Grafana/Datadog", "日志平台"],
-            },
-            gates=["发布前Checklist 100%通过", "回滚方案明确且已演练", "关键指标监控就绪（错误率/延迟/业务转化）"],
-            templates=[
-                ("Release Notes 模板", "- 摘要\n- 影响范围\n- 变更列表\n- 风险与回滚\n- 已知问题\n- 支持与联系"),
-                ("发布Checklist（精简）", "- 范围冻结\n- QA Go/No-Go\n- 监控/告警就绪\n- 回滚演练\n- 通知渠道就绪"),
-            ],
-            kpis=["发布成功率 ≥ 98%", "变更失败率 ≤ 15%", "发布后P0事故 = 0（目标）"],
-            upstream=["QA：质量报告", "DevOps：发布方案/回滚", "开发：变更说明"],
-            downstream=["支持/运营：公告与已知问题", "安全/合规：审计记录（如需）"],
-            raci_rows=[("发布Go/No-Go", "发布经理", "PM/业务负责人", "QA/DevOps/开发", "全体")],
-            initial_note="统一骨架并瘦身，保留关键流程、门禁、模板",
-        ),
-    ]
-
-
-def main() -> None:
-    repo_root = Path(__file__).resolve().parents[1]
-    agents_dir = repo_root / "agents"
-    agents_dir.mkdir(parents=True, exist_ok=True)
-
-    specs = build_specs()
-    for spec in specs:
-        (agents_dir / f"{spec.agent_id}.md").write_text(render_agent(spec), encoding="utf-8")
-
-    print(f"Regenerated {len(specs)} agent docs into {agents_dir}")
+The implementation lives in agent_pipeline (CLI, manifest, writes) and agent_docs (spec
+model, catalog, rendering). Python never caches bytecode for the script it is started
+with, so this entry point stays tiny to keep light commands fast.
+"""
+from agent_pipeline import build_specs, main
 
+__all__ = ["build_specs", "main"]
 
 if __name__ == "__main__":
-    main()
+    raise SystemExit(main())
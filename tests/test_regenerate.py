@@ -0,0 +1,40 @@
+"""Regeneration end to end, on a copy of the repo so the real docs and manifest stay untouched."""
+from __future__ import annotations
+
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+TREE = ("scripts", "catalog", "meta-info", "instructions", "agents", "prompts", "skills")
+
+
+def copy_repo(dest: Path) -> Path:
+    for name in TREE:
+        shutil.copytree(REPO_ROOT / name, dest / name, ignore=shutil.ignore_patterns("__pycache__"))
+    return dest
+
+
+def refactor_agents(root: Path, *args: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, str(root / "scripts" / "refactor_agents.py"), "--no-index", *args],
+        capture_output=True, text=True, cwd=root,
+    )
+
+
+def test_renderer_edit_rewrites_docs(tmp_path: Path) -> None:
+    root = copy_repo(tmp_path)
+    assert refactor_agents(root).returncode == 0
+
+    renderer = root / "scripts" / "agent_docs.py"
+    source = renderer.read_text(encoding="utf-8")
+    assert '"duration": "建议时长",' in source
+    renderer.write_text(source.replace('"duration": "建议时长",', '"duration": "预计时长",'), encoding="utf-8")
+
+    run = refactor_agents(root)
+    assert run.returncode == 0, run.stderr
+    assert "10 files touched" in run.stdout
+    assert "预计时长" in (root / "agents" / "architect.md").read_text(encoding="utf-8")
+    check = refactor_agents(root, "--check")
+    assert check.returncode == 0, check.stdout